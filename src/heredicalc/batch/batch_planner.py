@@ -0,0 +1,439 @@
+# batch/batch_planner.py
+import os
+import time
+import logging
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import yaml
+import pandas as pd
+from heredicalc.core.setup_data_sources import load_incidence_data_sources
+from heredicalc.core.run_context import RunContext
+
+# Parameters of a job (missing ones are taken from the job file's `defaults` block, then from here)
+JOB_DEFAULTS = {
+    "population": None,
+    "crhf_model": "constant",
+    "rr_model": "static_lookup",
+    "cr_model": "simple",
+    "penetrance_model": "uniform_survival",
+    "pedigree_format": "cool",
+    "drop_uninformative": False,
+    "afreq": [0.0001],
+}
+REQUIRED_PARAMETERS = ("dataset", "phenotypes", "gene", "pedigree")
+
+# Kinds of intermediate artifacts, in dependency order
+ARTIFACT_KINDS = ("dataset", "incidence_table", "liability_table", "pedigree", "flb")
+ARTIFACT_LABELS = {
+    "dataset": "datasets (download/extract)",
+    "incidence_table": "incidence tables",
+    "liability_table": "liability tables",
+    "pedigree": "pedigrees",
+    "flb": "FLB evaluations",
+}
+
+def _as_list(value):
+    return [value] if isinstance(value, (str, int, float)) else list(value)
+
+def load_jobs(job_file):
+    """
+    Reads a batch job file.
+
+    The file holds either a list of jobs or a mapping with a `jobs` list and an optional
+    `defaults` mapping applied to every job. A job names its dataset, population, phenotypes,
+    gene (or a list of genes), models, pedigree (with pedigree_format) and allele frequencies.
+    Relative pedigree paths are resolved against the directory of the job file.
+
+    Parameters:
+        job_file (str or Path): Path to the YAML job file.
+
+    Returns:
+        list: Jobs as dicts with all parameters set and a unique 'name'.
+
+    Raises:
+        ValueError: If the file is malformed or a job lacks a required parameter.
+    """
+    with open(job_file, "r") as f:
+        content = yaml.safe_load(f) or []
+    defaults = {}
+    if isinstance(content, dict):
+        defaults = content.get("defaults") or {}
+        content = content.get("jobs") or []
+    if not isinstance(content, list):
+        raise ValueError(f"{job_file}: expected a list of jobs.")
+
+    base_dir = os.path.dirname(os.path.abspath(job_file))
+    jobs = []
+    names = set()
+    for number, entry in enumerate(content, start=1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"{job_file}: job {number} is not a mapping.")
+        job = {**JOB_DEFAULTS, **defaults, **entry}
+        job.setdefault("name", f"job{number}")
+        job["name"] = str(job["name"])
+        missing = [parameter for parameter in REQUIRED_PARAMETERS if not job.get(parameter)]
+        if missing:
+            raise ValueError(f"{job_file}: job '{job['name']}' lacks {', '.join(missing)}.")
+        if job["name"] in names:
+            raise ValueError(f"{job_file}: duplicate job name '{job['name']}'.")
+        names.add(job["name"])
+        job["phenotypes"] = sorted(set(_as_list(job["phenotypes"])))
+        job["gene"] = list(dict.fromkeys(_as_list(job["gene"])))
+        job["afreq"] = [float(afreq) for afreq in _as_list(job["afreq"])]
+        job["pedigree"] = os.path.normpath(os.path.join(base_dir, str(job["pedigree"])))
+        jobs.append(job)
+    return jobs
+
+class Artifact:
+    """
+    A distinct intermediate result of a batch: computed once, then shared by all jobs needing it.
+    """
+
+    def __init__(self, kind, key, parameters, dependencies=(), description=None):
+        """
+        Parameters:
+            kind (str): One of ARTIFACT_KINDS.
+            key (tuple): Identity of the artifact, (kind, *parameters).
+            parameters (dict): What the artifact is computed from.
+            dependencies (tuple): Keys of the artifacts it is computed from.
+            description (str): Short description for logs (default: the parameters).
+        """
+        self.kind = kind
+        self.key = key
+        self.parameters = parameters
+        self.dependencies = tuple(dependencies)
+        self.description = description or " ".join(str(value) for value in parameters.values())
+        self.jobs = []
+
+    def label(self):
+        """Returns a short description for logs and reports."""
+        return f"{self.kind} {self.description}"
+
+class BatchPlan:
+    """
+    Deduplicated dependency graph of the artifacts needed by a list of jobs.
+
+    Every job is broken down into the artifacts a separate CLI run would compute (dataset,
+    incidence table, liability tables, pedigree, FLB evaluations); artifacts with the same
+    parameters are merged. Artifacts are kept in insertion order, which is a dependency order.
+    """
+
+    def __init__(self, jobs, sources=None):
+        """
+        Parameters:
+            jobs (list): Jobs as returned by `load_jobs`.
+            sources (dict): The "sources" mapping of sources.yaml (loaded if not given).
+
+        Raises:
+            ValueError: If a job refers to an unknown dataset.
+        """
+        self.jobs = jobs
+        self.sources = sources if sources is not None else load_incidence_data_sources()["sources"]
+        self.artifacts = {}
+        self.naive_counts = Counter()
+        self.job_outputs = {}
+        for job in jobs:
+            self.job_outputs[job["name"]] = self._add_job(job)
+
+    def _add(self, job, kind, parameters, dependencies=(), description=None):
+        key = (kind, *parameters.values())
+        if key not in self.artifacts:
+            self.artifacts[key] = Artifact(kind, key, parameters, dependencies, description)
+        self.artifacts[key].jobs.append(job["name"])
+        self.naive_counts[kind] += 1
+        return key
+
+    def _add_job(self, job):
+        dataset = job["dataset"]
+        if dataset not in self.sources:
+            raise ValueError(f"Job '{job['name']}': dataset '{dataset}' not found in sources.yaml.")
+        population = str(job["population"] or self.sources[dataset].get("default_population"))
+        job["population"] = population
+        phenotypes = tuple(job["phenotypes"])
+
+        dataset_key = self._add(job, "dataset", {"dataset": dataset})
+        incidence_key = self._add(job, "incidence_table",
+                                  {"dataset": dataset, "population": population, "phenotypes": phenotypes},
+                                  [dataset_key])
+        liability_keys = {}
+        for gene in job["gene"]:
+            liability_keys[gene] = self._add(job, "liability_table", {
+                "dataset": dataset, "population": population, "phenotypes": phenotypes, "gene": gene,
+                "crhf_model": job["crhf_model"], "rr_model": job["rr_model"],
+                "cr_model": job["cr_model"], "penetrance_model": job["penetrance_model"],
+            }, [incidence_key])
+        pedigree_key = self._add(job, "pedigree", {
+            "pedigree": job["pedigree"], "pedigree_format": job["pedigree_format"],
+            "drop_uninformative": bool(job["drop_uninformative"]),
+        })
+        return {
+            (gene, afreq): self._add(job, "flb", {"pedigree": pedigree_key, "liability_table": liability_key,
+                                                  "afreq": afreq}, [pedigree_key, liability_key],
+                                     f"{os.path.basename(job['pedigree'])} {gene} afreq={afreq}")
+            for gene, liability_key in liability_keys.items() for afreq in job["afreq"]
+        }
+
+    def counts(self):
+        """Returns a mapping of artifact kind to (naive count, distinct count)."""
+        distinct = Counter(artifact.kind for artifact in self.artifacts.values())
+        return {kind: (self.naive_counts[kind], distinct[kind]) for kind in ARTIFACT_KINDS}
+
+    def dedup_ratio(self):
+        """Returns the number of artifacts computed by separate runs per distinct artifact."""
+        return sum(self.naive_counts.values()) / max(1, len(self.artifacts))
+
+    def report(self):
+        """
+        Describes the plan: artifacts per kind as computed by separate runs and after
+        deduplication, the work still to do and the deduplication ratio.
+
+        Returns:
+            str: The report, one line per artifact kind.
+        """
+        downloads = sum(
+            not _data_handler(self.sources[artifact.parameters["dataset"]]).check_data_exists()
+            for artifact in self.artifacts.values() if artifact.kind == "dataset"
+        )
+        counts = self.counts()
+        lines = [f"{len(self.jobs)} jobs", f"{'artifact':<30}{'separate runs':>15}{'distinct':>10}"]
+        for kind, (naive, distinct) in counts.items():
+            lines.append(f"{ARTIFACT_LABELS[kind]:<30}{naive:>15}{distinct:>10}")
+        naive_total = sum(self.naive_counts.values())
+        lines.append(f"{'total':<30}{naive_total:>15}{len(self.artifacts):>10}")
+        lines.append(f"Deduplication ratio: {self.dedup_ratio():.2f} "
+                     f"({naive_total - len(self.artifacts)} computations saved)")
+        lines.append(f"Estimated work: {downloads} download(s), {counts['incidence_table'][1]} incidence table(s), "
+                     f"{counts['liability_table'][1]} liability table(s), {counts['flb'][1]} FLB evaluation(s) "
+                     f"(less those found in the FLB result cache)")
+        return "\n".join(lines)
+
+def _data_handler(source_config, force_download="no"):
+    from heredicalc.incidences.incidence_data_source_handlers.data_source_handler_factory import DataSourceHandlerFactory
+    return DataSourceHandlerFactory.create_data_source_handler(source_config, force_download=force_download)
+
+class BatchExecutor:
+    """
+    Computes the artifacts of a BatchPlan in dependency order across a thread pool.
+
+    Every artifact is computed once, as soon as its dependencies are available. The FLB
+    evaluations of one pedigree are computed together, in one sweep (one R process), once all of
+    them are ready. If an artifact fails, the artifacts depending on it are skipped; the other jobs
+    are still completed. Artifacts are computed with the executor's RunContext active in the
+    worker threads.
+    """
+
+    def __init__(self, plan, workers=4, force_download="no", result_cache=None, result_store=None, context=None):
+        """
+        Parameters:
+            plan (BatchPlan): The plan to execute.
+            workers (int): Maximum number of artifacts computed at the same time.
+            force_download (str): Download option for the dataset artifacts.
+            result_cache (FLBResultCache): Optional FLB result cache, consulted before every FLB evaluation.
+            result_store (ResultStore): Optional result store, recording the computed liability tables
+                and FLB results (and consulted after the FLB result cache).
+            context (RunContext): Cache directory and logging of the computations (default: a
+                non-interactive context for the current working directory).
+        """
+        self.plan = plan
+        self.workers = max(1, workers)
+        self.force_download = force_download
+        self.result_cache = result_cache
+        self.result_store = result_store
+        self.context = context or RunContext()
+        self.results = {}
+        self.errors = {}
+
+    def _compute(self, artifact, inputs):
+        parameters = artifact.parameters
+        if artifact.kind == "dataset":
+            _data_handler(self.plan.sources[parameters["dataset"]], self.force_download).handle_data()
+            return parameters["dataset"]
+        if artifact.kind == "incidence_table":
+            from heredicalc.bin.penetrances import build_incidence_data
+            df, _ = build_incidence_data(self.plan.sources[parameters["dataset"]], parameters["population"],
+                                         list(parameters["phenotypes"]))
+            return df
+        if artifact.kind == "liability_table":
+            from heredicalc.bin.penetrances import calculate_liability_classes
+            liabilities = calculate_liability_classes(
+                inputs[0], list(parameters["phenotypes"]), parameters["gene"], crhf_model=parameters["crhf_model"],
+                rr_model=parameters["rr_model"], penetrance_model=parameters["penetrance_model"],
+                cr_model=parameters["cr_model"]
+            )
+            liabilities.attrs["parameters"] = {**parameters, "phenotypes": list(parameters["phenotypes"])}
+            if self.result_store is not None:
+                self.result_store.add_liability_table(liabilities)
+            return liabilities
+        if artifact.kind == "pedigree":
+            from heredicalc.flb.flb_runner import load_flb_pedigree
+            return load_flb_pedigree(parameters["pedigree"], parameters["pedigree_format"],
+                                     drop_uninformative=parameters["drop_uninformative"])
+        raise ValueError(f"Unknown artifact kind: {artifact.kind}")
+
+    def _liability_set_names(self, liability_keys):
+        # Sweep names of liability tables: the gene, numbered if a pedigree is evaluated against
+        # several tables of one gene (e.g. for different phenotypes)
+        genes = [self.plan.artifacts[key].parameters["gene"] for key in liability_keys]
+        counts, numbers, names = Counter(genes), Counter(), {}
+        for key, gene in zip(liability_keys, genes):
+            numbers[gene] += 1
+            names[key] = gene if counts[gene] == 1 else f"{gene}#{numbers[gene]}"
+        return names
+
+    def _compute_flb_group(self, keys, pedigree_input, liability_tables):
+        """
+        Computes the FLB artifacts of one pedigree: results found in the FLB result cache or the
+        result store are reused, the others are evaluated in one sweep.
+
+        Parameters:
+            keys (list): Keys of the FLB artifacts.
+            pedigree_input (tuple): The computed pedigree artifact, (pedigree, flb_pedigree).
+            liability_tables (dict): Mapping of liability table artifact key to the computed table.
+
+        Returns:
+            dict: Mapping of FLB artifact key to the FLB result.
+        """
+        from heredicalc.bin.flb import lookup_flb_result, result_engine_version, store_flb_result
+        from heredicalc.flb.flb_sweep import run_flb_sweep
+        pedigree, flb_pedigree = pedigree_input
+        artifacts = self.plan.artifacts
+        pedigree_file = artifacts[artifacts[keys[0]].parameters["pedigree"]].parameters["pedigree"]
+        set_names = self._liability_set_names(list(liability_tables))
+        results, cache_keys = {}, {}
+        engine = None
+        if self.result_cache is not None or self.result_store is not None:
+            from heredicalc.flb.flb_result_cache import flb_result_key, pedigree_fingerprint
+            from heredicalc.penetrances.liability_bundle import liability_fingerprint
+            engine = result_engine_version(self.result_cache)
+            pedigree_fp = pedigree_fingerprint(pedigree.members_df)
+            liability_fps = {key: liability_fingerprint(table) for key, table in liability_tables.items()}
+            for key in keys:
+                parameters = artifacts[key].parameters
+                cache_keys[key] = flb_result_key(pedigree_fp, liability_fps[parameters["liability_table"]],
+                                                 parameters["afreq"], engine)
+                flb = lookup_flb_result(cache_keys[key], self.result_cache, self.result_store)
+                if flb is not None:
+                    results[key] = flb
+        missing = [key for key in keys if key not in results]
+        if not missing:
+            return results
+
+        missing_tables = list(dict.fromkeys(artifacts[key].parameters["liability_table"] for key in missing))
+        missing_freqs = list(dict.fromkeys(artifacts[key].parameters["afreq"] for key in missing))
+        start = time.perf_counter()
+        sweep_result = run_flb_sweep(flb_pedigree, pedigree.members_df,
+                                     {set_names[key]: liability_tables[key] for key in missing_tables}, missing_freqs)
+        seconds = (time.perf_counter() - start) / len(sweep_result)
+        # Sweep rows come in set-major order
+        computed = [(table_key, afreq) for table_key in missing_tables for afreq in missing_freqs]
+        flbs = {combination: float(flb) for combination, flb in zip(computed, sweep_result["flb"])}
+        for key in missing:
+            parameters = artifacts[key].parameters
+            table_key, afreq = parameters["liability_table"], parameters["afreq"]
+            flb = results[key] = flbs[(table_key, afreq)]
+            if self.result_cache is not None:
+                self.result_cache.put(cache_keys[key], flb, liability_set=set_names[table_key], afreq=afreq)
+            store_flb_result(self.result_store, engine, cache_keys.get(key), flb, afreq, pedigree,
+                             liability_tables[table_key], set_names[table_key], pedigree_file, seconds)
+        return results
+
+    def run(self):
+        """
+        Computes all artifacts of the plan.
+
+        Returns:
+            dict: Mapping of artifact key to result; failed artifacts are listed in `errors`.
+        """
+        artifacts = self.plan.artifacts
+        pending = {key: len(artifact.dependencies) for key, artifact in artifacts.items()}
+        dependents = defaultdict(list)
+        for key, artifact in artifacts.items():
+            for dependency in artifact.dependencies:
+                dependents[dependency].append(key)
+        # FLB artifacts of a pedigree are held back until all of them are ready (or skipped)
+        unsettled = Counter(artifact.parameters["pedigree"] for artifact in artifacts.values() if artifact.kind == "flb")
+        ready_flb = defaultdict(list)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+
+            def settle_flb(key, ready):
+                # Submits the FLB artifacts of a pedigree in one group once none of them is waiting
+                pedigree_key = artifacts[key].parameters["pedigree"]
+                if ready:
+                    ready_flb[pedigree_key].append(key)
+                unsettled[pedigree_key] -= 1
+                if unsettled[pedigree_key] == 0 and ready_flb[pedigree_key]:
+                    keys = ready_flb.pop(pedigree_key)
+                    liability_tables = {table_key: self.results[table_key] for table_key in
+                                        dict.fromkeys(artifacts[key].parameters["liability_table"] for key in keys)}
+                    futures[executor.submit(self.context.run, self._compute_flb_group, keys,
+                                            self.results[pedigree_key], liability_tables)] = keys
+
+            def release(key):
+                # Submits an artifact whose dependencies are done, or skips it (and its dependents)
+                stack = [key]
+                while stack:
+                    key = stack.pop()
+                    failed = [dependency for dependency in artifacts[key].dependencies if dependency in self.errors]
+                    if not failed:
+                        if artifacts[key].kind == "flb":
+                            settle_flb(key, ready=True)
+                            continue
+                        inputs = [self.results[dependency] for dependency in artifacts[key].dependencies]
+                        futures[executor.submit(self.context.run, self._compute, artifacts[key], inputs)] = key
+                        continue
+                    self.errors[key] = f"skipped, {artifacts[failed[0]].label()} failed"
+                    if artifacts[key].kind == "flb":
+                        settle_flb(key, ready=False)
+                    for dependent in dependents[key]:
+                        pending[dependent] -= 1
+                        if pending[dependent] == 0:
+                            stack.append(dependent)
+
+            for key, count in pending.items():
+                if count == 0:
+                    release(key)
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    # A single artifact key, or a list of the FLB artifact keys of a group
+                    keys = futures.pop(future)
+                    group = isinstance(keys, list)
+                    keys = keys if group else [keys]
+                    try:
+                        results = future.result() if group else {keys[0]: future.result()}
+                        for key in keys:
+                            self.results[key] = results[key]
+                            logging.info(f"[{len(self.results) + len(self.errors)}/{len(artifacts)}] "
+                                         f"Computed {artifacts[key].label()}")
+                    except Exception as e:
+                        for key in keys:
+                            self.errors[key] = f"{type(e).__name__}: {e}"
+                            logging.error(f"Computing {artifacts[key].label()} failed: {self.errors[key]}")
+                    for key in keys:
+                        for dependent in dependents[key]:
+                            pending[dependent] -= 1
+                            if pending[dependent] == 0:
+                                release(dependent)
+        if self.result_cache is not None:
+            self.result_cache.report()
+        return self.results
+
+    def job_results(self):
+        """
+        Fans the computed FLB results out to the jobs.
+
+        Returns:
+            pd.DataFrame: One row per job, gene and allele frequency, with the FLB result ('flb')
+            or, for failed rows, the error ('error').
+        """
+        rows = []
+        for job in self.plan.jobs:
+            for (gene, afreq), key in self.plan.job_outputs[job["name"]].items():
+                rows.append({
+                    "job": job["name"], "dataset": job["dataset"], "population": job["population"],
+                    "phenotypes": ",".join(job["phenotypes"]), "gene": gene, "pedigree": job["pedigree"],
+                    "afreq": afreq, "flb": self.results.get(key, ""), "error": self.errors.get(key, ""),
+                })
+        return pd.DataFrame(rows)
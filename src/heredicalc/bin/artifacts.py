@@ -0,0 +1,84 @@
+# bin/artifacts.py
+import os
+import sys
+import argparse
+import logging
+import subprocess
+from pathlib import Path
+from heredicalc.core.setup_logging import setup_logging
+from heredicalc.core.run_context import current_context
+from heredicalc.core.artifact_manifest import ArtifactManifest, dataset_fingerprints
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Show and rebuild artifacts derived from outdated dataset configurations.")
+    parser.add_argument("command", choices=["status", "rebuild"],
+                        help="'status' lists all recorded artifacts, 'rebuild' rebuilds the outdated ones.")
+    parser.add_argument("--manifest", type=Path,
+                        help="Path to the artifact manifest (default: cache/manifest.json)")
+    parser.add_argument("--dataset", nargs='+', help="Only consider artifacts depending on these datasets.")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the artifacts that would be rebuilt.")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level")
+    return parser.parse_args()
+
+def print_status(manifest, fingerprints, datasets=None):
+    stale_paths = {path for path, _, _ in manifest.stale(fingerprints, datasets)}
+    for path, entry in sorted(manifest.artifacts.items()):
+        if datasets and not set(datasets) & set(entry["dependencies"]):
+            continue
+        state = "outdated" if path in stale_paths else "current"
+        if not os.path.exists(path):
+            state = "missing"
+        print(f"{state}\t{entry['kind']}\t{','.join(sorted(entry['dependencies']))}\t{path}")
+
+def rebuild_artifact(manifest_path, path, entry, fingerprints):
+    """
+    Runs the recorded command of an artifact and records it with the current fingerprints.
+
+    Returns:
+        bool: True if the artifact was rebuilt.
+    """
+    if not entry.get("command"):
+        logging.error(f"No build command recorded for {path}, please rebuild it manually.")
+        return False
+    logging.info(f"Rebuilding {entry['kind']} {path}")
+    result = subprocess.run([sys.executable, "-m", *entry["command"]], cwd=entry.get("cwd"))
+    if result.returncode != 0:
+        logging.error(f"Rebuilding {path} failed (exit code {result.returncode}).")
+        return False
+    # The command may have updated the manifest itself, so reload it before recording
+    manifest = ArtifactManifest(manifest_path)
+    manifest.record(
+        path, entry["kind"], {dataset: fingerprints.get(dataset) for dataset in entry["dependencies"]},
+        command=entry["command"], parameters=entry.get("parameters"), cwd=entry.get("cwd")
+    )
+    return True
+
+def main():
+    args = parse_arguments()
+    setup_logging(args.log_level)
+    # Manifest and dataset configurations of the run context, as recorded by the flb CLI
+    args.manifest = args.manifest or current_context().manifest_file
+    fingerprints = dataset_fingerprints(current_context().sources)
+    manifest = ArtifactManifest(args.manifest)
+
+    if args.command == "status":
+        print_status(manifest, fingerprints, args.dataset)
+        return
+
+    stale_artifacts = manifest.stale(fingerprints, args.dataset)
+    if not stale_artifacts:
+        logging.info("All recorded artifacts are up to date.")
+        return
+    failed = 0
+    for path, entry, changed in stale_artifacts:
+        if args.dry_run:
+            print(f"{entry['kind']}\t{','.join(changed)}\t{path}")
+        elif not rebuild_artifact(args.manifest, path, entry, fingerprints):
+            failed += 1
+    if failed:
+        logging.error(f"{failed} of {len(stale_artifacts)} artifacts could not be rebuilt.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# bin/batch.py
+import sys
+import argparse
+import logging
+from pathlib import Path
+from heredicalc.core.setup_logging import setup_logging
+from heredicalc.batch.batch_planner import BatchExecutor, BatchPlan, load_jobs
+from heredicalc.core.result_store import ResultStore
+from heredicalc.core.run_context import RunContext
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Run a YAML file of FLB jobs, computing every shared download, incidence table, "
+                    "liability table and FLB evaluation only once.")
+    parser.add_argument("job_file", type=Path, help="YAML job file (a list of jobs, or 'defaults' and 'jobs')")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only report the distinct artifacts, the deduplication ratio and the estimated work.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of artifacts computed at the same time (default: 4)")
+    parser.add_argument("--force_download", type=str, choices=["no", "yes", "if_changed"], default="no",
+                        help="Download option for the datasets: 'no' (default), 'yes' or 'if_changed'.")
+    parser.add_argument("--no-flb-cache", dest="flb_cache", action="store_false",
+                        help="Neither reuse nor store FLB results (see cache/flb_results).")
+    parser.add_argument("--result-store", nargs='?', const="",
+                        help="Record liability tables and FLB results in an SQLite result store "
+                             "(default path: cache/results.sqlite), and reuse FLB results found there.")
+    parser.add_argument("--output", type=str, default="stdout",
+                        help="Output target of the result table (one row per job, gene and allele frequency): 'stdout' or file path")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    setup_logging(args.log_level)
+    try:
+        plan = BatchPlan(load_jobs(args.job_file))
+    except (OSError, ValueError) as e:
+        logging.error(e)
+        sys.exit(1)
+    if args.dry_run:
+        print(plan.report())
+        return
+    logging.info(f"{len(plan.jobs)} jobs need {len(plan.artifacts)} distinct artifacts "
+                 f"(deduplication ratio {plan.dedup_ratio():.2f}).")
+
+    # The FLB result cache is shared with the flb CLI
+    context = RunContext()
+    result_cache = None
+    if args.flb_cache:
+        from heredicalc.flb.flb_result_cache import FLBResultCache
+        result_cache = FLBResultCache(context.flb_results_dir)
+    # A --result-store without path selects the store of the cache directory
+    result_store = None if args.result_store is None else ResultStore(args.result_store or context.result_store_file)
+    executor = BatchExecutor(plan, workers=args.workers, force_download=args.force_download,
+                             result_cache=result_cache, result_store=result_store, context=context)
+    try:
+        executor.run()
+    finally:
+        if result_store is not None:
+            result_store.close()
+    results = executor.job_results()
+    if args.output == "stdout":
+        print(results.to_csv(sep="\t", index=False), end="")
+    else:
+        results.to_csv(args.output, sep="\t", index=False)
+    failed_jobs = results.loc[results["error"] != "", "job"].unique()
+    if len(failed_jobs):
+        logging.error(f"{len(failed_jobs)} of {len(plan.jobs)} jobs failed: {', '.join(failed_jobs)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
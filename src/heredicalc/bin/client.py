@@ -0,0 +1,90 @@
+# bin/client.py
+# Thin command line client for a running heredicalc service (see bin/serve.py).
+# Only uses the standard library, so it starts much faster than the full CLIs.
+import argparse
+import json
+import sys
+from heredicalc.service.client import ServiceClient
+
+def add_liability_arguments(parser, gene_panel=False):
+    parser.add_argument("--dataset", required=True, help="Specify the dataset (e.g., ci5_ix)")
+    parser.add_argument("--population", help="Specify the population by key number (e.g., 38402499)")
+    parser.add_argument("--phenotypes", nargs='+', required=True,
+                        help="Specify phenotypes to include (e.g., BreastCancer OvarianCancer).")
+    if gene_panel:
+        parser.add_argument("--gene", nargs='+', required=True,
+                            help="Specify the gene for CRHF calculation. Several genes are evaluated as a panel.")
+    else:
+        parser.add_argument("--gene", required=True, help="Specify the gene for CRHF calculation")
+    parser.add_argument("--crhf_model", default="constant", help="Specify the CRHF model to use (default: constant)")
+    parser.add_argument("--rr_model", default="static_lookup", help="Specify the RR model to use (default: static_lookup)")
+    parser.add_argument("--penetrance_model", default="uniform_survival", help="Specify the penetrance model to use (default: uniform_survival)")
+    parser.add_argument("--cr_model", default="simple", help="Specify the cumulative risk model to use (default: simple)")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Send penetrance and FLB requests to a running heredicalc service.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host of the service (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port of the service (default: 8765)")
+    parser.add_argument("--socket", help="Unix socket path of the service")
+    parser.add_argument("--timeout", type=float, help="Request timeout in seconds")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("health", help="Check that the service is running")
+    subparsers.add_parser("stats", help="Show the cache statistics of the service")
+    subparsers.add_parser("reload", help="Make the service re-read sources.yaml")
+
+    liabilities_parser = subparsers.add_parser("liabilities", help="Fetch a liability table")
+    add_liability_arguments(liabilities_parser)
+
+    flb_parser = subparsers.add_parser("flb", help="Calculate FLB for a pedigree")
+    flb_parser.add_argument("--pedigree_file", required=True, help="Path to the pedigree file (e.g., example.ped)")
+    flb_parser.add_argument("--pedigree_format", default="cool", help="Format of the pedigree file (default: cool)")
+    flb_parser.add_argument("--afreq", nargs='+', default=["0.0001"], help="Specify allele frequency (default: 0.0001)")
+    flb_parser.add_argument("--output", type=str, default="stdout", help="Output target: 'stdout' or file path")
+    add_liability_arguments(flb_parser, gene_panel=True)
+    return parser.parse_args()
+
+def liability_parameters(args):
+    return {
+        "dataset": args.dataset,
+        "population": args.population,
+        "phenotypes": args.phenotypes,
+        "gene": args.gene,
+        "crhf_model": args.crhf_model,
+        "rr_model": args.rr_model,
+        "cr_model": args.cr_model,
+        "penetrance_model": args.penetrance_model,
+    }
+
+def main():
+    args = parse_arguments()
+    client = ServiceClient(host=args.host, port=args.port, socket_path=args.socket, timeout=args.timeout)
+    try:
+        if args.command in ("health", "stats", "reload"):
+            print(json.dumps(getattr(client, args.command)(), indent=2))
+        elif args.command == "liabilities":
+            table = client.liabilities(**liability_parameters(args))
+            print("\t".join(["liability_class"] + table["columns"]))
+            for index, row in zip(table["index"], table["data"]):
+                print("\t".join(str(value) for value in [index] + row))
+        elif args.command == "flb":
+            with open(args.pedigree_file) as f:
+                pedigree = f.read()
+            results = client.flb(pedigree, pedigree_format=args.pedigree_format, afreq=args.afreq, **liability_parameters(args))
+            if len(results) == 1:
+                output = f"{results[0]['flb']}"
+            else:
+                lines = ["liability_set\tafreq\tflb"]
+                lines += [f"{r['liability_set']}\t{r['afreq']}\t{r['flb']}" for r in results]
+                output = "\n".join(lines) + "\n"
+            if args.output == "stdout":
+                print(output, end="" if output.endswith("\n") else "\n")
+            else:
+                with open(args.output, "w") as f:
+                    f.write(output)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
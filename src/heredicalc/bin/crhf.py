@@ -44,7 +44,7 @@ def main():
     df = data_parser.filter_by_phenotypes(df, args.phenotypes)
     df = data_parser.build_incidence_table(df)
     df = data_parser.add_age_span_column(df)
-    df = data_parser.add_incidence_rate_column()
+    df = data_parser.add_incidence_rate_column(df)
     logging.info(f"Data for {args.dataset} and population {data_parser.population} processed successfully.")
 
     # Initialize CRHF model
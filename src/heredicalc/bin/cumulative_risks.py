@@ -17,7 +17,10 @@ def parse_arguments():
     parser.add_argument("--force-download", action="store_true", help="Force data re-download")
     parser.add_argument("--phenotypes", nargs='+', required=True,
                         help="Specify phenotypes to include (e.g., BreastCancer OvarianCancer).")
-    parser.add_argument("--crtype", default="simple", help="Specify the cumulative risk model to use (default: simple)")
+    parser.add_argument("--crtype", default="simple",
+                        help="Specify the cumulative risk model to use: simple, subset or competing_risks (default: simple)")
+    parser.add_argument("--all-subsets", action="store_true",
+                        help="Print the cumulative risks of every phenotype subset (subset and competing_risks models).")
     args = parser.parse_args()
     args.phenotypes = list(set(args.phenotypes))  # Remove duplicates
     return args
@@ -42,12 +45,19 @@ def main():
     df = data_parser.filter_by_phenotypes(df, args.phenotypes)
     df = data_parser.build_incidence_table(df)
     df = data_parser.add_age_span_column(df)
-    df = data_parser.add_incidence_rate_column()
+    df = data_parser.add_incidence_rate_column(df)
     logging.info(f"Data for {args.dataset} and population {data_parser.population} processed successfully.")
 
     # Initialize cumulative risk model
     cumulative_risk_model = CumulativeRiskModelFactory.create_model(args.crtype, df)
 
+    if args.all_subsets:
+        if not hasattr(cumulative_risk_model, "calculate_all_subsets"):
+            logging.error(f"The cumulative risk model '{args.crtype}' does not calculate phenotype subsets.")
+            return
+        print(cumulative_risk_model.calculate_all_subsets().to_string(max_rows=None))
+        return
+
     # Define an empty list to store results
     cumulative_risks = []
 
@@ -1,24 +1,29 @@
+import time
 import argparse
-import subprocess
-import tempfile
 import logging
 from pathlib import Path
-from heredicalc.pedconv.pedconv.pedigree import Pedigree
-from heredicalc.pedconv.exporters.pedigree_exporter_factory import PedigreeExporterFactory
-from heredicalc.pedconv.importers.pedigree_importer_factory import PedigreeImporterFactory
 from heredicalc.penetrances.exporters.penetrance_exporter_factory import PenetranceExporterFactory
-from heredicalc.flb.liabilities_mapper import map_liabilities
+from heredicalc.flb.liabilities_mapper import compact_liabilities, compute_liability_vector, format_liability_vector
+from heredicalc.flb.flb_runner import execute_r_input, build_flb_input, load_flb_pedigree
+from heredicalc.pedconv.pedconv.pedigree_graph import PedigreeValidationError
+from heredicalc.flb.flb_sweep import run_flb_sweep
+from heredicalc.flb.flb_result_cache import FLBResultCache, engine_version, flb_result_key, pedigree_fingerprint
+from heredicalc.flb.flb_simulation import DEFAULT_THRESHOLDS, run_flb_simulation, summarize_flb_simulation
+from heredicalc.core.result_store import ResultStore
+from heredicalc.penetrances.liability_bundle import (BUNDLE_SUFFIX, PENETRANCE_COLUMNS, LiabilityBundle,
+                                                     liability_fingerprint, liability_parts, load_liability_table)
+from heredicalc.core.artifact_manifest import ArtifactManifest, dataset_fingerprints
+from heredicalc.core.run_context import RunContext, current_context
 from heredicalc.core.setup_logging import setup_logging
-from heredicalc.bin.penetrances import run_penetrance_calculation
 
 #from pedconv.exporters import FLBExporter
 from hashlib import md5
 import sys
 import pandas as pd
-from heredicalc.core.config import PROJECT_ROOT
 
-CACHE_DIR = Path("cache")  # Directory for cached liabilities
-CLI_CUTOFF = 10*1024
+def load_dataset_fingerprints():
+    # sources.yaml is only parsed (once per run context) when dependencies have to be checked or recorded
+    return dataset_fingerprints(current_context().sources)
 
 def validate_args(args):
     # Validate the arguments provided by the user
@@ -37,6 +42,15 @@ def validate_args(args):
         logging.error("Use flb.py --help for more information.")
         sys.exit(1)
 
+    # Liability tables are named by file stem, so the stems of several liabilities files must differ
+    if args.liabilities_file:
+        stems = [path.stem for path in args.liabilities_file]
+        duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+        if duplicates:
+            logging.error(f"Error: Several liabilities files are named {', '.join(duplicates)} (without suffix).")
+            logging.error("Please rename them, as the file names identify the liability tables.")
+            sys.exit(1)
+
     # Validate force_recalculate to be one of the allowed options
     if args.force_recalculate not in ["no", "yes", "ask"]:
         logging.error("Error: --force-recalculate must be one of 'no', 'yes', or 'ask'.")
@@ -48,15 +62,30 @@ def generate_hash(dataset, population, phenotypes, gene, crhf_model, rr_model, c
     data_string = f"{dataset}_{population}_{'_'.join(sorted(phenotypes))}_{gene}_{crhf_model}_{rr_model}_{cr_model}_{penetrance_model}"
     return md5(data_string.encode()).hexdigest()
 
-def check_cache(hash_value):
-    # Check if a cached file for the hash value exists
-    cache_file = CACHE_DIR / f"{hash_value}_liabilities.pkl"
+def check_cache(hash_value, manifest=None, fingerprints=None):
+    # Check if a cached file for the hash value exists in the cache directory of the run context
+    # (and, if a manifest is given, was built from the current dataset configuration)
+    cache_file = current_context().cache_dir / f"{hash_value}_liabilities{BUNDLE_SUFFIX}"
     logging.debug(f"file name generated in check_cache: {cache_file}")
+    if manifest is not None and cache_file.exists() and not manifest.is_current(cache_file, fingerprints):
+        logging.info(f"Cached liabilities {cache_file} are outdated (dataset configuration changed).")
+        return None
     return cache_file if cache_file.exists() else None
 
-def calculate_liabilities(ds, pop, phenos, gene_symbol, crhf, rr, cr, hash_value, pen_model, log_level, force_dl):
+def penetrances_command(args, gene, cache_file):
+    # Command line rebuilding a cached liability table, recorded in the artifact manifest
+    return ["heredicalc.bin.penetrances", "--dataset", args.dataset, "--population", str(args.population),
+            "--phenotypes", *args.phenotypes, "--gene", gene, "--crhf_model", args.crhf_model,
+            "--rr_model", args.rr_model, "--cr_model", args.cr_model, "--penetrance_model", args.penetrance_model,
+            "--output_format", "bundle", "--output_file", str(Path(cache_file).resolve()), "--log-level", "WARNING"]
+
+def calculate_liabilities(ds, pop, phenos, gene_symbol, crhf, rr, cr, hash_value, pen_model, log_level, force_dl,
+                          incidence_tables=None):
     # Run penetrances.py to recalculate liabilities and save to cache
-    cache_file = CACHE_DIR / f"{hash_value}_liabilities.pkl"
+    # (imported here: the penetrance stack is not needed when liabilities come from a file or the cache)
+    # Genes of a panel share the incidence table via `incidence_tables`
+    from heredicalc.bin.penetrances import run_penetrance_calculation
+    cache_file = current_context().cache_dir / f"{hash_value}_liabilities{BUNDLE_SUFFIX}"
     pen_recalc = run_penetrance_calculation(
             dataset=ds,
             population=pop,
@@ -66,143 +95,243 @@ def calculate_liabilities(ds, pop, phenos, gene_symbol, crhf, rr, cr, hash_value
             penetrance_model=pen_model,
             cr_model=cr,
             gene=gene_symbol,
-            output_format="plain",
+            output_format="bundle",
             output_file=str(cache_file),
             force_download = force_dl,
-            log_level = log_level
+            log_level = log_level,
+            incidence_tables = incidence_tables
     )
     if pen_recalc:
         return cache_file
     else:  
         return False
 
-def run_flb_calculation(r_input, use_file=False):
+def cached_liabilities(args, gene, hash_value, manifest, fingerprints):
+    """
+    Returns the cached liability table file of a gene, or None if it has to be (re)calculated:
+    if it is missing or outdated, or recalculation is forced (or confirmed when asked).
+    """
+    cached_file = check_cache(hash_value, manifest, fingerprints)
+    logging.debug(f"hash_value: {hash_value}\ncheck_cache (None if file doesn't exist): {cached_file}")
+    force_recalculate = args.force_recalculate
+    if cached_file and force_recalculate == "ask":
+        # Ask user if recalculation is desired, for every gene of a panel (answered 'n' in a non-interactive run)
+        recalculate = current_context().confirm(f"Cached liabilities data found for {gene}. Recalculate?")
+        force_recalculate = "yes" if recalculate else "no"
+    if cached_file and force_recalculate == "no":
+        logging.info(f"Using cached liabilities data: {cached_file}")
+        return cached_file
+    return None
+
+def recalculate_liabilities(args, gene, hash_value, manifest, fingerprints, incidence_tables=None):
+    # (Re)calculates the liability table of a gene into the cache and records it in the manifest
+    try:
+        liabilities_file = calculate_liabilities(
+            args.dataset, args.population, args.phenotypes, gene, 
+            args.crhf_model, args.rr_model, args.cr_model, hash_value, args.penetrance_model, args.log_level, args.force_download,
+            incidence_tables
+        )
+        if liabilities_file:
+            logging.info(f"(Re-)calculated and cached liabilities data: {liabilities_file}")
+            manifest.record(
+                liabilities_file, "liability_table", {args.dataset: fingerprints.get(args.dataset)},
+                command=penetrances_command(args, gene, liabilities_file)
+            )
+        else: 
+            logging.error ("(Re-)calculation of liabilities failed.")
+    except RuntimeError as e:
+        logging.error(f"Failed to calculate liabilities: {e}")
+        sys.exit(1)
+    return liabilities_file
+
+def load_cached_or_calculated_liabilities(args, gene, incidence_tables=None):
     """
-    Runs the FLB calculation in R, using the provided input data.
+    Returns the liability table of a gene for the recalculation parameters, from cache or freshly calculated.
 
     Parameters:
-    r_input (str or Path): If `use_file` is False, this is a string of R code; otherwise, it's a path to a file.
-    use_file (bool): If True, the R input is passed via a file; otherwise, it's passed directly as a string.
+    args (argparse.Namespace): Parsed command line arguments.
+    gene (str): The gene symbol.
+    incidence_tables (dict): Incidence tables shared between the genes of a panel (see run_penetrance_calculation).
 
     Returns:
-    str: The output of the R script (FLB result).
+    LiabilityBundle: The liability classes, memory-mapped from the cache.
     """
-    # Define the R script path
-    r_script_path = Path(__file__).resolve().parent.parent / "flb" / "flb_script.R"
-    if not r_script_path.exists():
-        raise FileNotFoundError(f"R script not found at {r_script_path}")
-    
-    # Define the arguments for subprocess.run
-    if use_file:
-        # Pass the file path as an argument to the R script
-        result = subprocess.run(
-            ["Rscript", r_script_path, r_input],
-            capture_output=True, text=True
-        )
-    else:
-        # Pass the R code as stdin to the R script
-        result = subprocess.run(
-            ["Rscript", r_script_path],
-            input=r_input,
-            capture_output=True, text=True
-        )
+    hash_value = generate_hash(args.dataset, args.population, args.phenotypes, gene, args.crhf_model, args.rr_model, args.cr_model, args.penetrance_model)
+    manifest = ArtifactManifest(current_context().manifest_file)
+    fingerprints = load_dataset_fingerprints()
+    liabilities_file = cached_liabilities(args, gene, hash_value, manifest, fingerprints)
+    if liabilities_file is None:
+        # either no cached file, or cached file and force_recalculate = yes
+        liabilities_file = recalculate_liabilities(args, gene, hash_value, manifest, fingerprints, incidence_tables)
+    return load_liability_table(liabilities_file)
 
-    # Check for errors in the R script execution
-    if result.returncode != 0:
-        raise RuntimeError(f"Error in FLB calculation: {result.stderr}")
+def load_panel_liabilities(args, genes):
+    """
+    Returns the liability tables of a gene panel: cached tables are loaded, the others are
+    calculated from one incidence table, in parallel processes if several genes are missing
+    (see run_panel_penetrance_calculation).
 
-    # Return the output of the R script (result from FLB calculation)
-    return result.stdout.strip()
+    Parameters:
+    args (argparse.Namespace): Parsed command line arguments.
+    genes (list): The gene symbols.
 
-def main():
-    CACHE_DIR.mkdir(exist_ok=True)
+    Returns:
+    dict: Mapping of gene to its liability table (LiabilityBundle, memory-mapped from the cache).
+    """
+    manifest = ArtifactManifest(current_context().manifest_file)
+    fingerprints = load_dataset_fingerprints()
+    hashes = {gene: generate_hash(args.dataset, args.population, args.phenotypes, gene, args.crhf_model, args.rr_model,
+                                  args.cr_model, args.penetrance_model) for gene in genes}
+    files = {gene: cached_liabilities(args, gene, hashes[gene], manifest, fingerprints) for gene in genes}
+    missing = [gene for gene, cached_file in files.items() if cached_file is None]
+    if len(missing) == 1:
+        files[missing[0]] = recalculate_liabilities(args, missing[0], hashes[missing[0]], manifest, fingerprints)
+    elif missing:
+        from heredicalc.bin.penetrances import run_panel_penetrance_calculation
+        output_files = {gene: current_context().cache_dir / f"{hashes[gene]}_liabilities{BUNDLE_SUFFIX}"
+                        for gene in missing}
+        try:
+            results = run_panel_penetrance_calculation(
+                args.dataset, args.population, missing, {gene: str(path) for gene, path in output_files.items()},
+                force_download=args.force_download, phenotypes=args.phenotypes, crhf_model=args.crhf_model,
+                rr_model=args.rr_model, penetrance_model=args.penetrance_model, cr_model=args.cr_model
+            ) or {}
+        except RuntimeError as e:
+            logging.error(f"Failed to calculate liabilities: {e}")
+            sys.exit(1)
+        for gene in missing:
+            if not results.get(gene):
+                logging.error(f"(Re-)calculation of liabilities for {gene} failed.")
+                continue
+            logging.info(f"(Re-)calculated and cached liabilities data: {output_files[gene]}")
+            manifest.record(
+                output_files[gene], "liability_table", {args.dataset: fingerprints.get(args.dataset)},
+                command=penetrances_command(args, gene, output_files[gene])
+            )
+            files[gene] = output_files[gene]
+    return {gene: load_liability_table(files[gene]) for gene in genes}
 
-    parser = argparse.ArgumentParser(description="Execute FLB calculation with pedigree and liability data.")
-    parser.add_argument("--pedigree_file", type=Path, required=True, help="Path to the pedigree file (e.g., example.ped)")
-    parser.add_argument("--pedigree_format", type=str, required=True, help="Format of the pedigree file (e.g., cool)")
-    parser.add_argument("--liabilities_file", type=Path, help="Optional path to the liabilities file.")
-    parser.add_argument("--dataset", help="Specify the dataset (e.g., ci5_ix)")
-    parser.add_argument("--population", help="Specify the population by key number (e.g., 38402499)")
-    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
-                        help="Set the logging level")
-    parser.add_argument("--phenotypes", nargs='+',
-                        help="Specify phenotypes to include (e.g., BreastCancer OvarianCancer).")
-    parser.add_argument("--crhf_model", help="Specify the CRHF model to use (e.g.: constant)")
-    parser.add_argument("--rr_model",  help="Specify the RR model to use (e.g.: static_lookup)")
-    parser.add_argument("--penetrance_model",  help="Specify the penetrance model to use (e.g.: uniform_survival)")
-    parser.add_argument("--cr_model", help="Specify the cumulative risk model to use (e.g.: simple)")
-    parser.add_argument("--gene", help="Specify the gene for CRHF calculation")
-    parser.add_argument("--afreq", default="0.0001", help="Specify allele frequency (default: 0.0001)")
-    parser.add_argument("--force_recalculate", type=str, choices=["no", "yes", "ask"], default="no", 
-                        help="Recalculation option for liabilities: 'no' (default), 'yes' to force recalculation, or 'ask' to confirm.")
-    parser.add_argument("--force_download", type=str, choices=["no", "yes", "ask"], default="no", 
-                        help="Force fresh download of incidence data, if applicalbe 'no' (default), 'yes' to force download, or 'ask' to confirm.")
-    parser.add_argument("--output", type=str, default="stdout", help="Output target: 'stdout' or file path")
+def record_flb_result(args, liability_tables):
+    """
+    Records an FLB result file in the artifact manifest, with the datasets of its liability tables.
 
-    args = parser.parse_args()
-    setup_logging(args.log_level)
-    validate_args(args)
+    Parameters:
+    args (argparse.Namespace): Parsed command line arguments.
+    liability_tables (dict): The liability tables the result was calculated from.
+    """
+    datasets = {args.dataset} if args.dataset else {
+        table.parameters.get("dataset") for table in liability_tables.values() if isinstance(table, LiabilityBundle)
+    } - {None}
+    fingerprints = load_dataset_fingerprints()
+    ArtifactManifest(current_context().manifest_file).record(
+        args.output, "flb_result", {dataset: fingerprints.get(dataset) for dataset in datasets},
+        command=["heredicalc.bin.flb", *sys.argv[1:]]
+    )
 
+def result_engine_version(result_cache=None):
+    # Engine version recorded with (and keying) FLB results: that of the result cache, if one is used
+    return result_cache.engine_version if result_cache is not None else engine_version()
 
-    # Step 1: Load and convert pedigree
-    pedigree = Pedigree()
-    importer = PedigreeImporterFactory.create_importer(args.pedigree_format, args.pedigree_file)
-    importer.import_data(pedigree)
-    pedigree.members_df = pedigree.members_df.sort_values(by="id").reset_index(drop=True)
-    # print (pedigree.members_df)
-    # sys.exit(0)
-    exporter = PedigreeExporterFactory.create_exporter("segregatr_flb", None) 
-    flb_pedigree = exporter.export_data(pedigree.members_df)  # R-compatible Snippet for FLB
-    # pedigree now holds working copy of pedigree, 
-    # flb_pedigree now holds pedtools compatible R-snippet for generating "x"-vector and associated affection status and genotype status vectors.
+def result_cache_keys(engine, pedigree, liability_tables, allele_freqs):
+    """
+    Returns the FLB result key of every (liability set, allele frequency) combination, used by
+    the result cache and the result store.
 
-    # Step 2: Prepare liabilities (check cache or recalculate)
-    hash_value = generate_hash(args.dataset, args.population, args.phenotypes, args.gene, args.crhf_model, args.rr_model, args.cr_model, args.penetrance_model)
-    cached_file = check_cache(hash_value)
-    logging.debug(f"hash_value: {hash_value}\ncheck_cache (None if file doesn't exist): {cached_file}")
-    liabilities_data = None
-    if cached_file and args.force_recalculate == "ask":
-        # Ask user if recalculation is desired
-        while True:
-            response = input("Cached liabilities data found. Recalculate? (y/n): ").strip().lower()
-            if response == 'y':
-                args.force_recalculate = "yes"
-                break
-            elif response =='n':
-                args.force_recalculate = "no"
-                break
-    if cached_file and args.force_recalculate == "no":
-        liabilities_file = cached_file
-        logging.info(f"Using cached liabilities data: {liabilities_file}")        
-
-    else: 
-        # either no cached file, or cached file and force_recalculate = yes
-        # (re)calculate liability, and save to file
-        try:
-            liabilities_file = calculate_liabilities(
-                args.dataset, args.population, args.phenotypes, args.gene, 
-                args.crhf_model, args.rr_model, args.cr_model, hash_value, args.penetrance_model, args.log_level, args.force_download
-            )
-            if liabilities_file:
-                logging.info(f"(Re-)calculated and cached liabilities data: {liabilities_file}")
-            else: 
-                logging.error ("(Re-)calculation of liabilities failed.")
-        except RuntimeError as e:
-            logging.error(f"Failed to calculate liabilities: {e}")
-            sys.exit(1)
+    Parameters:
+    engine (str): FLB engine version (see result_engine_version).
+    pedigree (Pedigree): The pedigree, as prepared for FLB.
+    liability_tables (dict): Mapping of set name to liability table.
+    allele_freqs (list): Allele frequencies.
 
-    liabilities_data = pd.read_pickle(liabilities_file) 
-    if liabilities_data.empty:
-        # this is wrong, and the liability data is missing!
-        logging.error ("Loading / calculating liability data failed.")
-        sys.exit(1)
+    Returns:
+    dict: Mapping of (set name, allele frequency) to cache key, in sweep order.
+    """
+    pedigree_fp = pedigree_fingerprint(pedigree.members_df)
+    keys = {}
+    for set_name, liabilities_data in liability_tables.items():
+        liability_fp = liability_fingerprint(liabilities_data)
+        for afreq in allele_freqs:
+            keys[(set_name, afreq)] = flb_result_key(pedigree_fp, liability_fp, afreq, engine)
+    return keys
+
+def lookup_flb_result(key, result_cache, result_store=None):
+    # The result cache first, then the result store (which may hold results of other machines);
+    # either may be None
+    flb = result_cache.get(key) if result_cache is not None else None
+    if flb is None and result_store is not None:
+        flb = result_store.find_flb(key)
+        if flb is not None and result_cache is not None:
+            result_cache.put(key, flb)
+    return flb
+
+def store_flb_result(result_store, engine, key, flb, afreq, pedigree, liabilities_data, liability_set,
+                     pedigree_file, seconds):
+    # Records a computed FLB result in the result store, if one is used
+    if result_store is not None:
+        result_store.add_flb_result(
+            flb, afreq, pedigree_fingerprint(pedigree.members_df), liabilities_data, liability_set=liability_set,
+            pedigree_file=pedigree_file, engine_version=engine, cache_key=key, seconds=seconds
+        )
+
+def run_cached_flb_sweep(flb_pedigree, pedigree, liability_tables, allele_freqs, result_cache=None,
+                         result_store=None, pedigree_file=None):
+    """
+    Runs an FLB sweep, evaluating only the combinations missing in the result cache and result store.
+    Computed results are recorded in the result store (with their share of the sweep time).
 
+    Returns:
+    pd.DataFrame: Table with columns 'liability_set', 'afreq' and 'flb', in sweep order.
+    """
+    combinations = [(set_name, afreq) for set_name in liability_tables for afreq in allele_freqs]
+    reuse = result_cache is not None or result_store is not None
+    engine = result_engine_version(result_cache) if reuse else None
+    keys = result_cache_keys(engine, pedigree, liability_tables, allele_freqs) if reuse else {}
+    results = {combination: lookup_flb_result(keys[combination], result_cache, result_store) if reuse else None
+               for combination in combinations}
+    if result_cache is not None:
+        result_cache.report()
+    missing = [combination for combination, flb in results.items() if flb is None]
+    if missing:
+        missing_tables = {set_name: liability_tables[set_name] for set_name in dict.fromkeys(name for name, _ in missing)}
+        missing_freqs = list(dict.fromkeys(afreq for _, afreq in missing))
+        start = time.perf_counter()
+        sweep_result = run_flb_sweep(flb_pedigree, pedigree.members_df, missing_tables, missing_freqs)
+        seconds = (time.perf_counter() - start) / len(sweep_result)
+        # Sweep rows come in set-major order
+        computed = [(set_name, afreq) for set_name in missing_tables for afreq in missing_freqs]
+        for (set_name, afreq), flb in zip(computed, sweep_result["flb"]):
+            results[(set_name, afreq)] = float(flb)
+            key = keys.get((set_name, afreq))
+            if result_cache is not None:
+                result_cache.put(key, float(flb), liability_set=set_name, afreq=afreq)
+            store_flb_result(result_store, engine, key, float(flb), afreq, pedigree,
+                             liability_tables[set_name], set_name, pedigree_file, seconds)
+    return pd.DataFrame(
+        [{"liability_set": set_name, "afreq": afreq, "flb": float(flb)} for (set_name, afreq), flb in results.items()]
+    )
+
+def calculate_flb(flb_pedigree, pedigree, liabilities_data, allele_freq):
+    """
+    Calculates the FLB for one liability table and allele frequency.
+
+    Parameters:
+    flb_pedigree (str): R snippet defining the pedigree (see load_flb_pedigree).
+    pedigree (Pedigree): The pedigree, as prepared for FLB.
+    liabilities_data (pd.DataFrame or LiabilityBundle): The liability table.
+    allele_freq (float): The allele frequency.
 
-    # Step 3: Map liabilities to pedigree
-    liability_vector_str = map_liabilities(liabilities_data, pedigree.members_df)
-    if not liability_vector_str:
+    Returns:
+    str: The FLB result as printed by R.
+    """
+    # Step 3: Map liabilities to pedigree, keeping only the (distinct) penetrance rows it uses
+    classes_df, penetrance_matrix = liability_parts(liabilities_data)
+    liability_vector, penetrance_matrix = compact_liabilities(
+        compute_liability_vector(classes_df, pedigree.members_df), penetrance_matrix
+    )
+    if not liability_vector:
         logging.error("Failed to map liabilities to pedigree.")
         sys.exit(1)
+    liability_vector_str = format_liability_vector(liability_vector)
 
     # Step 4: Export liabilities in FLB format
     #liab_exporter = PenetranceExporterFactory.create_exporter('plain', 'stdout')
@@ -210,25 +339,42 @@ def main():
     if liab_exporter is None:
         logging.error("Failed to create Penetrance exporter for FLB format.")
         sys.exit(1)
-    flb_liabilities = liab_exporter.export_data(liabilities_data)
+    flb_liabilities = liab_exporter.export_data(pd.DataFrame(penetrance_matrix, columns=PENETRANCE_COLUMNS))
 
-    # Step 5: Concatenate strings for R-script
-    allele_freq = float(args.afreq)
-    r_input_str = f"{flb_pedigree}\n{liability_vector_str}\n{flb_liabilities}\nallele_freq <- {allele_freq}"
+    # Step 5: Concatenate strings for R-script and run the FLB calculation
+    r_input_str = build_flb_input(flb_pedigree, liability_vector_str, flb_liabilities, allele_freq)
+    return execute_r_input(r_input_str)
 
-    logging.debug(r_input_str)
-    #sys.exit(0)
-
-    if len(r_input_str) < CLI_CUTOFF:
-        flb_result = run_flb_calculation(r_input_str)
-    else:
-        with tempfile.NamedTemporaryFile(delete=False) as tmpfile:
-            tmpfile.write(r_input_str.encode())
-            tmpfile_path = tmpfile.name
-        try:
-            flb_result = run_flb_calculation(tmpfile_path, use_file=True)
-        finally:
-            Path(tmpfile_path).unlink()  # Delete the temporary file
+def run_flb_command(args, flb_pedigree, pedigree, liability_tables, allele_freqs, result_cache, result_store):
+    # Steps 3-6 of the flb command: calculate (or look up) the FLB result(s) and output them
+    if len(liability_tables) > 1 or len(allele_freqs) > 1:
+        # Sweep mode (several genes, liability files or allele frequencies): evaluate all
+        # combinations against the prepared pedigree in one R session, one row per combination
+        sweep_result = run_cached_flb_sweep(flb_pedigree, pedigree, liability_tables, allele_freqs, result_cache,
+                                            result_store, args.pedigree_file)
+        if args.output == "stdout":
+            print(sweep_result.to_csv(sep="\t", index=False), end="")
+        else:
+            sweep_result.to_csv(args.output, sep="\t", index=False)
+            record_flb_result(args, liability_tables)
+        return
+    liability_set, liabilities_data = next(iter(liability_tables.items()))
+    flb_result = cache_key = engine = None
+    if result_cache is not None or result_store is not None:
+        engine = result_engine_version(result_cache)
+        (cache_key,) = result_cache_keys(engine, pedigree, liability_tables, allele_freqs).values()
+        flb_result = lookup_flb_result(cache_key, result_cache, result_store)
+    if result_cache is not None:
+        result_cache.report()
+    if flb_result is None:
+        start = time.perf_counter()
+        # As a float, like the results of the sweep path
+        flb_result = float(calculate_flb(flb_pedigree, pedigree, liabilities_data, allele_freqs[0]))
+        seconds = time.perf_counter() - start
+        if result_cache is not None:
+            result_cache.put(cache_key, flb_result, liability_set=liability_set, afreq=allele_freqs[0])
+        store_flb_result(result_store, engine, cache_key, flb_result, allele_freqs[0], pedigree,
+                         liabilities_data, liability_set, args.pedigree_file, seconds)
 
     # Step 6: Output the FLB result
     if args.output == "stdout":
@@ -236,6 +382,124 @@ def main():
     else:
         with open(args.output, "w") as f:
             f.write(f"{flb_result}")
+        record_flb_result(args, liability_tables)
+
+def run_simulation_command(args, flb_pedigree, pedigree, liability_tables, allele_freqs):
+    # Simulation mode: expected FLB distribution and power of the pedigree under the causal hypothesis
+    if len(liability_tables) > 1 or len(allele_freqs) > 1:
+        logging.error("The simulation needs exactly one liability table (gene) and one allele frequency.")
+        sys.exit(1)
+    try:
+        simulation = run_flb_simulation(
+            flb_pedigree, pedigree.members_df, next(iter(liability_tables.values())), allele_freqs[0],
+            replicates=args.simulate, seed=args.seed, genotyped=args.genotype
+        )
+    except (ValueError, RuntimeError) as e:
+        logging.error(f"Simulation failed: {e}")
+        sys.exit(1)
+    if args.replicates_file:
+        simulation.to_csv(args.replicates_file, sep="\t", index=False)
+    summary = summarize_flb_simulation(simulation, args.threshold)
+    if args.output == "stdout":
+        print(summary.to_csv(sep="\t", index=False), end="")
+    else:
+        summary.to_csv(args.output, sep="\t", index=False)
+
+def run_flb(args, context):
+    # Steps 1-6 of the flb command, with the run context active
+
+    # Step 1: Load and convert pedigree
+    try:
+        # R-compatible Snippet for FLB
+        pedigree, flb_pedigree = load_flb_pedigree(args.pedigree_file, args.pedigree_format,
+                                                   drop_uninformative=args.drop_uninformative)
+    except PedigreeValidationError as e:
+        logging.error(e)
+        sys.exit(1)
+    # pedigree now holds working copy of pedigree, 
+    # flb_pedigree now holds pedtools compatible R-snippet for generating "x"-vector and associated affection status and genotype status vectors.
+
+    # Step 2: Prepare liabilities (given files, or check cache or recalculate)
+    if args.liabilities_file:
+        liability_tables = {path.stem: load_liability_table(path) for path in args.liabilities_file}
+    else:
+        # The missing liability tables of a gene panel are calculated from one incidence table
+        liability_tables = load_panel_liabilities(args, list(dict.fromkeys(args.gene)))
+    if any(liabilities_data.empty for liabilities_data in liability_tables.values()):
+        # this is wrong, and the liability data is missing!
+        logging.error ("Loading / calculating liability data failed.")
+        sys.exit(1)
+
+    allele_freqs = [float(afreq) for afreq in args.afreq]
+    if args.simulate:
+        run_simulation_command(args, flb_pedigree, pedigree, liability_tables, allele_freqs)
+        return
+    # Results are reused for unchanged pedigree, liability table, allele frequency and engine
+    result_cache = FLBResultCache(context.flb_results_dir) if args.flb_cache else None
+    # A --result-store without path selects the store of the cache directory
+    result_store = None if args.result_store is None else ResultStore(args.result_store or context.result_store_file)
+    try:
+        if result_store is not None:
+            for liabilities_data in liability_tables.values():
+                result_store.add_liability_table(liabilities_data)
+        run_flb_command(args, flb_pedigree, pedigree, liability_tables, allele_freqs, result_cache, result_store)
+    finally:
+        if result_store is not None:
+            result_store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Execute FLB calculation with pedigree and liability data.")
+    parser.add_argument("--pedigree_file", type=Path, required=True, help="Path to the pedigree file (e.g., example.ped)")
+    parser.add_argument("--pedigree_format", type=str, required=True, help="Format of the pedigree file (e.g., cool)")
+    parser.add_argument("--liabilities_file", type=Path, nargs='+',
+                        help="Optional path(s) to liabilities files (pickled tables or bundles). Several files are evaluated as a sweep.")
+    parser.add_argument("--dataset", help="Specify the dataset (e.g., ci5_ix)")
+    parser.add_argument("--population", help="Specify the population by key number (e.g., 38402499)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level")
+    parser.add_argument("--phenotypes", nargs='+',
+                        help="Specify phenotypes to include (e.g., BreastCancer OvarianCancer).")
+    parser.add_argument("--crhf_model", help="Specify the CRHF model to use (e.g.: constant)")
+    parser.add_argument("--rr_model",  help="Specify the RR model to use (e.g.: static_lookup)")
+    parser.add_argument("--penetrance_model",  help="Specify the penetrance model to use (e.g.: uniform_survival)")
+    parser.add_argument("--cr_model", help="Specify the cumulative risk model to use (e.g.: simple)")
+    parser.add_argument("--gene", nargs='+',
+                        help="Specify the gene for CRHF calculation. Several genes are evaluated as a panel against the same pedigree.")
+    parser.add_argument("--afreq", nargs='+', default=["0.0001"],
+                        help="Specify allele frequency (default: 0.0001). Several values are evaluated as a sweep.")
+    parser.add_argument("--force_recalculate", type=str, choices=["no", "yes", "ask"], default="no", 
+                        help="Recalculation option for liabilities: 'no' (default), 'yes' to force recalculation, or 'ask' to confirm.")
+    parser.add_argument("--force_download", type=str, choices=["no", "yes", "ask", "if_changed"], default="no", 
+                        help="Force fresh download of incidence data, if applicalbe 'no' (default), 'yes' to force download, 'ask' to confirm, or 'if_changed' to download only changed data.")
+    parser.add_argument("--refresh-if-changed", dest="force_download", action="store_const", const="if_changed",
+                        help="Check the incidence data source with one conditional request and download only if it changed.")
+    parser.add_argument("--drop_uninformative", action="store_true",
+                        help="Drop disconnected pedigree components without genotyped members before the FLB calculation.")
+    parser.add_argument("--no-flb-cache", dest="flb_cache", action="store_false",
+                        help="Neither reuse nor store FLB results (see cache/flb_results).")
+    parser.add_argument("--result-store", nargs='?', const="",
+                        help="Record liability tables and FLB results in an SQLite result store "
+                             "(default path: cache/results.sqlite), and reuse FLB results found there.")
+    parser.add_argument("--simulate", type=int, metavar="REPLICATES",
+                        help="Simulate this many replicates of the pedigree (gene dropping conditional on the proband "
+                             "and the observed genotypes) and output the summary of their FLB distribution.")
+    parser.add_argument("--seed", type=int, help="Random seed of the simulation.")
+    parser.add_argument("--genotype", type=int, nargs='+', metavar="ID",
+                        help="Members genotyped in the simulated replicates, in addition to the observed genotypes.")
+    parser.add_argument("--threshold", type=float, nargs='+', default=list(DEFAULT_THRESHOLDS),
+                        help=f"FLB thresholds of the simulated power (default: {' '.join(map(str, DEFAULT_THRESHOLDS))})")
+    parser.add_argument("--replicates_file", type=str, help="Write the FLB of every simulated replicate to this file.")
+    parser.add_argument("--non-interactive", dest="interactive", action="store_false",
+                        help="Never ask on the terminal: 'ask' options are answered with 'n'.")
+    parser.add_argument("--output", type=str, default="stdout", help="Output target: 'stdout' or file path")
+
+    args = parser.parse_args()
+    setup_logging(args.log_level)
+    validate_args(args)
+    context = RunContext(interactive=args.interactive)
+    context.cache_dir.mkdir(exist_ok=True)
+    with context.activate():
+        run_flb(args, context)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
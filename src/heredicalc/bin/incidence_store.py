@@ -0,0 +1,54 @@
+# bin/incidence_store.py
+import sys
+import argparse
+import logging
+from heredicalc.core.setup_logging import setup_logging
+from heredicalc.core.setup_data_sources import load_incidence_data_sources
+from heredicalc.incidences.incidence_data_source_handlers.data_source_handler_factory import DataSourceHandlerFactory
+from heredicalc.incidences.columnar_store import ColumnarIncidenceStore, DEFAULT_ROW_GROUP_SIZE, query_incidences
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Build and query the columnar store of an incidence dataset.")
+    parser.add_argument("command", choices=["build", "query"],
+                        help="'build' converts the downloaded CSV files, 'query' reads rows across populations.")
+    parser.add_argument("--dataset", required=True, help="Specify the dataset (e.g., ci5_ix)")
+    parser.add_argument("--row_group_size", type=int, default=DEFAULT_ROW_GROUP_SIZE,
+                        help=f"Maximum rows per row group when building (default: {DEFAULT_ROW_GROUP_SIZE})")
+    parser.add_argument("--populations", nargs='+', help="Restrict a query to these population keys.")
+    parser.add_argument("--phenotypes", nargs='+', help="Restrict a query to these phenotypes (e.g., BreastCancer).")
+    parser.add_argument("--genders", nargs='+', choices=["M", "F"], help="Restrict a query to these genders.")
+    parser.add_argument("--age_class_ids", nargs='+', type=int, help="Restrict a query to these raw age class IDs.")
+    parser.add_argument("--output", default="stdout", help="Output target for queries: 'stdout' or a CSV file path")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    setup_logging(args.log_level)
+    sources = load_incidence_data_sources()["sources"]
+    if args.dataset not in sources:
+        logging.error(f"Dataset '{args.dataset}' not found in sources.yaml.")
+        sys.exit(1)
+    source_config = sources[args.dataset]
+    data_handler = DataSourceHandlerFactory.create_data_source_handler(source_config)
+
+    try:
+        if args.command == "build":
+            data_handler.handle_data()
+            with data_handler.lock.exclusive():
+                ColumnarIncidenceStore.build(data_handler.data_dir, source_config, row_group_size=args.row_group_size)
+            return
+        with data_handler.lock.shared():
+            df = query_incidences(source_config, data_handler.data_dir, populations=args.populations,
+                                  phenotypes=args.phenotypes, genders=args.genders, age_class_ids=args.age_class_ids)
+    except (ImportError, FileNotFoundError) as e:
+        logging.error(e)
+        sys.exit(1)
+    if args.output == "stdout":
+        print(df.to_string(max_rows=None))
+    else:
+        df.to_csv(args.output, index=False)
+
+if __name__ == "__main__":
+    main()
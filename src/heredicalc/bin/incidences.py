@@ -1,10 +1,11 @@
 # bin/incidences.py
 import logging
 import argparse
-from core.setup_logging import setup_logging
-from incidences.incidence_data_source_handlers.data_source_handler_factory import DataSourceHandlerFactory
-from incidences.incidence_models.incidence_data_model_factory import IncidenceDataModelFactory
-from core.setup_data_sources import load_incidence_data_sources
+from heredicalc.core.setup_logging import setup_logging
+from heredicalc.incidences.incidence_data_source_handlers.data_source_handler_factory import DataSourceHandlerFactory
+from heredicalc.incidences.incidence_models.incidence_data_model_factory import IncidenceDataModelFactory
+from heredicalc.incidences.exporters.incidence_exporter_factory import IncidenceExporterFactory
+from heredicalc.core.setup_data_sources import load_incidence_data_sources
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Incidences data handler.")
@@ -12,9 +13,16 @@ def parse_arguments():
     parser.add_argument("--population", help="Specify the population by key number (e.g., 38402499)")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "SILENT"],
                         help="Set the logging level")
-    parser.add_argument("--force-download", action="store_true", help="Force data re-download")
+    parser.add_argument("--force-download", dest="force_download", action="store_const", const="yes", default="no",
+                        help="Force data re-download")
+    parser.add_argument("--refresh-if-changed", dest="force_download", action="store_const", const="if_changed",
+                        help="Re-download the data only if the source changed (one conditional request otherwise)")
     parser.add_argument("--phenotypes", nargs='+', required=True,
                         help="Specify phenotypes to include (e.g., BreastCancer OvarianCancer).")
+    parser.add_argument("--output_format", default="plain",
+                        help="Specify the output format: plain, arrow, parquet or npy. (default: plain)")
+    parser.add_argument("--output_file", default="stdout",
+                        help="Specify output file (a directory for npy; plain writes CSV). (default: stdout)")
     args = parser.parse_args()
     args.phenotypes = list(set(args.phenotypes))  # Remove duplicates
     return args
@@ -43,15 +51,12 @@ def main():
     incidence_table = data_parser.build_incidence_table(df)
     incidence_table = data_parser.add_incidence_rate_column()
     incidence_table = data_parser.add_age_span_column(incidence_table) 
-    #pd.set_option('display.max_rows', None)
-    #pd.set_option('display.max_columns', None)
-    #df_filtered = incidence_table[
-    #    (incidence_table['gender'] == 'F') &
-    #    (incidence_table['age_class_lower'] == 30.0) &
-    #    (incidence_table['age_class_upper'] == 34.0)
-    #]
-    #print (df_filtered)
-    print(incidence_table)
+    # Recorded by exporters that keep provenance (Arrow, Parquet, NPY)
+    incidence_table.attrs["parameters"] = {
+        "dataset": args.dataset, "population": str(data_parser.population), "phenotypes": sorted(args.phenotypes),
+    }
+    exporter = IncidenceExporterFactory.create_exporter(args.output_format, args.output_file)
+    exporter.export_data(incidence_table)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
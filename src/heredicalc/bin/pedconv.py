@@ -12,6 +12,8 @@ def parse_arguments():
     parser.add_argument("--out_format", required=True, help="Specify the export format (e.g., 'segregatr_flb').")
     parser.add_argument("--infile", required=True, help="Path to the input pedigree file.")
     parser.add_argument("--output_file", required=True, help="Path to the output file.")
+    parser.add_argument("--multi_family", action="store_true",
+                        help="Stream a file holding several families (grouped by PedID) and export all of them.")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "SILENT"],
                         help="Set the logging level.")
     return parser.parse_args()
@@ -22,9 +24,18 @@ def main():
     logging.basicConfig(level=args.log_level)
     logging.info("Starting pedigree data conversion.")
 
+    importer = PedigreeImporterFactory.create_importer(args.in_format, args.infile)
+    if args.multi_family:
+        exporter = PedigreeExporterFactory.create_exporter(args.out_format, args.output_file)
+        if not hasattr(exporter, "export_pedigrees"):
+            logging.error(f"Export format '{args.out_format}' does not support multiple families per file.")
+            return
+        count = exporter.export_pedigrees(importer.iter_pedigrees())
+        logging.info(f"{count} pedigrees exported successfully to {args.output_file}")
+        return
+
     # Load the pedigree data using the specified importer
     pedigree = Pedigree()
-    importer = PedigreeImporterFactory.create_importer(args.in_format, args.infile)
     importer.import_data(pedigree)
     logging.info("Data imported successfully.")
 
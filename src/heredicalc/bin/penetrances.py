@@ -1,11 +1,13 @@
 # bin/penetrances.py
+import os
 import argparse
 import logging
 import pandas as pd
 import numpy as np
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from heredicalc.core.setup_logging import setup_logging
-from heredicalc.core.setup_data_sources import load_incidence_data_sources
+from heredicalc.core.run_context import RunContext, current_context
 from heredicalc.incidences.incidence_data_source_handlers.data_source_handler_factory import DataSourceHandlerFactory
 from heredicalc.incidences.incidence_models.incidence_data_model_factory import IncidenceDataModelFactory
 from heredicalc.cumulative_risks.cumulative_risk_model_factory import CumulativeRiskModelFactory
@@ -13,6 +15,9 @@ from heredicalc.penetrances.crhf_models.crhf_model_factory import CRHFModelFacto
 from heredicalc.penetrances.relative_risk_models.relative_risk_model_factory import RelativeRiskModelFactory
 from heredicalc.penetrances.penetrance_models.penetrance_model_factory import PenetranceModelFactory
 from heredicalc.penetrances.exporters.penetrance_exporter_factory import PenetranceExporterFactory
+from heredicalc.penetrances.liability_bundle import hash_dataframe
+from heredicalc.incidences.shared_incidence_table import SharedIncidenceTable
+from heredicalc.compute_backends.compute_backend_factory import ComputeBackendFactory
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Calculate penetrance for specified parameters.")
@@ -20,8 +25,10 @@ def parse_arguments():
     parser.add_argument("--population", help="Specify the population by key number (e.g., 38402499)")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "SILENT"],
                         help="Set the logging level")
-    parser.add_argument("--force_download", type=str, choices=["no", "yes", "ask"], default="no", 
-                        help="Force fresh download of incidence data, if applicalbe 'no' (default), 'yes' to force download, or 'ask' to confirm.")
+    parser.add_argument("--force_download", type=str, choices=["no", "yes", "ask", "if_changed"], default="no", 
+                        help="Force fresh download of incidence data, if applicalbe 'no' (default), 'yes' to force download, 'ask' to confirm, or 'if_changed' to download only changed data.")
+    parser.add_argument("--refresh-if-changed", dest="force_download", action="store_const", const="if_changed",
+                        help="Check the incidence data source with one conditional request and download only if it changed.")
     parser.add_argument("--phenotypes", nargs='+', required=True,
                         help="Specify phenotypes to include (e.g., BreastCancer OvarianCancer).")
     parser.add_argument("--crhf_model", default="constant", help="Specify the CRHF model to use (default: constant)")
@@ -29,32 +36,64 @@ def parse_arguments():
     parser.add_argument("--penetrance_model", default="uniform_survival", help="Specify the penetrance model to use (default: uniform_survival)")
     parser.add_argument("--cr_model", default="simple", help="Specify the cumulative risk model to use (default: simple)")
     parser.add_argument("--gene", required=True, help="Specify the gene for CRHF calculation")
-    parser.add_argument("--output_format", default="plain", help="Specify the output format. (default: plain)")
+    parser.add_argument("--output_format", default="plain", help="Specify the output format: plain, flb, bundle, arrow, parquet or npy. (default: plain)")
     parser.add_argument("--output_file", default="stdout", help="Specify output file. (default: stdout)")
+    parser.add_argument("--bootstrap", type=int, default=0,
+                        help="Number of Poisson bootstrap replicates for uncertainty intervals (default: 0, no intervals)")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the intervals (default: 0.95)")
+    parser.add_argument("--seed", type=int, help="Random seed for the bootstrap replicates.")
+    parser.add_argument("--backend", default="pandas", choices=["pandas", "polars"],
+                        help="Compute backend of the table stages: pandas (default) or polars (requires polars).")
+    parser.add_argument("--non-interactive", dest="interactive", action="store_false",
+                        help="Never ask on the terminal: '--force_download ask' keeps the existing data.")
     return parser.parse_args()
 
-def run_penetrance_calculation(dataset, population, log_level="INFO", force_download=False, phenotypes=None,
-                               crhf_model="constant", rr_model="static_lookup", penetrance_model="uniform_survival",
-                               cr_model="simple", gene=None, output_format="plain", output_file="stdout"):
-    # Load dataset configuration
-    sources = load_incidence_data_sources()["sources"]
-    if dataset not in sources:
-        logging.error(f"Dataset '{dataset}' not found in sources.yaml.")
-        return
+def build_incidence_data(source_config, population=None, phenotypes=None, force_download=False, backend="pandas"):
+    """
+    Makes sure the incidence data is available and builds the incidence table for the selected phenotypes.
 
-    source_config = sources[dataset]
+    Parameters:
+        source_config (dict): Configuration of the dataset from sources.yaml.
+        population (str): Population key number, or None for the dataset's default population.
+        phenotypes (list): Canonical phenotype names to include.
+        force_download: Passed on to the data source handler.
+        backend (str or ComputeBackend): Compute backend name or instance (default: pandas).
+
+    Returns:
+        tuple: (incidence DataFrame with age spans and incidence rates, population key).
+    """
     data_handler = DataSourceHandlerFactory.create_data_source_handler(source_config, force_download=force_download)
     data_handler.handle_data()
 
     # Load and process incidence data
     data_parser = IncidenceDataModelFactory.create_incidence_model(source_config, population=population)
-    df = data_parser.parse_data()
-    df = data_parser.filter_by_phenotypes(df, phenotypes)
-    df = data_parser.build_incidence_table(df)
-    df = data_parser.add_age_span_column(df)
-    df = data_parser.add_incidence_rate_column()
-    logging.info(f"Data for {dataset} and population {data_parser.population} processed successfully.")
+    if isinstance(backend, str):
+        backend = ComputeBackendFactory.create_backend(backend)
+    df = backend.build_incidence_table(data_parser, phenotypes)
+    return df, data_parser.population
 
+def calculate_liability_classes(df, phenotypes, gene, crhf_model="constant", rr_model="static_lookup",
+                                penetrance_model="uniform_survival", cr_model="simple", backend="pandas"):
+    """
+    Calculates the penetrances of all liability classes from an incidence table.
+
+    The incidence table is not modified (the lambda and penetrance columns are added to new frames),
+    so one table, e.g. a shared memory one, can be reused for several calculations without copying it.
+    `crhf_model` and `rr_model` may be given as model names or as already created model instances.
+
+    Parameters:
+        df (pd.DataFrame): Incidence table as returned by `build_incidence_data`.
+        phenotypes (list): Canonical phenotype names to include.
+        gene (str): Gene symbol.
+        crhf_model (str or CRHFModel): CRHF model name or instance.
+        rr_model (str or RelativeRiskModel): Relative risk model name or instance.
+        penetrance_model (str): Penetrance model name.
+        cr_model (str): Cumulative risk model name.
+        backend (str or ComputeBackend): Compute backend of the lambda calculation (default: pandas).
+
+    Returns:
+        pd.DataFrame: Liability classes with penetrances for non-carriers, heterozygotes and homozygotes.
+    """
     # Initialize cumulative risk model
     cr_model = CumulativeRiskModelFactory.create_model(cr_model, df)
         # DataFrame for cumulative risks
@@ -98,27 +137,15 @@ def run_penetrance_calculation(dataset, population, log_level="INFO", force_down
 
     cumulative_risk_df = pd.DataFrame(cumulative_risks)
 
-    crhf_model = CRHFModelFactory.create_model(crhf_model, gene, df)
-    rr_model = RelativeRiskModelFactory.create_model(rr_model, gene, df)
+    if isinstance(crhf_model, str):
+        crhf_model = CRHFModelFactory.create_model(crhf_model, gene, df)
+    if isinstance(rr_model, str):
+        rr_model = RelativeRiskModelFactory.create_model(rr_model, gene, df)
 
     # Calculate lambda values and add to central_df
-    for idx, row in df.iterrows():
-        crhf = crhf_model.calculate_crhf(row['gender'], row['age_class_upper'])
-        rr_het, rr_hom = rr_model.calculate_relative_risk(
-            age=row['age_class_upper'],
-            phenotype=row['phenotype'],
-            gender=row['gender']
-        )
-        
-        # Calculate lambda values
-        lambda_nc = row['incidence_rate'] / ((1 - crhf) + crhf * rr_het)
-        lambda_het = lambda_nc * rr_het
-        lambda_hom = lambda_nc * rr_hom if not pd.isna(rr_hom) else 0
-
-        # Store lambda values in the central DataFrame
-        df.loc[idx, 'lambda_nc'] = lambda_nc
-        df.loc[idx, 'lambda_het'] = lambda_het
-        df.loc[idx, 'lambda_hom'] = lambda_hom
+    if isinstance(backend, str):
+        backend = ComputeBackendFactory.create_backend(backend)
+    df = backend.add_lambda_columns(df, crhf_model, rr_model)
  
     #print(cumulative_risk_df)
 
@@ -165,6 +192,173 @@ def run_penetrance_calculation(dataset, population, log_level="INFO", force_down
 
     # Output final liability class penetrance data
     #print (liability_classes_df)
+    return liability_classes_df
+
+def _liability_replicates(df, cumulative_risk_df, incidence_rates, crhf_model, rr_model, penetrance_model):
+    """
+    Vectorized penetrance calculation for a batch of incidence rate replicates.
+
+    Follows `calculate_liability_classes` step by step (lambdas, cumulative risks, penetrances),
+    with every step applied to all replicates at once.
+
+    Parameters:
+        df (pd.DataFrame): Incidence table the point estimate was calculated from.
+        cumulative_risk_df (pd.DataFrame): Unaffected (cumulative risk) rows of the point estimate.
+        incidence_rates (np.ndarray): Incidence rates of shape (replicates, incidence classes).
+        crhf_model (CRHFModel): CRHF model instance.
+        rr_model (RelativeRiskModel): Relative risk model instance.
+        penetrance_model (PenetranceModel): Penetrance model instance.
+
+    Returns:
+        np.ndarray: Penetrances of shape (replicates, liability classes, 3), in the row order of
+        the liability class table.
+    """
+    # CRHF and relative risks do not depend on the incidence rates, so they are looked up once
+    crhf = np.array([crhf_model.calculate_crhf(gender, age) for gender, age in zip(df['gender'], df['age_class_upper'])],
+                    dtype=float)
+    relative_risks = np.array([
+        rr_model.calculate_relative_risk(age=age, phenotype=phenotype, gender=gender)
+        for gender, phenotype, age in zip(df['gender'], df['phenotype'], df['age_class_upper'])
+    ], dtype=float)
+    rr_het = relative_risks[:, 0]
+    rr_hom = np.nan_to_num(relative_risks[:, 1])
+    genotype_factors = np.stack([np.ones_like(rr_het), rr_het, rr_hom], axis=1)
+    lambda_nc = incidence_rates / ((1 - crhf) + crhf * rr_het)
+    lambdas = lambda_nc[:, :, np.newaxis] * genotype_factors
+
+    # Weights of the lambdas summed up to each cumulative risk age class
+    genders = df['gender'].to_numpy()
+    age_uppers = df['age_class_upper'].to_numpy()
+    weights = np.stack([
+        np.where((genders == gender) & (age_uppers <= age_upper), df['age_span'].to_numpy(dtype=float), 0.0)
+        for gender, age_upper in zip(cumulative_risk_df['gender'], cumulative_risk_df['age_class_upper'])
+    ], axis=1)
+    cumulative_risks = 1 - np.exp(-np.einsum('rng,nk->rkg', np.nan_to_num(lambdas), weights))
+
+    penetrances = penetrance_model.calculate_penetrance_replicates(df, cumulative_risk_df, lambdas, cumulative_risks)
+    return np.concatenate([cumulative_risks, penetrances], axis=1)
+
+def bootstrap_liability_classes(df, phenotypes, gene, replicates=1000, confidence=0.95, seed=None,
+                                crhf_model="constant", rr_model="static_lookup",
+                                penetrance_model="uniform_survival", cr_model="simple"):
+    """
+    Calculates liability classes with Poisson bootstrap intervals for all penetrances.
+
+    The cases of every incidence class are resampled from a Poisson distribution with the observed
+    count as mean, and all replicates are pushed through the lambda, cumulative risk and penetrance
+    calculation as array operations. Point estimates are those of `calculate_liability_classes`.
+
+    Parameters:
+        df (pd.DataFrame): Incidence table as returned by `build_incidence_data` (with 'cases' and
+            'person_years' columns).
+        phenotypes (list): Canonical phenotype names to include.
+        gene (str): Gene symbol.
+        replicates (int): Number of bootstrap replicates.
+        confidence (float): Confidence level of the percentile intervals.
+        seed (int): Random seed, for reproducible intervals.
+        crhf_model, rr_model, penetrance_model, cr_model: As for `calculate_liability_classes`.
+
+    Returns:
+        pd.DataFrame: Liability classes with additional '<penetrance column>_ci_lower' and
+        '<penetrance column>_ci_upper' columns.
+
+    Raises:
+        ValueError: If the incidence table has no case counts or the parameters are invalid.
+        NotImplementedError: If the penetrance model has no vectorized implementation.
+    """
+    if not {'cases', 'person_years'}.issubset(df.columns):
+        raise ValueError("Bootstrap intervals need an incidence table with 'cases' and 'person_years' columns.")
+    if replicates < 1 or not 0 < confidence < 1:
+        raise ValueError("Replicates must be positive and confidence between 0 and 1.")
+    if isinstance(crhf_model, str):
+        crhf_model = CRHFModelFactory.create_model(crhf_model, gene, df)
+    if isinstance(rr_model, str):
+        rr_model = RelativeRiskModelFactory.create_model(rr_model, gene, df)
+    liability_classes_df = calculate_liability_classes(
+        df, phenotypes, gene, crhf_model=crhf_model, rr_model=rr_model,
+        penetrance_model=penetrance_model, cr_model=cr_model
+    )
+    cumulative_risk_df = liability_classes_df.iloc[:len(liability_classes_df) - len(df)]
+    penetrance_model = PenetranceModelFactory.create_model(penetrance_model, df, cumulative_risk_df)
+
+    rng = np.random.default_rng(seed)
+    person_years = df['person_years'].to_numpy(dtype=float)
+    cases = rng.poisson(df['cases'].to_numpy(dtype=float), size=(replicates, len(df)))
+    incidence_rates = np.divide(cases, person_years, out=np.zeros(cases.shape), where=person_years > 0)
+    penetrances = _liability_replicates(df, cumulative_risk_df, incidence_rates, crhf_model, rr_model, penetrance_model)
+
+    alpha = (1 - confidence) / 2
+    lower, upper = np.percentile(penetrances, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    for position, column in enumerate(['penetrance_nc', 'penetrance_het', 'penetrance_hom']):
+        liability_classes_df[f"{column}_ci_lower"] = lower[:, position]
+        liability_classes_df[f"{column}_ci_upper"] = upper[:, position]
+    liability_classes_df.attrs["bootstrap"] = {"replicates": replicates, "confidence": confidence, "seed": seed}
+    logging.info(f"Bootstrap intervals calculated from {replicates} replicates.")
+    return liability_classes_df
+
+_worker_table = None
+
+def _attach_worker_table(handle):
+    # Process pool initializer: attach to the shared incidence table once per worker
+    global _worker_table
+    _worker_table = SharedIncidenceTable.attach(handle)
+
+def _calculate_shared_liability_classes(phenotypes, parameters):
+    return calculate_liability_classes(_worker_table.to_dataframe(), phenotypes, **parameters)
+
+def calculate_liability_classes_parallel(df, phenotypes, parameter_sets, processes=None):
+    """
+    Calculates liability classes for several genes or model combinations in a process pool.
+
+    The incidence table is published once into shared memory; workers attach to it when they
+    start, so tasks only carry their parameters.
+
+    Parameters:
+        df (pd.DataFrame): Incidence table as returned by `build_incidence_data`.
+        phenotypes (list): Canonical phenotype names to include.
+        parameter_sets (list): Keyword arguments for `calculate_liability_classes` per task,
+            e.g. [{"gene": "BRCA1"}, {"gene": "BRCA2", "penetrance_model": "uniform"}].
+        processes (int): Number of worker processes (default: number of CPUs).
+
+    Returns:
+        list: Liability class DataFrames, in the order of `parameter_sets`.
+    """
+    with SharedIncidenceTable.publish(df) as table:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_attach_worker_table,
+                                 initargs=(table.handle,)) as executor:
+            futures = [executor.submit(_calculate_shared_liability_classes, phenotypes, parameters)
+                       for parameters in parameter_sets]
+            return [future.result() for future in futures]
+
+def _incidence_table(dataset, population, phenotypes, force_download, incidence_tables, backend):
+    # Returns (incidence table, population, phenotypes) of a dataset, or None for unknown datasets.
+    # `incidence_tables` (optional dict) keeps the incidence tables built here for further calls,
+    # e.g. when the liabilities of several genes are calculated from the same data
+    # Dataset configuration of the run context (see RunContext)
+    sources = current_context().sources
+    if dataset not in sources:
+        logging.error(f"Dataset '{dataset}' not found in sources.yaml.")
+        return None
+
+    source_config = sources[dataset]
+    # No phenotypes selected: all phenotypes mapped for the dataset
+    phenotypes = sorted(phenotypes) if phenotypes else sorted(source_config.get("phenotype_mappings", {}))
+    incidence_key = (dataset, str(population), tuple(sorted(phenotypes)))
+    if incidence_tables is not None and incidence_key in incidence_tables:
+        df, population = incidence_tables[incidence_key]
+    else:
+        df, population = build_incidence_data(source_config, population, phenotypes, force_download, backend)
+        if incidence_tables is not None:
+            incidence_tables[incidence_key] = (df, population)
+        logging.info(f"Data for {dataset} and population {population} processed successfully.")
+    return df, population, phenotypes
+
+def _export_liability_classes(liability_classes_df, df, parameters, output_format, output_file):
+    # Records the provenance (kept by exporters such as liability bundles) and exports the liability classes
+    liability_classes_df.attrs["parameters"] = parameters
+    if "bootstrap" in liability_classes_df.attrs:
+        liability_classes_df.attrs["parameters"]["bootstrap"] = liability_classes_df.attrs["bootstrap"]
+    liability_classes_df.attrs["input_hashes"] = {"incidence_table": hash_dataframe(df)}
 
     # Create the exporter and export data
     logging.debug(f"Exporting data in {output_format} format to {output_file}.")
@@ -175,24 +369,95 @@ def run_penetrance_calculation(dataset, population, log_level="INFO", force_down
     exporter = PenetranceExporterFactory.create_exporter(output_format, output_file)
     result = exporter.export_data(liability_classes_df)
     logging.debug(f"Export completed. (result:{result})")
-    return result 
+    return result
+
+def run_penetrance_calculation(dataset, population, log_level="INFO", force_download=False, phenotypes=None,
+                               crhf_model="constant", rr_model="static_lookup", penetrance_model="uniform_survival",
+                               cr_model="simple", gene=None, output_format="plain", output_file="stdout",
+                               bootstrap=0, confidence=0.95, seed=None, incidence_tables=None, backend="pandas"):
+    # `incidence_tables` (optional dict) keeps the incidence tables built here for further calls,
+    # e.g. when the liabilities of several genes are calculated from the same data
+    backend = ComputeBackendFactory.create_backend(backend)
+    incidence = _incidence_table(dataset, population, phenotypes, force_download, incidence_tables, backend)
+    if incidence is None:
+        return
+    df, population, phenotypes = incidence
+
+    if bootstrap:
+        liability_classes_df = bootstrap_liability_classes(
+            df, phenotypes, gene, replicates=bootstrap, confidence=confidence, seed=seed, crhf_model=crhf_model,
+            rr_model=rr_model, penetrance_model=penetrance_model, cr_model=cr_model
+        )
+    else:
+        liability_classes_df = calculate_liability_classes(
+            df, phenotypes, gene, crhf_model=crhf_model, rr_model=rr_model,
+            penetrance_model=penetrance_model, cr_model=cr_model, backend=backend
+        )
+    parameters = {
+        "dataset": dataset, "population": str(population), "phenotypes": sorted(phenotypes), "gene": gene,
+        "crhf_model": crhf_model, "rr_model": rr_model, "penetrance_model": penetrance_model, "cr_model": cr_model,
+    }
+    return _export_liability_classes(liability_classes_df, df, parameters, output_format, output_file)
+
+def run_panel_penetrance_calculation(dataset, population, genes, output_files, force_download=False, phenotypes=None,
+                                     crhf_model="constant", rr_model="static_lookup",
+                                     penetrance_model="uniform_survival", cr_model="simple", output_format="bundle",
+                                     incidence_tables=None, processes=None):
+    """
+    Calculates the liability classes of several genes from one incidence table in a process pool
+    (see calculate_liability_classes_parallel) and exports them, like run_penetrance_calculation.
+
+    Parameters:
+        dataset (str): The dataset name.
+        population (str): The population code (default: that of the dataset).
+        genes (list): The genes.
+        output_files (dict): Mapping of gene to output file.
+        incidence_tables (dict): Incidence tables shared with other calls (see run_penetrance_calculation).
+        processes (int): Number of worker processes (default: one per gene, at most the number of CPUs).
+
+    Returns:
+        dict: Mapping of gene to the export result, or None if the dataset is unknown.
+    """
+    incidence = _incidence_table(dataset, population, phenotypes, force_download, incidence_tables,
+                                 ComputeBackendFactory.create_backend("pandas"))
+    if incidence is None:
+        return None
+    df, population, phenotypes = incidence
+    models = {"crhf_model": crhf_model, "rr_model": rr_model, "penetrance_model": penetrance_model,
+              "cr_model": cr_model}
+    processes = processes or min(len(genes), os.cpu_count() or 1)
+    logging.info(f"Calculating the liability classes of {len(genes)} genes in {processes} processes.")
+    liability_tables = calculate_liability_classes_parallel(df, phenotypes, [{"gene": gene, **models} for gene in genes],
+                                                            processes=processes)
+    results = {}
+    for gene, liability_classes_df in zip(genes, liability_tables):
+        parameters = {"dataset": dataset, "population": str(population), "phenotypes": sorted(phenotypes),
+                      "gene": gene, **models}
+        results[gene] = _export_liability_classes(liability_classes_df, df, parameters, output_format,
+                                                  output_files[gene])
+    return results
 
 def main():
     args = parse_arguments()
-    result = run_penetrance_calculation(
-        dataset=args.dataset,
-        population=args.population,
-        log_level=args.log_level,
-        force_download=args.force_download,
-        phenotypes=args.phenotypes,
-        crhf_model=args.crhf_model,
-        rr_model=args.rr_model,
-        penetrance_model=args.penetrance_model,
-        cr_model=args.cr_model,
-        gene=args.gene,
-        output_format=args.output_format,
-        output_file=args.output_file
-    )
+    with RunContext(interactive=args.interactive).activate():
+        result = run_penetrance_calculation(
+            dataset=args.dataset,
+            population=args.population,
+            log_level=args.log_level,
+            force_download=args.force_download,
+            phenotypes=args.phenotypes,
+            crhf_model=args.crhf_model,
+            rr_model=args.rr_model,
+            penetrance_model=args.penetrance_model,
+            cr_model=args.cr_model,
+            gene=args.gene,
+            output_format=args.output_format,
+            output_file=args.output_file,
+            bootstrap=args.bootstrap,
+            confidence=args.confidence,
+            seed=args.seed,
+            backend=args.backend
+        )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+# bin/prefetch.py
+import sys
+import time
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from heredicalc.core.setup_logging import setup_logging
+from heredicalc.core.setup_data_sources import load_incidence_data_sources
+from heredicalc.incidences.incidence_data_source_handlers.data_source_handler_factory import DataSourceHandlerFactory
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Download and extract the incidence data of all configured datasets in parallel.")
+    parser.add_argument("--datasets", nargs='+', help="Only prefetch these datasets (default: all datasets in sources.yaml)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of datasets fetched at the same time (default: 4)")
+    parser.add_argument("--force_download", type=str, choices=["no", "yes", "if_changed"], default="no",
+                        help="'no' (default) skips datasets already present, 'yes' downloads them again, "
+                             "'if_changed' downloads only changed data.")
+    parser.add_argument("--refresh-if-changed", dest="force_download", action="store_const", const="if_changed",
+                        help="Same as --force_download if_changed.")
+    parser.add_argument("--build-caches", action="store_true",
+                        help="Build the derived caches (columnar store) of every dataset afterwards (requires pyarrow).")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level")
+    return parser.parse_args()
+
+def prefetch_dataset(source_config, force_download="no", build_caches=False):
+    """
+    Makes the data of one dataset available, as the first CLI run on a node would.
+
+    Parameters:
+        source_config (dict): Configuration of the dataset from sources.yaml.
+        force_download (str): 'no', 'yes' or 'if_changed' (see DataSourceHandler.handle_data).
+        build_caches (bool): Also build the columnar store of the dataset.
+
+    Returns:
+        str: 'downloaded' or 'up to date'.
+    """
+    data_handler = DataSourceHandlerFactory.create_data_source_handler(source_config, force_download=force_download)
+    data_handler.handle_data()
+    if build_caches:
+        from heredicalc.incidences.columnar_store import ColumnarIncidenceStore
+        with data_handler.lock.exclusive():
+            ColumnarIncidenceStore.build(data_handler.data_dir, source_config)
+    return "downloaded" if data_handler.fetched_url else "up to date"
+
+def _prefetch_group(datasets, sources, force_download, build_caches):
+    # Datasets sharing a data directory are fetched one after the other
+    results = {}
+    for dataset in datasets:
+        start = time.monotonic()
+        try:
+            status = prefetch_dataset(sources[dataset], force_download, build_caches)
+            results[dataset] = (True, status, time.monotonic() - start)
+        except Exception as e:
+            results[dataset] = (False, f"{type(e).__name__}: {e}", time.monotonic() - start)
+    return results
+
+def prefetch_datasets(sources, datasets=None, workers=4, force_download="no", build_caches=False):
+    """
+    Prefetches several datasets with a bounded thread pool, logging aggregate progress.
+
+    Parameters:
+        sources (dict): The "sources" mapping of sources.yaml.
+        datasets (list): Dataset names (default: all).
+        workers (int): Maximum number of concurrent downloads.
+        force_download (str): Passed on to the data source handlers.
+        build_caches (bool): Also build the derived caches.
+
+    Returns:
+        dict: Mapping of dataset name to (success, status or error message, seconds).
+    """
+    datasets = list(datasets or sources)
+    groups = {}
+    for dataset in datasets:
+        groups.setdefault(sources[dataset]["data_dir"], []).append(dataset)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(_prefetch_group, group, sources, force_download, build_caches)
+                   for group in groups.values()]
+        for future in as_completed(futures):
+            for dataset, (success, status, seconds) in future.result().items():
+                results[dataset] = (success, status, seconds)
+                failed = sum(not result[0] for result in results.values())
+                logging.info(f"[{len(results)}/{len(datasets)}] {dataset}: {status if success else 'FAILED'} "
+                             f"({seconds:.1f} s){f', {failed} failed so far' if failed else ''}")
+    return {dataset: results[dataset] for dataset in datasets}
+
+def main():
+    args = parse_arguments()
+    setup_logging(args.log_level)
+    sources = load_incidence_data_sources()["sources"]
+    unknown = [dataset for dataset in args.datasets or [] if dataset not in sources]
+    if unknown:
+        logging.error(f"Datasets not found in sources.yaml: {', '.join(unknown)}")
+        sys.exit(1)
+
+    results = prefetch_datasets(sources, args.datasets, args.workers, args.force_download, args.build_caches)
+    failed = [dataset for dataset, (success, _, _) in results.items() if not success]
+    for dataset, (success, status, seconds) in results.items():
+        print(f"{dataset}\t{'ok' if success else 'failed'}\t{seconds:.1f}s\t{status}")
+    if failed:
+        logging.error(f"{len(failed)} of {len(results)} datasets could not be prefetched: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# bin/results.py
+import sys
+import argparse
+import logging
+from pathlib import Path
+from heredicalc.core.setup_logging import setup_logging
+from heredicalc.core.run_context import current_context
+from heredicalc.core.result_store import ResultStore
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Query the SQLite store of liability tables and FLB results.")
+    parser.add_argument("--store", type=Path,
+                        help="Path to the result store (default: cache/results.sqlite)")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query = subparsers.add_parser("query", help="List stored FLB results or liability tables, newest first.")
+    query.add_argument("--kind", choices=["flb", "liabilities"], default="flb",
+                       help="'flb' (default) lists FLB results, 'liabilities' liability tables.")
+    query.add_argument("--dataset", help="Only results for this dataset")
+    query.add_argument("--population", help="Only results for this population")
+    query.add_argument("--gene", help="Only results for this gene")
+    query.add_argument("--phenotypes", nargs='+', help="Only results for exactly these phenotypes")
+    query.add_argument("--pedigree-hash", help="Only FLB results for this pedigree fingerprint")
+    query.add_argument("--afreq", type=float, help="Only FLB results for this allele frequency")
+    query.add_argument("--since", help="Only results created at or after this time (e.g. 2026-09-01)")
+    query.add_argument("--until", help="Only results created before this time")
+    query.add_argument("--limit", type=int, help="Maximum number of results")
+
+    export = subparsers.add_parser("export", help="Write a stored liability table to a bundle file.")
+    export.add_argument("fingerprint", help="Fingerprint of the liability table (see 'query --kind liabilities')")
+    export.add_argument("--output", type=Path, required=True, help="Path of the bundle file to write")
+    return parser.parse_args()
+
+def query_results(store, args):
+    filters = {"dataset": args.dataset, "population": args.population, "gene": args.gene,
+               "phenotypes": ",".join(sorted(args.phenotypes)) if args.phenotypes else None}
+    if args.kind == "liabilities":
+        return store.query_liability_tables(since=args.since, until=args.until, limit=args.limit, **filters)
+    return store.query_flb(since=args.since, until=args.until, limit=args.limit,
+                           pedigree_hash=args.pedigree_hash, afreq=args.afreq, **filters)
+
+def main():
+    args = parse_arguments()
+    setup_logging(args.log_level)
+    args.store = args.store or current_context().result_store_file
+    if not args.store.exists():
+        logging.error(f"Result store {args.store} not found.")
+        sys.exit(1)
+    with ResultStore(args.store) as store:
+        if args.command == "query":
+            print(query_results(store, args).to_csv(sep="\t", index=False), end="")
+            return
+        bundle = store.liability_bundle(args.fingerprint)
+        if bundle is None:
+            logging.error(f"No liability table with fingerprint {args.fingerprint} in {args.store}.")
+            sys.exit(1)
+        args.output.write_bytes(bundle)
+        logging.info(f"Liability table written to {args.output}")
+
+if __name__ == "__main__":
+    main()
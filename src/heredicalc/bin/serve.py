@@ -0,0 +1,41 @@
+# bin/serve.py
+import argparse
+import logging
+from heredicalc.core.setup_logging import setup_logging
+from heredicalc.service.heredicalc_service import HeredicalcService
+from heredicalc.service.server import create_server
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Run a local heredicalc service that keeps datasets and liability tables in memory.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on (default: 8765)")
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of a TCP port")
+    parser.add_argument("--cache_size", type=int, default=32,
+                        help="Maximum number of incidence tables, models and liability tables kept in memory (default: 32)")
+    parser.add_argument("--r_sessions", type=int, default=1,
+                        help="Number of R worker sessions evaluating FLB requests in parallel (default: 1)")
+    parser.add_argument("--force_download", type=str, choices=["no", "yes", "if_changed"], default="no",
+                        help="Force fresh download of incidence data when a dataset is first loaded (default: no)")
+    parser.add_argument("--refresh-if-changed", dest="force_download", action="store_const", const="if_changed",
+                        help="When a dataset is first loaded, download its incidence data only if the source changed.")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+                        help="Set the logging level")
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    setup_logging(args.log_level)
+
+    service = HeredicalcService(cache_size=args.cache_size, r_sessions=args.r_sessions, force_download=args.force_download)
+    server = create_server(service, host=args.host, port=args.port, socket_path=args.socket)
+    logging.info(f"heredicalc service listening on {args.socket or f'{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Shutting down heredicalc service.")
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# compute_backends/compute_backend.py
+from abc import ABC, abstractmethod
+
+class ComputeBackend(ABC):
+    """
+    Abstract base class for the engines running the table stages of the pipeline: building the
+    incidence table and the genotype-specific incidence rates (lambdas) of every incidence class.
+
+    All backends take and return pandas DataFrames with identical content, so the cumulative risk
+    and penetrance models work unchanged on top of any backend.
+    """
+
+    name = None
+
+    @abstractmethod
+    def build_incidence_table(self, data_parser, phenotypes):
+        """
+        Builds the incidence table of the parser's population for the selected phenotypes.
+
+        Parameters:
+            data_parser (IncidenceDataModel): Incidence model of the dataset and population.
+            phenotypes (list): Canonical phenotype names to include.
+
+        Returns:
+            pd.DataFrame: Incidence table with age spans and incidence rates, indexed by 'incidence_class'.
+        """
+        raise NotImplementedError("Subclasses should implement this method (build_incidence_table).")
+
+    @abstractmethod
+    def add_lambda_columns(self, df, crhf_model, rr_model):
+        """
+        Adds the incidence rates of non-carriers, heterozygotes and homozygotes ('lambda_nc',
+        'lambda_het', 'lambda_hom') to an incidence table.
+
+        Parameters:
+            df (pd.DataFrame): Incidence table as returned by `build_incidence_table` (not modified,
+                as it may be shared between calls).
+            crhf_model (CRHFModel): CRHF model instance.
+            rr_model (RelativeRiskModel): Relative risk model instance.
+
+        Returns:
+            pd.DataFrame: Copy of the incidence table with the lambda columns.
+        """
+        raise NotImplementedError("Subclasses should implement this method (add_lambda_columns).")
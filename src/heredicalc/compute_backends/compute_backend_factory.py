@@ -0,0 +1,33 @@
+# compute_backends/compute_backend_factory.py
+import logging
+from heredicalc.core.plugin_registry import PluginRegistry
+
+COMPUTE_BACKENDS = PluginRegistry("compute_backends", {
+    "pandas": ".pandas_compute_backend:PandasComputeBackend",
+    "polars": ".polars_compute_backend:PolarsComputeBackend",
+}, package=__package__)
+
+class ComputeBackendFactory:
+    """
+    Factory class to create the compute backend of the incidence and penetrance pipeline.
+    """
+    @staticmethod
+    def create_backend(backend_type="pandas"):
+        """
+        Create a compute backend based on the specified type.
+
+        Parameters:
+            backend_type (str): The type of backend ("pandas" or "polars").
+
+        Returns:
+            ComputeBackend: An instance of the backend.
+
+        Raises:
+            ValueError: If the specified backend type is not supported.
+            ImportError: If the backend's library is not installed.
+        """
+        if backend_type not in COMPUTE_BACKENDS:
+            raise ValueError(f"Unknown compute backend: {backend_type}")
+        backend_class = COMPUTE_BACKENDS.get(backend_type)
+        logging.debug(f"Creating {backend_class.__name__} instance.")
+        return backend_class()
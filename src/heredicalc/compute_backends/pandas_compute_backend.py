@@ -0,0 +1,34 @@
+# compute_backends/pandas_compute_backend.py
+import pandas as pd
+from .compute_backend import ComputeBackend
+
+class PandasComputeBackend(ComputeBackend):
+    """The reference backend: the incidence models' own pandas methods, row by row."""
+
+    name = "pandas"
+
+    def build_incidence_table(self, data_parser, phenotypes):
+        df = data_parser.parse_data(data_parser.load_raw_data(phenotypes))
+        df = data_parser.filter_by_phenotypes(df, phenotypes)
+        df = data_parser.build_incidence_table(df)
+        df = data_parser.add_age_span_column(df)
+        return data_parser.add_incidence_rate_column(df)
+
+    def add_lambda_columns(self, df, crhf_model, rr_model):
+        lambdas = {'lambda_nc': [], 'lambda_het': [], 'lambda_hom': []}
+        for _, row in df.iterrows():
+            crhf = crhf_model.calculate_crhf(row['gender'], row['age_class_upper'])
+            rr_het, rr_hom = rr_model.calculate_relative_risk(
+                age=row['age_class_upper'],
+                phenotype=row['phenotype'],
+                gender=row['gender']
+            )
+
+            # Calculate lambda values
+            lambda_nc = row['incidence_rate'] / ((1 - crhf) + crhf * rr_het)
+            lambdas['lambda_nc'].append(lambda_nc)
+            lambdas['lambda_het'].append(lambda_nc * rr_het)
+            lambdas['lambda_hom'].append(lambda_nc * rr_hom if not pd.isna(rr_hom) else 0)
+
+        # Lambda values are added to a copy of the incidence table
+        return df.assign(**{column: pd.Series(values, index=df.index, dtype=float) for column, values in lambdas.items()})
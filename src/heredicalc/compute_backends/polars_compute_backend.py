@@ -0,0 +1,143 @@
+# compute_backends/polars_compute_backend.py
+import logging
+import numpy as np
+import pandas as pd
+from heredicalc.core.file_lock import data_dir_lock
+from heredicalc.incidences.columnar_store import ColumnarIncidenceStore
+from heredicalc.incidences.incidence_models.ci5_detailed_incidence_model import CI5DetailedIncidenceModel
+from .compute_backend import ComputeBackend
+from .pandas_compute_backend import PandasComputeBackend
+
+def _require_polars():
+    # polars is an optional dependency, loaded when the backend is created
+    try:
+        import polars
+    except ImportError:
+        raise ImportError("The polars compute backend needs polars (pip install polars).")
+    return polars
+
+class PolarsComputeBackend(ComputeBackend):
+    """
+    Runs the table stages as lazy Polars query plans, on all cores.
+
+    Results equal those of the pandas backend value for value: the plans only use exact
+    operations (filters, joins, integer sums, element-wise arithmetic in the same order), and
+    age bounds, CRHF values and relative risks are looked up with the models' own methods.
+    Incidence models other than the CI5 detailed model are run by the pandas backend.
+    """
+
+    name = "polars"
+
+    def __init__(self):
+        self.pl = _require_polars()
+
+    def _column(self, data_parser, column_name):
+        # Same column specifications as IncidenceDataModel.get_column: position or header name
+        col_spec = data_parser.column_mappings.get(column_name)
+        if isinstance(col_spec, int) and col_spec >= 0:
+            return self.pl.nth(col_spec)
+        if isinstance(col_spec, str):
+            if not data_parser.source_config.get("has_header", False):
+                raise ValueError(f"The dataset for '{column_name}' requires a header row, which is missing.")
+            return self.pl.col(col_spec)
+        raise ValueError(f"Invalid column specification for '{column_name}' in sources.yaml.")
+
+    def _raw_frame(self, data_parser, phenotypes):
+        store = ColumnarIncidenceStore.open(data_parser.data_dir)
+        if store is not None and str(data_parser.population) in store.populations:
+            raw_df = data_parser.load_raw_data(phenotypes)
+            return self.pl.from_pandas(raw_df.rename(columns=str)).lazy()
+        file_path = data_parser.get_population_file_path()
+        has_header = data_parser.source_config.get("has_header", False)
+        with data_dir_lock(data_parser.data_dir).shared():
+            return self.pl.read_csv(file_path, has_header=has_header).lazy()
+
+    def _age_bounds(self, data_parser, ages):
+        # Bounds (and their dtypes) exactly as CI5DetailedIncidenceModel.build_incidence_table derives them
+        ages = pd.Series(sorted(ages))
+        bounds = ages.apply(lambda x: data_parser.get_age_range(x - 1)).apply(pd.Series)
+        return self.pl.from_pandas(pd.DataFrame({
+            "age": ages, "age_class_lower": bounds[0], "age_class_upper": bounds[1],
+        }))
+
+    def build_incidence_table(self, data_parser, phenotypes):
+        if not isinstance(data_parser, CI5DetailedIncidenceModel):
+            logging.info(f"{type(data_parser).__name__} is not supported by the polars backend, using pandas.")
+            return PandasComputeBackend().build_incidence_table(data_parser, phenotypes)
+        pl = self.pl
+        for phenotype in phenotypes:
+            if not data_parser.phenotype_mappings.get(phenotype, []):
+                logging.warning(f"Phenotype '{phenotype}' not found in mappings.")
+        phenotype_ids = data_parser.get_phenotype_ids(phenotypes)
+        phenotype_map = {id_: phenotype for phenotype, ids in data_parser.phenotype_mappings.items() for id_ in ids}
+        gender_map = {data_parser.gender_mapping.get("male", 1): "M", data_parser.gender_mapping.get("female", 2): "F"}
+        unknown_age_class = data_parser.source_config['age_structure']['unknown_age_class']
+        age_column = data_parser.column_mappings.get("age_col")
+
+        parsed = (
+            self._raw_frame(data_parser, phenotypes)
+            .filter(pl.nth(age_column) != unknown_age_class)
+            .select(
+                self._column(data_parser, "gender_col").alias("gender"),
+                self._column(data_parser, "phenotype_col").alias("phenotype"),
+                self._column(data_parser, "age_col").alias("age"),
+                self._column(data_parser, "cases_col").alias("cases"),
+                self._column(data_parser, "person_years_col").alias("person_years"),
+            )
+            .filter(pl.col("phenotype").is_in(phenotype_ids))
+        )
+        ages = parsed.select(pl.col("age").unique()).collect()["age"].to_list()
+        age_bounds = self._age_bounds(data_parser, ages).lazy()
+
+        incidence_table = (
+            parsed
+            .join(age_bounds, on="age", how="left")
+            .with_columns(
+                pl.col("gender").replace_strict(gender_map, default="U", return_dtype=pl.String),
+                pl.col("phenotype").replace_strict(phenotype_map, default=None, return_dtype=pl.String),
+            )
+            .group_by(["age_class_lower", "age_class_upper", "phenotype", "gender"])
+            .agg(pl.col("cases").sum(), pl.col("person_years").drop_nulls().first())
+            .sort(["phenotype", "gender", "age_class_lower"], nulls_last=True)
+            .select("gender", "phenotype", "age_class_lower", "age_class_upper", "cases", "person_years")
+            .with_columns(
+                age_span=pl.when(pl.col("age_class_upper").is_not_null())
+                .then(pl.col("age_class_upper") - pl.col("age_class_lower") + 1).otherwise(0),
+                incidence_rate=pl.when(pl.col("person_years") > 0)
+                .then(pl.col("cases") / pl.col("person_years")).otherwise(0.0),
+            )
+            .collect()
+            .to_pandas()
+        )
+        for column in ("gender", "phenotype"):
+            incidence_table[column] = incidence_table[column].astype("str")
+        incidence_table.index.name = "incidence_class"
+        logging.info(f"Incidence table with {len(incidence_table)} classes built by the polars backend.")
+        return incidence_table
+
+    def add_lambda_columns(self, df, crhf_model, rr_model):
+        pl = self.pl
+        crhf = [crhf_model.calculate_crhf(gender, age) for gender, age in zip(df['gender'], df['age_class_upper'])]
+        relative_risks = [
+            rr_model.calculate_relative_risk(age=age, phenotype=phenotype, gender=gender)
+            for gender, phenotype, age in zip(df['gender'], df['phenotype'], df['age_class_upper'])
+        ]
+        lambdas = (
+            pl.LazyFrame({
+                "incidence_rate": df['incidence_rate'].to_numpy(dtype=float),
+                "crhf": np.array(crhf, dtype=float),
+                "rr_het": np.array([rr_het for rr_het, _ in relative_risks], dtype=float),
+                "rr_hom": [None if pd.isna(rr_hom) else float(rr_hom) for _, rr_hom in relative_risks],
+            }, schema_overrides={"rr_hom": pl.Float64})
+            .with_columns(
+                lambda_nc=pl.col("incidence_rate") / ((1 - pl.col("crhf")) + pl.col("crhf") * pl.col("rr_het"))
+            )
+            .select(
+                "lambda_nc",
+                lambda_het=pl.col("lambda_nc") * pl.col("rr_het"),
+                lambda_hom=pl.when(pl.col("rr_hom").is_not_null())
+                .then(pl.col("lambda_nc") * pl.col("rr_hom")).otherwise(0.0),
+            )
+            .collect()
+        )
+        return df.assign(**{column: lambdas[column].to_numpy() for column in lambdas.columns})
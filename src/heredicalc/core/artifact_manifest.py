@@ -0,0 +1,137 @@
+# core/artifact_manifest.py
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from heredicalc.core.file_lock import FileLock
+
+# Artifact kinds in build order: later kinds may depend on earlier ones
+ARTIFACT_KINDS = ("incidence_table", "liability_table", "flb_result")
+
+def fingerprint_config(config_block):
+    """Returns a SHA-256 fingerprint of a configuration block, independent of key order."""
+    canonical = json.dumps(config_block, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def dataset_fingerprints(sources):
+    """
+    Returns the fingerprint of every dataset block of sources.yaml.
+
+    Parameters:
+        sources (dict): The "sources" mapping of sources.yaml.
+
+    Returns:
+        dict: Mapping of dataset name to fingerprint.
+    """
+    return {dataset: fingerprint_config(config) for dataset, config in sources.items()}
+
+class ArtifactManifest:
+    """
+    Records derived artifacts (incidence tables, liability tables, FLB results) with the
+    dataset fingerprints they were built from and the command that builds them.
+
+    An artifact is stale when the fingerprint of one of its datasets changed (or the dataset
+    disappeared), so editing one dataset block of sources.yaml only invalidates the artifacts
+    derived from that dataset.
+
+    Changes are merged into the manifest file as it is on disk, under an exclusive lock on
+    <manifest>.lock, so concurrent processes sharing a cache directory keep each other's entries.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+            path (str or Path): Location of the manifest JSON file (created on first save).
+        """
+        self.path = str(path)
+        self.artifacts = self._read()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as f:
+            return json.load(f).get("artifacts", {})
+
+    def _update(self, change):
+        # Applies a change to the manifest on disk (re-read under the lock) and saves it
+        with FileLock(f"{self.path}.lock").exclusive():
+            self.artifacts = self._read()
+            change(self.artifacts)
+            self.save()
+
+    @staticmethod
+    def _key(artifact_path):
+        return os.path.abspath(artifact_path)
+
+    def record(self, artifact_path, kind, dependencies, command=None, parameters=None, cwd=None):
+        """
+        Records (or updates) an artifact and saves the manifest.
+
+        Parameters:
+            artifact_path (str or Path): Path of the artifact.
+            kind (str): One of ARTIFACT_KINDS.
+            dependencies (dict): Mapping of dataset name to the fingerprint the artifact was built from.
+            command (list): Module and arguments rebuilding the artifact, e.g.
+                ["heredicalc.bin.penetrances", "--dataset", "ci5_ix", ...].
+            parameters (dict): Generating parameters, for information.
+            cwd (str): Working directory the command has to run in (default: current directory).
+        """
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}")
+        entry = {
+            "kind": kind,
+            "dependencies": dict(dependencies),
+            "command": list(command) if command else None,
+            "cwd": cwd or os.getcwd(),
+            "parameters": parameters or {},
+            "recorded": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._update(lambda artifacts: artifacts.__setitem__(self._key(artifact_path), entry))
+
+    def get(self, artifact_path):
+        return self.artifacts.get(self._key(artifact_path))
+
+    def is_current(self, artifact_path, fingerprints):
+        """Returns True if the artifact exists, is recorded and none of its datasets changed."""
+        entry = self.get(artifact_path)
+        return (entry is not None and os.path.exists(artifact_path)
+                and all(fingerprints.get(dataset) == fingerprint
+                        for dataset, fingerprint in entry["dependencies"].items()))
+
+    def stale(self, fingerprints, datasets=None):
+        """
+        Returns the artifacts whose dataset fingerprints changed, in build order.
+
+        Parameters:
+            fingerprints (dict): Current fingerprints (see `dataset_fingerprints`).
+            datasets (list): Only consider artifacts depending on these datasets.
+
+        Returns:
+            list: (artifact path, entry, changed datasets) tuples.
+        """
+        stale_artifacts = []
+        for path, entry in self.artifacts.items():
+            if datasets and not set(datasets) & set(entry["dependencies"]):
+                continue
+            changed = sorted(dataset for dataset, fingerprint in entry["dependencies"].items()
+                             if fingerprints.get(dataset) != fingerprint)
+            if changed:
+                stale_artifacts.append((path, entry, changed))
+        stale_artifacts.sort(key=lambda item: ARTIFACT_KINDS.index(item[1]["kind"]))
+        return stale_artifacts
+
+    def remove(self, artifact_path):
+        """Forgets an artifact (the file itself is not touched)."""
+        self._update(lambda artifacts: artifacts.pop(self._key(artifact_path), None))
+
+    def save(self):
+        """Writes the manifest atomically (use `record` or `remove` to keep concurrent changes)."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as f:
+            json.dump({"artifacts": self.artifacts}, f, indent=2, sort_keys=True)
+            tmp_path = f.name
+        os.replace(tmp_path, self.path)
+        logging.debug(f"Artifact manifest saved to {self.path}")
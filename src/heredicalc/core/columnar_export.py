@@ -0,0 +1,152 @@
+# core/columnar_export.py
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+# Formats readable without pandas or pickle: Arrow IPC (Feather v2), Parquet, and a directory
+# of .npy files (one per column) with a JSON description
+TABLE_FORMATS = ("arrow", "parquet", "npy")
+METADATA_KEY = "heredicalc"
+NPY_METADATA_FILE = "metadata.json"
+
+def _require_pyarrow():
+    # pyarrow is an optional dependency and slow to import, so it is loaded on first use
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Arrow and Parquet export needs pyarrow (pip install pyarrow).")
+    return pyarrow
+
+def table_metadata(df):
+    """Returns the provenance recorded in `df.attrs` (e.g. "parameters", "input_hashes"), JSON-serializable."""
+    return json.loads(json.dumps(df.attrs, default=str))
+
+def _flat_table(df):
+    # A named index (liability_class, incidence_class) is written as a regular column
+    return df.reset_index() if df.index.name else df.reset_index(drop=True)
+
+def _is_text_column(column):
+    return not (pd.api.types.is_bool_dtype(column) or pd.api.types.is_numeric_dtype(column))
+
+def _categorical_table(df):
+    # Text columns as categoricals, which Arrow stores dictionary-encoded (codes into the distinct values)
+    return pd.DataFrame({
+        position: pd.Categorical(column.astype(object)) if _is_text_column(column) else column
+        for position, (_, column) in enumerate(df.items())
+    }).set_axis(df.columns, axis=1)
+
+def write_table(df, path, table_format):
+    """
+    Writes a DataFrame in one of TABLE_FORMATS, without modifying it.
+
+    Text columns (gender, phenotype, ...) are stored as category codes: dictionary-encoded in
+    Arrow and Parquet, as int32 codes in NPY. The provenance in `df.attrs` is stored with the
+    table: as schema metadata under the key "heredicalc" for Arrow and Parquet, in metadata.json
+    for NPY.
+
+    Parameters:
+        df (pd.DataFrame): Table to write, e.g. liability classes or an incidence table.
+        path (str): Output file (Arrow, Parquet) or directory (NPY).
+        table_format (str): One of TABLE_FORMATS.
+
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If pyarrow is needed but not installed.
+    """
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format: {table_format}")
+    table_df = _flat_table(df)
+    metadata = table_metadata(df)
+    if table_format == "npy":
+        write_npy_table(table_df, path, metadata)
+        return
+
+    pa = _require_pyarrow()
+    table = pa.Table.from_pandas(_categorical_table(table_df), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(metadata)})
+    if table_format == "arrow":
+        pa.feather.write_feather(table, path)
+    else:
+        pa.parquet.write_table(table, path)
+
+class ColumnarExporterMixin:
+    """
+    export_data of the columnar exporters of penetrances and incidences: writes the table in
+    `table_format` (one of TABLE_FORMATS, set by subclasses) to `output_file`.
+
+    Usage:
+        class ParquetIncidenceExporter(ColumnarExporterMixin, IncidenceExporter):
+            table_format = "parquet"
+    """
+
+    table_format = None
+
+    def export_data(self, df):
+        """
+        Writes the table, including the provenance in `df.attrs`.
+
+        Parameters:
+            df (pd.DataFrame): Table to write, e.g. liability classes or an incidence table.
+
+        Returns:
+            The table if no output file is set, otherwise True on success and False on errors.
+        """
+        if self.output_file is None:
+            return df
+        if self.output_file == "stdout":
+            logging.error(f"{self.table_format} output is binary, please specify an output file.")
+            return False
+        try:
+            write_table(df, self.output_file, self.table_format)
+            logging.debug(f"Data successfully saved to {self.output_file}")
+            return True
+        except (FileNotFoundError, IOError, OSError) as e:
+            logging.error(f"Error saving data to {self.output_file}: {e}")
+            return False
+
+def write_npy_table(df, directory, metadata=None):
+    """
+    Writes every column of a DataFrame as <directory>/<column>.npy, plus metadata.json.
+
+    Numeric and boolean columns keep their dtype; other columns are stored as int32
+    category codes, with the categories listed in metadata.json (code -1 marks missing values).
+
+    Parameters:
+        df (pd.DataFrame): Table to write (its index is not written).
+        directory (str): Output directory, created if needed.
+        metadata (dict): Additional information stored under "attrs" in metadata.json.
+    """
+    os.makedirs(directory, exist_ok=True)
+    columns = []
+    for position, name in enumerate(df.columns):
+        column = df.iloc[:, position]
+        description = {"name": str(name), "file": f"{position:03d}_{name}.npy"}
+        if not _is_text_column(column):
+            values = column.to_numpy()
+        else:
+            categorical = pd.Categorical(column.astype(object))
+            values = categorical.codes.astype(np.int32)
+            description["categories"] = [str(category) for category in categorical.categories]
+        description["dtype"] = values.dtype.str
+        np.save(os.path.join(directory, description["file"]), values, allow_pickle=False)
+        columns.append(description)
+    with open(os.path.join(directory, NPY_METADATA_FILE), "w") as f:
+        json.dump({"rows": len(df), "columns": columns, "attrs": metadata or {}}, f, indent=2)
+
+def read_npy_table(directory):
+    """Reads a table written by `write_npy_table` back into a DataFrame (categories restored)."""
+    with open(os.path.join(directory, NPY_METADATA_FILE), "r") as f:
+        metadata = json.load(f)
+    data = {}
+    for description in metadata["columns"]:
+        values = np.load(os.path.join(directory, description["file"]), allow_pickle=False)
+        if "categories" in description:
+            values = pd.Categorical.from_codes(values, description["categories"]).astype(object)
+        data[description["name"]] = values
+    df = pd.DataFrame(data)
+    df.attrs.update(metadata["attrs"])
+    return df
@@ -0,0 +1,72 @@
+# core/file_lock.py
+import os
+import logging
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class FileLock:
+    """
+    Inter-process readers/writer lock, held on a lock file.
+
+    Any number of processes can hold the shared lock at the same time, the exclusive lock only
+    one process and only while no shared lock is held. The operating system releases the locks of
+    processes that exit or crash, so no stale locks are left behind. On Windows, shared locks are
+    exclusive as well.
+
+    A FileLock instance is not re-entrant; threads should each use their own instance.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+            path (str): The lock file, created (with its directory) if needed.
+        """
+        self.path = str(path)
+
+    @contextmanager
+    def _locked(self, exclusive):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a+b") as f:
+            if fcntl is not None:
+                mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                try:
+                    fcntl.flock(f.fileno(), mode | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    logging.info(f"Waiting for lock {self.path}...")
+                    fcntl.flock(f.fileno(), mode)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def shared(self):
+        """Context manager holding the shared (reader) lock."""
+        return self._locked(exclusive=False)
+
+    def exclusive(self):
+        """Context manager holding the exclusive (writer) lock."""
+        return self._locked(exclusive=True)
+
+def sibling_path(directory, suffix):
+    """Returns the hidden path next to a directory, e.g. data/.ci5_ix.lock for data/ci5_ix."""
+    directory = os.path.normpath(str(directory))
+    return os.path.join(os.path.dirname(directory), f".{os.path.basename(directory)}{suffix}")
+
+def data_dir_lock(data_dir):
+    """
+    Returns the lock of a dataset directory. The lock file lies next to the directory,
+    so it is kept when the directory is replaced.
+    """
+    return FileLock(sibling_path(data_dir, ".lock"))
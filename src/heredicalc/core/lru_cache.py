@@ -0,0 +1,85 @@
+# core/lru_cache.py
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    Thread-safe mapping with a bounded number of entries and least-recently-used eviction.
+    """
+
+    def __init__(self, maxsize=32):
+        """
+        Parameters:
+            maxsize (int): Maximum number of entries kept in the cache.
+        """
+        if maxsize < 1:
+            raise ValueError("LRUCache maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Returns the cached value for `key` and marks it as recently used."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Stores `value` under `key`, evicting the least recently used entries if necessary."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """
+        Returns the cached value for `key`, creating it with `factory()` on a miss.
+
+        The factory runs outside the cache lock, so concurrent misses on the same key may
+        compute the value more than once; the last result is kept.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def discard_if(self, predicate):
+        """
+        Removes all entries whose key satisfies `predicate(key)`.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Returns size and hit/miss counters as a dictionary."""
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
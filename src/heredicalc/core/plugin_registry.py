@@ -0,0 +1,71 @@
+# core/plugin_registry.py
+import logging
+import importlib
+from importlib.metadata import entry_points
+
+class PluginRegistry:
+    """
+    Maps implementation names to classes that are imported only when first selected.
+
+    Implementations are declared as "module:attribute" strings (relative to `package` if the
+    module starts with a dot). Names not declared in the mapping are looked up in the entry
+    point group `heredicalc.<kind>`, so other packages can add implementations, e.g. in setup.cfg:
+
+        [options.entry_points]
+        heredicalc.penetrance_models =
+            my_model = my_package.my_module:MyPenetranceModel
+    """
+
+    def __init__(self, kind, plugins, package=None):
+        """
+        Parameters:
+            kind (str): Kind of the implementations (e.g., "penetrance_models").
+            plugins (dict): Mapping of name to "module:attribute" string or class.
+            package (str): Anchor package for relative module names.
+        """
+        self.kind = kind
+        self.entry_point_group = f"heredicalc.{kind}"
+        self.package = package
+        self._plugins = dict(plugins)
+        self._entry_points_loaded = False
+
+    def register(self, name, target):
+        """Declares an implementation by class or "module:attribute" string."""
+        self._plugins[name] = target
+
+    def _load_entry_points(self):
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for entry_point in entry_points(group=self.entry_point_group):
+            self._plugins.setdefault(entry_point.name, entry_point)
+
+    def names(self):
+        """Returns the names of all declared implementations, including entry points."""
+        self._load_entry_points()
+        return sorted(self._plugins)
+
+    def __contains__(self, name):
+        if name not in self._plugins:
+            self._load_entry_points()
+        return name in self._plugins
+
+    def get(self, name):
+        """
+        Returns the implementation declared under `name`, importing it on first use.
+
+        Raises:
+            KeyError: If no implementation is declared under `name`.
+        """
+        if name not in self:
+            raise KeyError(f"No {self.kind} implementation named '{name}'.")
+        target = self._plugins[name]
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            logging.debug(f"Importing {self.kind} implementation '{name}' from {module_name}.")
+            target = getattr(importlib.import_module(module_name, self.package), attribute)
+        elif hasattr(target, "load"):
+            # importlib.metadata.EntryPoint
+            target = target.load()
+        self._plugins[name] = target
+        return target
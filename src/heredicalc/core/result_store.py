@@ -0,0 +1,254 @@
+# core/result_store.py
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+import pandas as pd
+from heredicalc.core.run_context import current_context
+from heredicalc.penetrances.liability_bundle import LiabilityBundle, liability_bundle_bytes, liability_fingerprint
+
+# Liability parameters stored (and queryable) as columns of both tables
+PARAMETER_COLUMNS = ("dataset", "population", "phenotypes", "gene",
+                     "crhf_model", "rr_model", "cr_model", "penetrance_model")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS liability_tables (
+    fingerprint TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    dataset TEXT, population TEXT, phenotypes TEXT, gene TEXT,
+    crhf_model TEXT, rr_model TEXT, cr_model TEXT, penetrance_model TEXT,
+    parameters TEXT,
+    input_hashes TEXT,
+    rows INTEGER,
+    bundle BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS liability_tables_by_gene ON liability_tables (gene, dataset, population, created);
+CREATE TABLE IF NOT EXISTS flb_results (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    dataset TEXT, population TEXT, phenotypes TEXT, gene TEXT,
+    crhf_model TEXT, rr_model TEXT, cr_model TEXT, penetrance_model TEXT,
+    liability_set TEXT,
+    afreq REAL NOT NULL,
+    flb REAL,
+    pedigree_hash TEXT NOT NULL,
+    pedigree_file TEXT,
+    liability_fingerprint TEXT NOT NULL,
+    engine_version TEXT,
+    cache_key TEXT,
+    seconds REAL
+);
+CREATE INDEX IF NOT EXISTS flb_results_by_gene ON flb_results (gene, population, created);
+CREATE INDEX IF NOT EXISTS flb_results_by_pedigree ON flb_results (pedigree_hash, created);
+CREATE INDEX IF NOT EXISTS flb_results_by_created ON flb_results (created);
+CREATE INDEX IF NOT EXISTS flb_results_by_cache_key ON flb_results (cache_key);
+"""
+
+def liability_parameters(liabilities):
+    """Returns the generating parameters of a liability bundle or table (empty if unknown)."""
+    if isinstance(liabilities, LiabilityBundle):
+        return dict(liabilities.parameters)
+    return dict(liabilities.attrs.get("parameters", {}))
+
+def _parameter_values(parameters):
+    values = []
+    for column in PARAMETER_COLUMNS:
+        value = parameters.get(column)
+        if column == "phenotypes" and value is not None and not isinstance(value, str):
+            value = ",".join(sorted(value))
+        values.append(None if value is None else str(value))
+    return values
+
+class ResultStore:
+    """
+    Embedded SQLite store of computed liability tables and FLB results, for historical queries.
+
+    Liability tables are stored once per fingerprint, as bundle blobs with their parameters and
+    input hashes; FLB results with their liability parameters, pedigree hash, allele frequency,
+    engine version and computation time. The database runs in WAL mode, so readers do not block
+    writers; records are buffered and written in batches (see `flush`). An instance may be
+    shared between threads.
+    """
+
+    def __init__(self, path=None, batch_size=100):
+        """
+        Parameters:
+            path (str or Path): Path to the database file (created with its directory if needed;
+                default: results.sqlite in the cache directory of the run context).
+            batch_size (int): Number of buffered records that triggers a write.
+        """
+        self.path = Path(current_context().result_store_file if path is None else path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._pending_liabilities = {}
+        self._pending_flb = []
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_liability_table(self, liabilities, parameters=None, input_hashes=None):
+        """
+        Records a liability table (ignored if a table with the same fingerprint is stored).
+
+        Parameters:
+            liabilities (pd.DataFrame or LiabilityBundle): The liability table.
+            parameters (dict): Generating parameters (default: those recorded with the table).
+            input_hashes (dict): Input hashes (default: those recorded with the table).
+
+        Returns:
+            str: The liability fingerprint.
+        """
+        fingerprint = liability_fingerprint(liabilities)
+        with self._lock:
+            # Stored tables are not read (or their bundle built) again
+            if fingerprint in self._pending_liabilities or self.connection.execute(
+                    "SELECT 1 FROM liability_tables WHERE fingerprint = ?", (fingerprint,)).fetchone():
+                return fingerprint
+        if isinstance(liabilities, LiabilityBundle):
+            with open(liabilities.path, "rb") as f:
+                bundle = f.read()
+            parameters = parameters or liabilities.parameters
+            input_hashes = input_hashes or liabilities.input_hashes
+        else:
+            parameters = parameters or liabilities.attrs.get("parameters", {})
+            input_hashes = input_hashes or liabilities.attrs.get("input_hashes", {})
+            bundle = liability_bundle_bytes(liabilities, parameters, input_hashes)
+        record = (fingerprint, datetime.now().isoformat(timespec="seconds"), *_parameter_values(parameters),
+                  json.dumps(parameters, default=str), json.dumps(input_hashes, default=str), len(liabilities),
+                  sqlite3.Binary(bundle))
+        with self._lock:
+            self._pending_liabilities[fingerprint] = record
+        self._flush_if_full()
+        return fingerprint
+
+    def add_flb_result(self, flb, afreq, pedigree_hash, liabilities, liability_set=None, pedigree_file=None,
+                       engine_version=None, cache_key=None, seconds=None):
+        """
+        Records an FLB result.
+
+        Parameters:
+            flb (float): The FLB result.
+            afreq (float): The allele frequency.
+            pedigree_hash (str): Fingerprint of the pedigree (see flb_result_cache.pedigree_fingerprint).
+            liabilities (pd.DataFrame or LiabilityBundle): The liability table, whose parameters are recorded.
+            liability_set (str): Name of the liability set (e.g. the gene or liabilities file).
+            pedigree_file (str): Path of the pedigree file.
+            engine_version (str): FLB engine version.
+            cache_key (str): Key of the result in the FLB result cache, used by `find_flb`.
+            seconds (float): Computation time.
+        """
+        parameters = liability_parameters(liabilities)
+        try:
+            flb = float(flb)
+        except (TypeError, ValueError):
+            pass
+        record = (datetime.now().isoformat(timespec="seconds"), *_parameter_values(parameters), liability_set,
+                  float(afreq), flb, pedigree_hash, None if pedigree_file is None else str(pedigree_file),
+                  liability_fingerprint(liabilities), engine_version, cache_key, seconds)
+        with self._lock:
+            self._pending_flb.append(record)
+        self._flush_if_full()
+
+    def _flush_if_full(self):
+        if len(self._pending_liabilities) + len(self._pending_flb) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered records in one transaction."""
+        with self._lock:
+            liabilities, flb_results = list(self._pending_liabilities.values()), self._pending_flb
+            self._pending_liabilities, self._pending_flb = {}, []
+            if not liabilities and not flb_results:
+                return
+            with self.connection:
+                self.connection.executemany(
+                    f"INSERT OR IGNORE INTO liability_tables (fingerprint, created, {', '.join(PARAMETER_COLUMNS)}, "
+                    f"parameters, input_hashes, rows, bundle) VALUES ({', '.join('?' * (len(PARAMETER_COLUMNS) + 6))})",
+                    liabilities
+                )
+                self.connection.executemany(
+                    f"INSERT INTO flb_results (created, {', '.join(PARAMETER_COLUMNS)}, liability_set, afreq, flb, "
+                    f"pedigree_hash, pedigree_file, liability_fingerprint, engine_version, cache_key, seconds) "
+                    f"VALUES ({', '.join('?' * (len(PARAMETER_COLUMNS) + 10))})",
+                    flb_results
+                )
+        logging.debug(f"Stored {len(liabilities)} liability table(s) and {len(flb_results)} FLB result(s) in {self.path}.")
+
+    def find_flb(self, cache_key):
+        """Returns the most recent stored FLB result for an FLB result cache key, or None."""
+        self.flush()
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT flb FROM flb_results WHERE cache_key = ? ORDER BY created DESC, id DESC LIMIT 1", (cache_key,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def _query(self, table, columns, filters, since=None, until=None, limit=None):
+        conditions, values = [], []
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value if isinstance(value, float) else str(value))
+        if since:
+            conditions.append("created >= ?")
+            values.append(since)
+        if until:
+            conditions.append("created < ?")
+            values.append(until)
+        sql = f"SELECT {columns} FROM {table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY created DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        self.flush()
+        with self._lock:
+            return pd.read_sql_query(sql, self.connection, params=values)
+
+    def query_flb(self, since=None, until=None, limit=None, **filters):
+        """
+        Returns stored FLB results, newest first.
+
+        Parameters:
+            since (str): Earliest creation time (ISO format, e.g. 2026-09-01).
+            until (str): Creation time before which results were created.
+            limit (int): Maximum number of results.
+            **filters: Column values to match (e.g. gene, population, dataset, pedigree_hash).
+
+        Returns:
+            pd.DataFrame: The matching results.
+        """
+        return self._query("flb_results", "*", filters, since, until, limit)
+
+    def query_liability_tables(self, since=None, until=None, limit=None, **filters):
+        """Returns the stored liability tables (without blobs), newest first; see `query_flb`."""
+        columns = f"fingerprint, created, {', '.join(PARAMETER_COLUMNS)}, rows, input_hashes"
+        return self._query("liability_tables", columns, filters, since, until, limit)
+
+    def liability_bundle(self, fingerprint):
+        """
+        Returns the stored bundle of a liability table.
+
+        Returns:
+            bytes: Content of a bundle file, or None if no table with this fingerprint is stored.
+        """
+        self.flush()
+        with self._lock:
+            row = self.connection.execute("SELECT bundle FROM liability_tables WHERE fingerprint = ?",
+                                          (fingerprint,)).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def close(self):
+        """Writes the buffered records and closes the database."""
+        self.flush()
+        self.connection.close()
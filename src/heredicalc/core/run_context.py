@@ -0,0 +1,151 @@
+# core/run_context.py
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path("cache")
+
+_active_context = contextvars.ContextVar("heredicalc_run_context", default=None)
+_dispatch_lock = threading.Lock()
+_dispatch_handler = None
+_default_lock = threading.Lock()
+_default_context = None
+
+class _ContextLogHandler(logging.Handler):
+    # Installed once on the root logger: passes records on to the log handler of the context
+    # active in the emitting thread
+    def emit(self, record):
+        context = _active_context.get()
+        if context is not None and context.log_handler is not None and record.levelno >= context.log_handler.level:
+            context.log_handler.handle(record)
+
+def _install_dispatch_handler():
+    global _dispatch_handler
+    with _dispatch_lock:
+        if _dispatch_handler is None:
+            _dispatch_handler = _ContextLogHandler()
+            logging.getLogger().addHandler(_dispatch_handler)
+
+class RunContext:
+    """
+    Per-call settings of the pipeline: dataset configuration, cache directory, logging and interactivity.
+
+    Library code reads the active context (see `current_context`) instead of process-wide state, so
+    calls with different contexts can run in parallel threads of one process. The cache directory is
+    resolved when the context is created and does not follow later changes of the working directory.
+    A non-interactive context (the default) never waits for input: questions are answered with their
+    default, and the answer is logged.
+
+    Usage:
+        context = RunContext(cache_dir="/var/cache/heredicalc", log_handler=handler)
+        with context.activate():
+            liability_tables = {gene: load_cached_or_calculated_liabilities(args, gene) for gene in genes}
+    """
+
+    def __init__(self, cache_dir=None, sources=None, interactive=False, log_handler=None):
+        """
+        Parameters:
+            cache_dir (str or Path): Directory of cached liabilities, FLB results, the artifact
+                manifest and the default result store (default: ./cache, resolved now).
+            sources (dict): Dataset configurations, as in sources.yaml (default: read from sources.yaml
+                on first use).
+            interactive (bool): Whether questions may be asked on the terminal.
+            log_handler (logging.Handler): Receives the records logged by threads while this context is
+                active in them (records below the level of the root logger are not emitted at all).
+        """
+        self.cache_dir = Path(DEFAULT_CACHE_DIR if cache_dir is None else cache_dir).resolve()
+        self.interactive = interactive
+        self.log_handler = log_handler
+        self._sources = sources
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_file(self):
+        """The artifact manifest of the cache directory."""
+        return self.cache_dir / "manifest.json"
+
+    @property
+    def flb_results_dir(self):
+        """The directory of the FLB result cache."""
+        return self.cache_dir / "flb_results"
+
+    @property
+    def result_store_file(self):
+        """The default SQLite result store of the cache directory (see ResultStore)."""
+        return self.cache_dir / "results.sqlite"
+
+    @property
+    def sources(self):
+        """The dataset configurations (sources.yaml is read once per context)."""
+        with self._lock:
+            if self._sources is None:
+                from heredicalc.core.setup_data_sources import load_incidence_data_sources
+                self._sources = load_incidence_data_sources()["sources"]
+            return self._sources
+
+    def reload_sources(self):
+        """
+        Re-reads sources.yaml, so calls running with this context see a changed configuration.
+
+        Returns:
+            dict: The new dataset configurations.
+        """
+        from heredicalc.core.setup_data_sources import load_incidence_data_sources
+        sources = load_incidence_data_sources()["sources"]
+        with self._lock:
+            self._sources = sources
+        return sources
+
+    def source_config(self, dataset):
+        """Returns the configuration of a dataset, raising ValueError for unknown datasets."""
+        if dataset not in self.sources:
+            raise ValueError(f"Dataset '{dataset}' not found in sources.yaml.")
+        return self.sources[dataset]
+
+    def confirm(self, question, default=False):
+        """
+        Asks a yes/no question on the terminal, or answers it with `default` if the context is not interactive.
+
+        Returns:
+            bool: True for yes.
+        """
+        if not self.interactive:
+            logging.warning(f"{question} Answered '{'y' if default else 'n'}' (non-interactive run).")
+            return default
+        while True:
+            answer = input(f"{question} (y/n): ").strip().lower()
+            if answer in ("y", "n"):
+                return answer == "y"
+
+    @contextmanager
+    def activate(self):
+        """Makes this the active context of the current thread (or task) until the block is left."""
+        if self.log_handler is not None:
+            _install_dispatch_handler()
+        token = _active_context.set(self)
+        try:
+            yield self
+        finally:
+            _active_context.reset(token)
+
+    def run(self, function, *args, **kwargs):
+        """Calls a function with this context active, e.g. as the task of a thread pool."""
+        with self.activate():
+            return function(*args, **kwargs)
+
+def current_context():
+    """
+    Returns the active RunContext of the current thread, or, if none is active, the default
+    (non-interactive) context of the process, created on first use for the working directory
+    of that time.
+    """
+    global _default_context
+    context = _active_context.get()
+    if context is not None:
+        return context
+    with _default_lock:
+        if _default_context is None:
+            _default_context = RunContext()
+        return _default_context
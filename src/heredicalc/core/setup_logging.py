@@ -1,9 +1,17 @@
 # core/setup_logging.py
 import logging
 import sys
+import threading
+
+_setup_lock = threading.Lock()
 
 def setup_logging(log_level="INFO", log_file=None):
     """Configures logging with specified log level and optional log file.
+
+    Handlers added by an earlier call are replaced; other handlers of the root logger (e.g. those
+    of an application embedding heredicalc, or of a RunContext) are kept. The level is applied by
+    the handlers: the root logger's level is only lowered, if it would drop records of `log_level`,
+    and never raised, so logging configured by others is not silenced.
     
     Args:
         log_level (str): The logging level as a string (e.g., 'DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL').
@@ -12,27 +20,34 @@ def setup_logging(log_level="INFO", log_file=None):
     # Convert log level string to logging level
     level = getattr(logging, log_level.upper(), logging.INFO)
     logger = logging.getLogger()
-    logger.setLevel(level)
 
     # Handler for stdout (DEBUG and INFO levels)
     stdout_handler = logging.StreamHandler(sys.stdout)
-    stdout_handler.setLevel(logging.DEBUG)  # Set to DEBUG to capture all messages up to INFO
+    stdout_handler.setLevel(level)  # Messages from the log level up to INFO
     stdout_handler.addFilter(lambda record: record.levelno <= logging.INFO)
     stdout_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 
     # Handler for stderr (WARNING and above)
     stderr_handler = logging.StreamHandler(sys.stderr)
-    stderr_handler.setLevel(logging.WARNING)
+    stderr_handler.setLevel(max(level, logging.WARNING))
     stderr_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 
-    # Clear any existing handlers, then add the new ones
-    logger.handlers = []  # Ensures no duplicate handlers
-    logger.addHandler(stdout_handler)
-    logger.addHandler(stderr_handler)
+    handlers = [stdout_handler, stderr_handler]
 
     # Optional file handler
     if log_file:
         file_handler = logging.FileHandler(log_file)
         file_handler.setLevel(level)
         file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logger.addHandler(file_handler)
\ No newline at end of file
+        handlers.append(file_handler)
+
+    # Replace the handlers of an earlier call only (ensures no duplicate handlers)
+    with _setup_lock:
+        if logger.getEffectiveLevel() > level:
+            logger.setLevel(level)
+        for handler in [handler for handler in logger.handlers if getattr(handler, "_heredicalc_setup", False)]:
+            logger.removeHandler(handler)
+            handler.close()
+        for handler in handlers:
+            handler._heredicalc_setup = True
+            logger.addHandler(handler)
\ No newline at end of file
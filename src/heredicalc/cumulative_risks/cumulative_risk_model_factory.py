@@ -1,10 +1,14 @@
 # cumulative_risks/cumulative_risk_model_factory.py
 
 import logging
-from .cumulative_risk_model import CumulativeRiskModel
-from .simple_cumulative_risk_model import SimpleCumulativeRiskModel
-from ..incidences.incidence_models import incidence_data_model
-# Import other specific models here as they are implemented
+from heredicalc.core.plugin_registry import PluginRegistry
+
+# Declare other specific models here as they are implemented
+CUMULATIVE_RISK_MODELS = PluginRegistry("cumulative_risk_models", {
+    "simple": ".simple_cumulative_risk_model:SimpleCumulativeRiskModel",
+    "subset": ".subset_cumulative_risk_model:SubsetCumulativeRiskModel",
+    "competing_risks": ".subset_cumulative_risk_model:CompetingRisksCumulativeRiskModel",
+}, package=__package__)
 
 class CumulativeRiskModelFactory:
     """
@@ -36,10 +40,8 @@ class CumulativeRiskModelFactory:
         Raises:
             ValueError: If the specified model type is unsupported.
         """
-        
-        if model_type == 'simple':
-            logging.debug("Creating SimpleCumulativeRiskModel instance.")
-            return SimpleCumulativeRiskModel(incidence_data)
-        # Add more model types here as needed
-        else:
-            raise ValueError(f"Unsupported cumulative risk model type: {model_type}")
\ No newline at end of file
+        if model_type not in CUMULATIVE_RISK_MODELS:
+            raise ValueError(f"Unsupported cumulative risk model type: {model_type}")
+        model_class = CUMULATIVE_RISK_MODELS.get(model_type)
+        logging.debug(f"Creating {model_class.__name__} instance.")
+        return model_class(incidence_data)
\ No newline at end of file
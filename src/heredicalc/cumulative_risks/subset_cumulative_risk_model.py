@@ -0,0 +1,147 @@
+# cumulative_risks/subset_cumulative_risk_model.py
+
+import logging
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from .cumulative_risk_model import CumulativeRiskModel
+
+MAX_SUBSET_PHENOTYPES = 12
+
+class SubsetCumulativeRiskModel(CumulativeRiskModel):
+    """
+    Cumulative risks for every subset of the phenotypes in the incidence data, under the
+    assumption of independent phenotypes.
+
+    All subsets are calculated at once from a (phenotype x age class) hazard matrix per gender
+    and kept in one table indexed by subset, gender and upper age class bound, so any
+    combination can be looked up without recalculation. For the full phenotype set the
+    results equal those of the simple model.
+    """
+
+    def __init__(self, data_frame):
+        super().__init__(data_frame)
+        self.validate_incidence_data()
+        self.phenotypes = sorted(self.data_frame['phenotype'].unique())
+        if len(self.phenotypes) > MAX_SUBSET_PHENOTYPES:
+            raise ValueError(f"Subset cumulative risks support at most {MAX_SUBSET_PHENOTYPES} phenotypes "
+                             f"({len(self.phenotypes)} given).")
+        self._subset_risks = None
+
+    @staticmethod
+    def subset_key(phenotypes):
+        """Returns the index key of a phenotype subset, e.g. 'BreastCancer+OvarianCancer'."""
+        return "+".join(sorted(set(phenotypes)))
+
+    def _subset_matrix(self):
+        """Returns the subset keys and a (subsets x phenotypes) membership matrix."""
+        subsets = [subset for size in range(1, len(self.phenotypes) + 1)
+                   for subset in combinations(range(len(self.phenotypes)), size)]
+        membership = np.zeros((len(subsets), len(self.phenotypes)))
+        for row, subset in enumerate(subsets):
+            membership[row, list(subset)] = 1.0
+        keys = [self.subset_key(self.phenotypes[position] for position in subset) for subset in subsets]
+        return keys, membership
+
+    def _hazard_matrix(self, gender):
+        """
+        Returns the age classes of a gender and its (phenotype x age class) matrix of cumulative
+        hazard contributions (incidence rate x age span). Open-ended age classes are left out.
+        """
+        gender_df = self.data_frame[(self.data_frame['gender'] == gender) & self.data_frame['age_class_upper'].notna()]
+        contributions = gender_df.assign(hazard=gender_df['incidence_rate'] * gender_df['age_span'])
+        hazards = contributions.pivot_table(index='phenotype', columns='age_class_upper', values='hazard',
+                                            aggfunc='sum', fill_value=0.0)
+        hazards = hazards.reindex(index=self.phenotypes, fill_value=0.0).sort_index(axis=1)
+        age_classes = (gender_df.groupby('age_class_upper')['age_class_lower'].first()
+                       .reindex(hazards.columns).reset_index())
+        return age_classes, hazards.to_numpy(dtype=float)
+
+    def _subset_cumulative_risks(self, membership, hazards):
+        """
+        Cumulative risks of all subsets from the hazard matrix.
+
+        Parameters:
+            membership (np.ndarray): (subsets x phenotypes) membership matrix.
+            hazards (np.ndarray): (phenotypes x age classes) cumulative hazard contributions.
+
+        Returns:
+            np.ndarray: (subsets x age classes) cumulative risks.
+        """
+        return 1 - np.exp(-(membership @ np.cumsum(hazards, axis=1)))
+
+    def calculate_all_subsets(self):
+        """
+        Calculates the cumulative risks of all phenotype subsets (cached).
+
+        Returns:
+            pd.DataFrame: Indexed by (subset, gender, age_class_upper), with columns
+            'age_class_lower' and 'cumulative_risk'.
+        """
+        if self._subset_risks is not None:
+            return self._subset_risks
+        keys, membership = self._subset_matrix()
+        tables = []
+        for gender in self.data_frame['gender'].unique():
+            age_classes, hazards = self._hazard_matrix(gender)
+            risks = self._subset_cumulative_risks(membership, hazards)
+            tables.append(pd.DataFrame({
+                'subset': np.repeat(keys, len(age_classes)),
+                'gender': gender,
+                'age_class_upper': np.tile(age_classes['age_class_upper'].to_numpy(), len(keys)),
+                'age_class_lower': np.tile(age_classes['age_class_lower'].to_numpy(), len(keys)),
+                'cumulative_risk': risks.ravel(),
+            }))
+        subset_risks = pd.concat(tables, ignore_index=True)
+        self._subset_risks = subset_risks.set_index(['subset', 'gender', 'age_class_upper']).sort_index()
+        logging.info(f"Cumulative risks calculated for {len(keys)} phenotype subsets.")
+        return self._subset_risks
+
+    def calculate_cumulative_risk(self, gender, age_class_upper, phenotypes):
+        """
+        Looks up the cumulative risk for a given gender, age upper limit, and selected phenotypes.
+
+        Phenotypes without incidence data are ignored, as in the simple model.
+
+        Parameters:
+            gender (str): The gender ('M' or 'F').
+            age_class_upper (float): The upper age limit up to which cumulative risk is calculated.
+            phenotypes (list): List of phenotypes to include in risk calculation.
+
+        Returns:
+            float: The cumulative risk for the specified parameters.
+        """
+        subset = [phenotype for phenotype in phenotypes if phenotype in self.phenotypes]
+        if not subset:
+            return 0.0
+        subset_risks = self.calculate_all_subsets()
+        try:
+            risks = subset_risks.loc[(self.subset_key(subset), gender)]
+        except KeyError:
+            return 0.0
+        # Last age class ending at or before the age limit
+        position = risks.index.searchsorted(age_class_upper, side='right') - 1
+        if position < 0:
+            return 0.0
+        cumulative_risk = risks['cumulative_risk'].iloc[position]
+        logging.info(f"Cumulative risk looked up: {cumulative_risk}")
+        return cumulative_risk
+
+class CompetingRisksCumulativeRiskModel(SubsetCumulativeRiskModel):
+    """
+    Cumulative risks for every phenotype subset with the other phenotypes of the incidence
+    data as competing risks.
+
+    Hazards are constant within age classes. The risk of a subset is the probability that the
+    first of all phenotypes occurring is one of the subset, so risks of disjoint subsets add up
+    and the full phenotype set gives the same risk as the independent model.
+    """
+
+    def _subset_cumulative_risks(self, membership, hazards):
+        total_hazards = hazards.sum(axis=0)
+        # Probability to be unaffected at the start of each age class, and to be affected within it
+        unaffected_at_start = np.exp(-(np.cumsum(total_hazards) - total_hazards))
+        affected_within = 1 - np.exp(-total_hazards)
+        subset_shares = np.divide(membership @ hazards, total_hazards,
+                                  out=np.zeros((membership.shape[0], hazards.shape[1])), where=total_hazards > 0)
+        return np.cumsum(subset_shares * unaffected_at_start * affected_within, axis=1)
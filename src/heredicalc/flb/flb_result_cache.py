@@ -0,0 +1,105 @@
+# flb/flb_result_cache.py
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from .flb_runner import R_SCRIPT_PATH
+from .liabilities_mapper import MAPPER_VERSION
+
+def engine_version():
+    """
+    Returns the version of the FLB engine: the heredicalc version, a hash of the R script and the
+    version of the liability class mapping. Results calculated by another engine version are not reused.
+    """
+    try:
+        from importlib.metadata import version
+        package_version = version("heredicalc")
+    except Exception:
+        package_version = "unknown"
+    with open(R_SCRIPT_PATH, "rb") as f:
+        script_hash = hashlib.sha256(f.read()).hexdigest()[:12]
+    return f"{package_version}+{script_hash}+m{MAPPER_VERSION}"
+
+def pedigree_fingerprint(members_df):
+    """
+    Returns a SHA-256 fingerprint of a pedigree's members, as prepared for FLB (sorted by 'id').
+    Two pedigree files with the same content after import have the same fingerprint.
+    """
+    records = members_df.sort_values(by="id").to_dict(orient="records")
+    canonical = json.dumps(records, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def flb_result_key(pedigree_fp, liability_fp, afreq, engine=None):
+    """
+    Returns the key of one FLB evaluation, shared by the FLB result cache and the result store.
+
+    Parameters:
+        pedigree_fp (str): Fingerprint of the pedigree (see `pedigree_fingerprint`).
+        liability_fp (str): Fingerprint of the liability table.
+        afreq (float): The allele frequency.
+        engine (str): FLB engine version (default: the current `engine_version`).
+    """
+    engine = engine_version() if engine is None else engine
+    canonical = json.dumps([pedigree_fp, liability_fp, repr(float(afreq)), engine])
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class FLBResultCache:
+    """
+    Stores FLB results on disk, keyed by the fingerprints of the pedigree and liability table,
+    the allele frequency and the engine version.
+
+    Every result is a small JSON file (<cache_dir>/<2 hex digits>/<key>.json), written atomically,
+    so concurrent runs can share a cache directory.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Parameters:
+            cache_dir (str or Path): Directory of the cache (created on first write).
+        """
+        self.cache_dir = str(cache_dir)
+        self.engine_version = engine_version()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, pedigree_fp, liability_fp, afreq):
+        """Returns the cache key of one FLB evaluation (see `flb_result_key`)."""
+        return flb_result_key(pedigree_fp, liability_fp, afreq, self.engine_version)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Returns the stored FLB result for a key, or None (counted as hit or miss)."""
+        try:
+            with open(self._path(key), "r") as f:
+                flb = json.load(f)["flb"]
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return flb
+
+    def put(self, key, flb, **metadata):
+        """
+        Stores an FLB result.
+
+        Parameters:
+            key (str): Cache key (see `key`).
+            flb (float): The FLB result.
+            **metadata: Additional information stored with the result (e.g. gene, afreq).
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"flb": flb, "engine_version": self.engine_version,
+                 "created": datetime.now().isoformat(timespec="seconds"), **metadata}
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            json.dump(entry, f, default=str)
+            tmp_path = f.name
+        os.replace(tmp_path, path)
+
+    def report(self):
+        """Logs the number of cache hits and misses."""
+        logging.info(f"FLB result cache: {self.hits} hit(s), {self.misses} miss(es).")
@@ -0,0 +1,168 @@
+# flb/flb_runner.py
+import asyncio
+import subprocess
+import tempfile
+import logging
+import numpy as np
+from pathlib import Path
+from heredicalc.pedconv.pedconv.pedigree import Pedigree
+from heredicalc.pedconv.importers.pedigree_importer_factory import PedigreeImporterFactory
+from heredicalc.pedconv.exporters.pedigree_exporter_factory import PedigreeExporterFactory
+
+R_SCRIPT_PATH = Path(__file__).resolve().parent / "flb_script.R"
+CLI_CUTOFF = 10*1024
+
+def run_flb_calculation(r_input, use_file=False):
+    """
+    Runs the FLB calculation in R, using the provided input data.
+
+    Parameters:
+    r_input (str or Path): If `use_file` is False, this is a string of R code; otherwise, it's a path to a file.
+    use_file (bool): If True, the R input is passed via a file; otherwise, it's passed directly as a string.
+
+    Returns:
+    str: The output of the R script (FLB result).
+    """
+    if not R_SCRIPT_PATH.exists():
+        raise FileNotFoundError(f"R script not found at {R_SCRIPT_PATH}")
+
+    # Define the arguments for subprocess.run
+    if use_file:
+        # Pass the file path as an argument to the R script
+        result = subprocess.run(
+            ["Rscript", R_SCRIPT_PATH, r_input],
+            capture_output=True, text=True
+        )
+    else:
+        # Pass the R code as stdin to the R script
+        result = subprocess.run(
+            ["Rscript", R_SCRIPT_PATH],
+            input=r_input,
+            capture_output=True, text=True
+        )
+
+    # Check for errors in the R script execution
+    if result.returncode != 0:
+        raise RuntimeError(f"Error in FLB calculation: {result.stderr}")
+
+    # Return the output of the R script (result from FLB calculation)
+    return result.stdout.strip()
+
+def execute_r_input(r_input_str):
+    """
+    Runs the R script on a complete input string, passing it via stdin or a temporary file.
+
+    Inputs shorter than CLI_CUTOFF are piped to R directly, larger ones are written to a
+    temporary file that is removed afterwards.
+
+    Parameters:
+    r_input_str (str): The R code defining the FLB inputs.
+
+    Returns:
+    str: The output of the R script.
+    """
+    logging.debug(r_input_str)
+    if len(r_input_str) < CLI_CUTOFF:
+        return run_flb_calculation(r_input_str)
+
+    with tempfile.NamedTemporaryFile(delete=False) as tmpfile:
+        tmpfile.write(r_input_str.encode())
+        tmpfile_path = tmpfile.name
+    try:
+        return run_flb_calculation(tmpfile_path, use_file=True)
+    finally:
+        Path(tmpfile_path).unlink()  # Delete the temporary file
+
+def build_flb_input(flb_pedigree, liability_vector_str, flb_liabilities, allele_freq):
+    """
+    Concatenates the R snippets for a single FLB evaluation.
+
+    Parameters:
+    flb_pedigree (str): R snippet defining the pedigree and genotype/affection vectors.
+    liability_vector_str (str): R snippet defining `liability`.
+    flb_liabilities (str): R snippet defining the `penetrances` matrix.
+    allele_freq (float): The allele frequency.
+
+    Returns:
+    str: The complete R input.
+    """
+    return f"{flb_pedigree}\n{liability_vector_str}\n{flb_liabilities}\nallele_freq <- {float(allele_freq)}"
+
+def load_flb_pedigree(pedigree_file, pedigree_format, drop_uninformative=False):
+    """
+    Imports a pedigree and converts it to the segregatr R snippet used by the FLB script.
+
+    Parameters:
+    pedigree_file (str, Path or file-like): The pedigree file (or a buffer holding its content).
+    pedigree_format (str): Format of the pedigree file (e.g., cool).
+    drop_uninformative (bool): Drop disconnected components without genotyped members (see prepare_flb_pedigree).
+
+    Returns:
+    tuple: (Pedigree with members sorted by 'id', R snippet defining the pedigree).
+
+    Raises:
+    PedigreeValidationError: If the pedigree is structurally invalid.
+    """
+    pedigree = Pedigree()
+    importer = PedigreeImporterFactory.create_importer(pedigree_format, pedigree_file)
+    importer.import_data(pedigree)
+    return pedigree, prepare_flb_pedigree(pedigree, drop_uninformative=drop_uninformative)
+
+def prepare_flb_pedigree(pedigree, drop_uninformative=False):
+    """
+    Validates the pedigree, sorts its members by 'id' (in place) and exports the segregatr R snippet.
+
+    Structural problems (unknown parents, parents of the wrong gender, ancestry cycles, ...) are
+    reported before R is started. Disconnected components without genotyped members and without
+    the index person do not change the FLB and can be dropped. The remaining components are kept
+    in one pedigree and evaluated together; separate FLBs per component are not supported.
+
+    Parameters:
+    pedigree (Pedigree): The pedigree to prepare.
+    drop_uninformative (bool): Remove uninformative components from the pedigree (in place).
+
+    Returns:
+    str: R snippet defining the pedigree and genotype/affection vectors.
+
+    Raises:
+    PedigreeValidationError: If the pedigree is structurally invalid.
+    """
+    graph = pedigree.graph()
+    graph.validate()
+    if drop_uninformative and graph.component_count > 1:
+        informative = graph.informative_components()
+        logging.info(f"Dropping {graph.component_count - len(informative)} uninformative pedigree component(s).")
+        pedigree.members_df = pedigree.members_df[np.isin(graph.component, informative)]
+    pedigree.members_df = pedigree.members_df.sort_values(by="id").reset_index(drop=True)
+    exporter = PedigreeExporterFactory.create_exporter("segregatr_flb", None)
+    return exporter.export_data(pedigree.members_df)
+
+async def run_flb_calculation_async(r_input_str):
+    """
+    Runs the FLB calculation in an asyncio subprocess, without blocking the event loop.
+
+    The R process is killed if the awaiting task is cancelled (e.g. on a timeout).
+
+    Parameters:
+    r_input_str (str): The R code defining the FLB inputs, passed via stdin.
+
+    Returns:
+    str: The output of the R script.
+    """
+    if not R_SCRIPT_PATH.exists():
+        raise FileNotFoundError(f"R script not found at {R_SCRIPT_PATH}")
+    process = await asyncio.create_subprocess_exec(
+        "Rscript", str(R_SCRIPT_PATH),
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await process.communicate(r_input_str.encode())
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Error in FLB calculation: {stderr.decode()}")
+    return stdout.decode().strip()
@@ -0,0 +1,288 @@
+# flb/flb_simulation.py
+import logging
+import numpy as np
+import pandas as pd
+from .flb_runner import execute_r_input
+from .liabilities_mapper import compact_liabilities, compute_liability_vector
+from heredicalc.pedconv.pedconv.pedigree_graph import PedigreeGraph
+from heredicalc.penetrances.exporters.flb_penetrance_exporter import FLBPenetranceExporter
+from heredicalc.penetrances.liability_bundle import liability_parts
+
+GENOTYPE_COUNTS = {"neg": 0, "het": 1, "hom": 2}
+UNAFFECTED = "Unaffected"
+DEFAULT_THRESHOLDS = (4.0, 8.0, 16.0)
+MAX_DRAWS_PER_REPLICATE = 10000  # Rejection sampling gives up below an acceptance rate of 1/10000
+
+def _r_vector(positions, ids):
+    return "c(" + ", ".join(str(ids[position]) for position in positions) + ")"
+
+def _r_list(masks, ids):
+    return "list(\n" + ",\n".join(f"  {_r_vector(np.flatnonzero(mask), ids)}" for mask in masks) + "\n)"
+
+def _phenotype_liabilities(classes_df, pedigree_df, phenotype, members):
+    # Liability class of the members (a mask) if they had (only) this phenotype, mapped like observed
+    # phenotypes; other members (the proband, members of unknown age) get class 0, which is not used
+    liabilities = np.zeros(len(pedigree_df), dtype=np.intp)
+    if members.any():
+        assumed = pedigree_df[members].copy()
+        assumed['phenotypes'] = [[{"phenotype": phenotype}]] * len(assumed)
+        liabilities[members] = np.array(compute_liability_vector(classes_df, assumed)) - 1
+    return liabilities
+
+def _observed_phenotype(phenotypes):
+    # The phenotype used for the liability class of a member (as in compute_liability_vector)
+    if phenotypes and phenotypes[0].get("phenotype") not in ("Unknown", None):
+        return phenotypes[0]["phenotype"]
+    return UNAFFECTED
+
+class GeneDropSimulator:
+    """
+    Simulates genotypes and phenotypes of a pedigree under the hypothesis that the variant is causal.
+
+    Genotypes are simulated by gene dropping through the pedigree graph, generation by generation,
+    for all replicates at once: the variant enters the pedigree through one founder (a rare variant),
+    chosen among the founders the proband descends from, and is transmitted with probability 1/2
+    per meiosis. Replicates in which the proband does not carry the variant, or which contradict
+    an observed genotype, are rejected, which conditions the simulation on the proband and the
+    observed genotypes.
+
+    Every member except the proband (and members of unknown age) is then affected with the
+    penetrance of its unaffected liability class (the risk of disease by its current age) for its
+    simulated genotype. Simulated cases are assigned their observed phenotype, or one of the
+    phenotypes of the liability table in proportion to its penetrance at their current age.
+    """
+
+    def __init__(self, pedigree_df, liabilities):
+        """
+        Parameters:
+            pedigree_df (pd.DataFrame): Pedigree members, sorted by 'id' (see prepare_flb_pedigree).
+            liabilities (pd.DataFrame or LiabilityBundle): The liability table.
+
+        Raises:
+            ValueError: If the pedigree has no index person or an observed genotype cannot be simulated.
+        """
+        self.pedigree_df = pedigree_df.reset_index(drop=True)
+        self.graph = PedigreeGraph(self.pedigree_df)
+        self.ids = self.pedigree_df['id'].to_numpy()
+        index_persons = np.flatnonzero(self.pedigree_df['is_index_person'].fillna(False).astype(bool).to_numpy())
+        if not len(index_persons):
+            raise ValueError("The simulation is conditional on the proband, but the pedigree has no index person.")
+        self.proband = index_persons[0]
+        self.observed_counts = self.pedigree_df['genotype_status'].map(GENOTYPE_COUNTS).to_numpy(dtype=float)
+        self.genotyped = ~np.isnan(self.observed_counts)
+        if self.observed_counts[self.proband] == 0:
+            raise ValueError("The proband is an observed non-carrier.")
+
+        # Founders the variant can enter through (those the proband descends from)
+        ancestors = np.zeros(self.graph.size, dtype=bool)
+        stack = [self.proband]
+        while stack:
+            position = stack.pop()
+            if not ancestors[position]:
+                ancestors[position] = True
+                stack.extend(parent for parent in (self.graph.father[position], self.graph.mother[position]) if parent >= 0)
+        self.entry_founders = self.graph.founders[ancestors[self.graph.founders]]
+        generations = self.graph.generation
+        self.generation_members = [np.flatnonzero(generations == generation)
+                                   for generation in range(1, generations.max() + 1)]
+
+        # Liability classes: unaffected, and for each phenotype of the table
+        classes_df, self.penetrance_matrix = liability_parts(liabilities)
+        self.penetrance_matrix = np.asarray(self.penetrance_matrix, dtype=float)
+        self.phenotypes = [phenotype for phenotype in dict.fromkeys(classes_df['phenotype']) if phenotype != UNAFFECTED]
+        ages = pd.to_numeric(self.pedigree_df['age_last_seen'], errors="coerce").to_numpy(dtype=float)
+        self.simulated = ~np.isnan(ages)
+        self.simulated[self.proband] = False
+        self.unaffected_classes = _phenotype_liabilities(classes_df, self.pedigree_df, UNAFFECTED, self.simulated)
+        self.phenotype_classes = np.stack([_phenotype_liabilities(classes_df, self.pedigree_df, phenotype, self.simulated)
+                                           for phenotype in self.phenotypes], axis=1)
+        self.observed_classes = np.array(compute_liability_vector(classes_df, self.pedigree_df)) - 1
+        observed = [_observed_phenotype(phenotypes) for phenotypes in self.pedigree_df['phenotypes']]
+        observed_unknown = np.array([bool(phenotypes) and any(p.get("phenotype") == "Unknown" for p in phenotypes)
+                                     for phenotypes in self.pedigree_df['phenotypes']])
+        self.observed_phenotype = np.array([self.phenotypes.index(phenotype) if phenotype in self.phenotypes else -1
+                                            for phenotype in observed])
+        self.observed_affected = self.observed_phenotype >= 0
+        # Members whose phenotype is not simulated and unknown stay unknown in every replicate
+        self.unknown = observed_unknown & ~self.simulated
+
+    def simulate_genotypes(self, replicates, rng):
+        """
+        Simulates the allele counts of all members by gene dropping, conditional on the proband
+        carrying the variant and on the observed genotypes.
+
+        Returns:
+            np.ndarray: Allele counts (0, 1 or 2) of shape (replicates, members).
+
+        Raises:
+            RuntimeError: If too few simulated replicates agree with the observed genotypes.
+        """
+        accepted = []
+        accepted_count = draws = 0
+        batch_size = max(replicates, 64)
+        while accepted_count < replicates:
+            if draws >= replicates * MAX_DRAWS_PER_REPLICATE:
+                raise RuntimeError(f"Only {accepted_count} of {draws} simulated replicates agree with the proband "
+                                   f"and the observed genotypes; the observations are too unlikely to simulate.")
+            counts = np.zeros((batch_size, self.graph.size), dtype=np.int8)
+            entry = rng.choice(self.entry_founders, size=batch_size)
+            counts[np.arange(batch_size), entry] = 1
+            for members in self.generation_members:
+                # Each parent transmits the variant with probability (allele count) / 2
+                from_father = rng.random((batch_size, len(members))) * 2 < counts[:, self.graph.father[members]]
+                from_mother = rng.random((batch_size, len(members))) * 2 < counts[:, self.graph.mother[members]]
+                counts[:, members] = from_father.astype(np.int8) + from_mother
+            agrees = (counts[:, self.proband] > 0) & np.all(
+                counts[:, self.genotyped] == self.observed_counts[self.genotyped], axis=1
+            )
+            accepted.append(counts[agrees])
+            accepted_count += int(agrees.sum())
+            draws += batch_size
+        logging.debug(f"Gene dropping accepted {accepted_count} of {draws} replicates.")
+        return np.concatenate(accepted)[:replicates]
+
+    def simulate_liabilities(self, counts, rng):
+        """
+        Simulates the affection status and liability class of all members for the given allele counts.
+
+        Returns:
+            tuple: (affected mask, 0-based liability classes), both of shape (replicates, members).
+        """
+        replicates = len(counts)
+        genotypes = np.minimum(counts, 2).astype(np.intp)
+        risks = self.penetrance_matrix[self.unaffected_classes[np.newaxis, :], genotypes]
+        affected = (rng.random(counts.shape) < np.nan_to_num(risks)) & self.simulated
+
+        # Phenotype of the simulated cases: the observed one, or drawn by the phenotype penetrances
+        weights = np.nan_to_num(self.penetrance_matrix[self.phenotype_classes[np.newaxis, :, :],
+                                                       genotypes[:, :, np.newaxis]])
+        totals = weights.sum(axis=2, keepdims=True)
+        weights = np.divide(weights, totals, out=np.full_like(weights, 1 / len(self.phenotypes)), where=totals > 0)
+        drawn = (rng.random((replicates, self.graph.size, 1)) > np.cumsum(weights, axis=2)).sum(axis=2)
+        drawn = np.minimum(drawn, len(self.phenotypes) - 1)
+        phenotype = np.where(self.observed_affected, self.observed_phenotype, drawn)
+        classes = np.where(affected, self.phenotype_classes[np.arange(self.graph.size), phenotype],
+                           self.unaffected_classes)
+        # The proband and members of unknown age keep their observed phenotype
+        fixed = ~self.simulated
+        affected = np.where(fixed, self.observed_affected, affected)
+        classes = np.where(fixed, self.observed_classes, classes)
+        return affected, classes
+
+    def simulate(self, replicates, seed=None, genotyped=None):
+        """
+        Simulates replicates of the pedigree.
+
+        Parameters:
+            replicates (int): Number of replicates.
+            seed (int): Random seed, for reproducible replicates.
+            genotyped (list): IDs of the members genotyped in the replicates, in addition to the
+                observed genotypes (e.g. relatives considered for genotyping); None for no others.
+
+        Returns:
+            dict: 'counts' (allele counts), 'genotyped' (mask of the genotyped members),
+            'affected' (affection statuses) and 'classes' (0-based liability classes),
+            each of shape (replicates, members), apart from 'genotyped' (members).
+        """
+        rng = np.random.default_rng(seed)
+        genotyped_mask = self.genotyped.copy()
+        genotyped_mask[self.proband] = True
+        if genotyped:
+            unknown = set(genotyped) - set(self.ids.tolist())
+            if unknown:
+                raise ValueError(f"Members not in the pedigree: {', '.join(map(str, sorted(unknown)))}")
+            genotyped_mask |= np.isin(self.ids, list(genotyped))
+        counts = self.simulate_genotypes(replicates, rng)
+        affected, classes = self.simulate_liabilities(counts, rng)
+        return {"counts": counts, "genotyped": genotyped_mask, "affected": affected, "classes": classes}
+
+def build_simulation_input(flb_pedigree, simulator, replicates, allele_freq):
+    """
+    Builds the R input evaluating the FLB of every simulated replicate.
+
+    Parameters:
+        flb_pedigree (str): R snippet defining the pedigree (see SegregatrFLBPedigreeExporter).
+        simulator (GeneDropSimulator): The simulator of the pedigree.
+        replicates (dict): Simulated replicates (see GeneDropSimulator.simulate).
+        allele_freq (float): The allele frequency.
+
+    Returns:
+        str: The R input for the simulation mode of the FLB script.
+    """
+    ids = simulator.ids
+    counts, genotyped = replicates["counts"], replicates["genotyped"]
+    # All replicates share one penetrance matrix, restricted to the classes they use
+    classes = replicates["classes"]
+    vector, matrix = compact_liabilities((classes.ravel() + 1).tolist(), simulator.penetrance_matrix)
+    liabilities = np.array(vector).reshape(classes.shape)
+    sim_liabilities = "list(\n" + ",\n".join(f"  c({', '.join(map(str, row))})" for row in liabilities) + "\n)"
+    return (
+        f"{flb_pedigree}\n"
+        f"unknown <- {_r_vector(np.flatnonzero(simulator.unknown), ids)}\n"
+        f"sim_carriers <- {_r_list((counts == 1) & genotyped, ids)}\n"
+        f"sim_homozygous <- {_r_list((counts == 2) & genotyped, ids)}\n"
+        f"sim_noncarriers <- {_r_list((counts == 0) & genotyped, ids)}\n"
+        f"sim_affected <- {_r_list(replicates['affected'], ids)}\n"
+        f"sim_liabilities <- {sim_liabilities}\n"
+        f"penetrances <- {FLBPenetranceExporter.format_penetrance_matrix(matrix)}\n"
+        f"allele_freq <- {float(allele_freq)}\n"
+    )
+
+def run_flb_simulation(flb_pedigree, pedigree_df, liabilities, allele_freq, replicates=1000, seed=None,
+                       genotyped=None, r_session=None):
+    """
+    Simulates replicates of a pedigree and evaluates the FLB of each of them in one R session.
+
+    Parameters:
+        flb_pedigree (str): R snippet defining the pedigree (see SegregatrFLBPedigreeExporter).
+        pedigree_df (pd.DataFrame): Pedigree members, sorted by 'id'.
+        liabilities (pd.DataFrame or LiabilityBundle): The liability table.
+        allele_freq (float): The allele frequency.
+        replicates (int): Number of replicates.
+        seed (int): Random seed, for reproducible replicates.
+        genotyped (list): IDs of members genotyped in the replicates in addition to the observed genotypes.
+        r_session (RSession): Optional running R session; if None, a new Rscript process is started.
+
+    Returns:
+        pd.DataFrame: One row per replicate with 'flb', the numbers of carriers ('carriers') and
+        affected members ('affected') and the number of genotyped carriers ('genotyped_carriers').
+    """
+    simulator = GeneDropSimulator(pedigree_df, liabilities)
+    simulated = simulator.simulate(replicates, seed=seed, genotyped=genotyped)
+    r_input_str = build_simulation_input(flb_pedigree, simulator, simulated, allele_freq)
+    logging.info(f"Evaluating the FLB of {replicates} simulated replicates in one R session.")
+    output = r_session.evaluate(r_input_str) if r_session is not None else execute_r_input(r_input_str)
+    flbs = [float(line) for line in output.split()]
+    if len(flbs) != replicates:
+        raise RuntimeError(f"Expected {replicates} FLB values from R, got {len(flbs)}.")
+    return pd.DataFrame({
+        "replicate": np.arange(1, replicates + 1),
+        "flb": flbs,
+        "carriers": (simulated["counts"] > 0).sum(axis=1),
+        "genotyped_carriers": ((simulated["counts"] > 0) & simulated["genotyped"]).sum(axis=1),
+        "affected": simulated["affected"].sum(axis=1),
+    })
+
+def summarize_flb_simulation(simulation, thresholds=DEFAULT_THRESHOLDS):
+    """
+    Summarizes the simulated FLB distribution.
+
+    Parameters:
+        simulation (pd.DataFrame): Result of run_flb_simulation.
+        thresholds (list): FLB thresholds; the power is the share of replicates reaching a threshold.
+
+    Returns:
+        pd.DataFrame: Table with columns 'statistic' and 'value'.
+    """
+    flbs = simulation["flb"].to_numpy(dtype=float)
+    rows = [
+        ("replicates", len(flbs)),
+        ("mean", flbs.mean()),
+        ("sd", flbs.std(ddof=1) if len(flbs) > 1 else np.nan),
+        ("geometric_mean", np.exp(np.log(flbs[flbs > 0]).mean()) if (flbs > 0).any() else np.nan),
+    ]
+    for quantile in (0.05, 0.25, 0.5, 0.75, 0.95):
+        rows.append((f"q{int(quantile * 100):02d}", np.quantile(flbs, quantile)))
+    for threshold in thresholds:
+        rows.append((f"power_flb_ge_{threshold:g}", (flbs >= threshold).mean()))
+    return pd.DataFrame(rows, columns=["statistic", "value"])
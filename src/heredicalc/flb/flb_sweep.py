@@ -0,0 +1,128 @@
+# flb/flb_sweep.py
+import io
+import logging
+import pandas as pd
+from .flb_runner import execute_r_input
+from .liabilities_mapper import compact_liabilities, compute_liability_vector
+from heredicalc.penetrances.exporters.flb_penetrance_exporter import FLBPenetranceExporter
+from heredicalc.penetrances.liability_bundle import LIABILITY_CLASS_COLUMNS, liability_parts
+
+def _r_string(value):
+    """Quotes a Python string as an R string literal."""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+def _layout_key(liabilities_df):
+    """Returns a hashable key describing the liability class layout of a table."""
+    layout = liabilities_df[LIABILITY_CLASS_COLUMNS]
+    return tuple(pd.util.hash_pandas_object(layout, index=True).tolist())
+
+def prepare_liability_sets(liability_tables, pedigree_df):
+    """
+    Computes the liability vector and penetrance matrix for every liability table.
+
+    Liability vectors only depend on the class layout (gender, phenotype, age bounds),
+    so tables sharing a layout (e.g. derived from the same incidence data) are mapped once.
+    Each penetrance matrix is compacted to the rows used in the pedigree (see `compact_liabilities`).
+
+    Parameters:
+        liability_tables (dict): Mapping of set name to liability classes DataFrame or LiabilityBundle.
+        pedigree_df (pd.DataFrame): Pedigree members, sorted by 'id'.
+
+    Returns:
+        dict: Mapping of set name to a (liability vector, penetrance matrix) tuple.
+    """
+    vectors_by_layout = {}
+    liability_sets = {}
+    for set_name, liabilities_df in liability_tables.items():
+        if liabilities_df.empty:
+            raise ValueError(f"Liability table '{set_name}' is empty.")
+        classes_df, penetrance_matrix = liability_parts(liabilities_df)
+        layout_key = _layout_key(classes_df)
+        if layout_key not in vectors_by_layout:
+            vectors_by_layout[layout_key] = compute_liability_vector(classes_df, pedigree_df)
+        liability_sets[set_name] = compact_liabilities(vectors_by_layout[layout_key], penetrance_matrix)
+    logging.debug(f"Prepared {len(liability_sets)} liability sets from {len(vectors_by_layout)} distinct layouts.")
+    return liability_sets
+
+def build_sweep_input(flb_pedigree, liability_sets, allele_freqs):
+    """
+    Builds the R input for evaluating all liability sets against all allele frequencies.
+
+    Parameters:
+        flb_pedigree (str): R snippet defining the pedigree and genotype/affection vectors.
+        liability_sets (dict): Mapping of set name to a (liability vector, penetrance matrix) tuple.
+        allele_freqs (list): Allele frequencies to evaluate.
+
+    Returns:
+        str: The complete R input for the sweep mode of the FLB script.
+    """
+    liabilities = ",\n".join(
+        f"  {_r_string(name)} = c({', '.join(map(str, vector))})"
+        for name, (vector, _) in liability_sets.items()
+    )
+    penetrances = ",\n".join(
+        f"  {_r_string(name)} = {FLBPenetranceExporter.format_penetrance_matrix(matrix)}"
+        for name, (_, matrix) in liability_sets.items()
+    )
+    freqs = ", ".join(repr(float(freq)) for freq in allele_freqs)
+    return (
+        f"{flb_pedigree}\n"
+        f"sweep_liabilities <- list(\n{liabilities}\n)\n"
+        f"sweep_penetrances <- list(\n{penetrances}\n)\n"
+        f"sweep_freqs <- c({freqs})\n"
+    )
+
+def parse_sweep_output(output):
+    """
+    Parses the tab-separated result table printed by the FLB script in sweep mode.
+
+    Parameters:
+        output (str): Standard output of the R script.
+
+    Returns:
+        pd.DataFrame: One row per (liability_set, afreq) with the FLB value.
+    """
+    result = pd.read_csv(io.StringIO(output), sep="\t", dtype={"liability_set": str})
+    missing_columns = {"liability_set", "afreq", "flb"} - set(result.columns)
+    if missing_columns:
+        raise RuntimeError(f"Unexpected FLB sweep output, missing columns: {missing_columns}")
+    return result
+
+def prepare_sweep_input(flb_pedigree, pedigree_df, liability_tables, allele_freqs):
+    """
+    Validates the sweep parameters and builds the complete R input of the sweep.
+
+    Parameters:
+        flb_pedigree (str): R snippet defining the pedigree (see SegregatrFLBPedigreeExporter).
+        pedigree_df (pd.DataFrame): Pedigree members, sorted by 'id'.
+        liability_tables (dict): Mapping of set name to liability classes DataFrame.
+        allele_freqs (list): Allele frequencies to evaluate.
+
+    Returns:
+        str: The R input for the sweep mode of the FLB script.
+    """
+    if not liability_tables or not allele_freqs:
+        raise ValueError("An FLB sweep needs at least one liability table and one allele frequency.")
+    liability_sets = prepare_liability_sets(liability_tables, pedigree_df)
+    logging.info(f"Evaluating {len(liability_sets) * len(allele_freqs)} FLB combinations in one R session.")
+    return build_sweep_input(flb_pedigree, liability_sets, allele_freqs)
+
+def run_flb_sweep(flb_pedigree, pedigree_df, liability_tables, allele_freqs, r_session=None):
+    """
+    Evaluates FLB for every combination of liability table and allele frequency in one R session.
+
+    Parameters:
+        flb_pedigree (str): R snippet defining the pedigree (see SegregatrFLBPedigreeExporter).
+        pedigree_df (pd.DataFrame): Pedigree members, sorted by 'id'.
+        liability_tables (dict): Mapping of set name to liability classes DataFrame.
+        allele_freqs (list): Allele frequencies to evaluate.
+        r_session (RSession): Optional running R session; if None, a new Rscript process is started.
+
+    Returns:
+        pd.DataFrame: Tidy table with columns 'liability_set', 'afreq' and 'flb'.
+    """
+    r_input_str = prepare_sweep_input(flb_pedigree, pedigree_df, liability_tables, allele_freqs)
+    if r_session is not None:
+        return parse_sweep_output(r_session.evaluate(r_input_str))
+    return parse_sweep_output(execute_r_input(r_input_str))
@@ -1,6 +1,14 @@
+import numpy as np
 import pandas as pd
 import logging
 import sys
+from heredicalc.penetrances.liability_bundle import liability_classes
+
+# Version of the mapping of pedigree members to liability classes, part of the FLB engine version
+# (see flb_result_cache.engine_version): bump it when the mapping changes, so that FLB results
+# calculated with the previous mapping are not reused
+# 2: ages in the open-ended last age class map to that class (instead of class 1)
+MAPPER_VERSION = 2
 
 def map_liabilities(liabilities_df, pedigree_df):
     """
@@ -14,11 +22,71 @@ def map_liabilities(liabilities_df, pedigree_df):
     Returns:
     str: A string representing a numeric vector of liability classes for each individual in the pedigree.
     """
+    liability_vector = compute_liability_vector(liabilities_df, pedigree_df)
+    return format_liability_vector(liability_vector)
+
+def format_liability_vector(liability_vector, name="liability"):
+    """
+    Formats a liability vector as an R assignment.
+
+    Parameters:
+    liability_vector (list): 1-based liability class indices, one per individual.
+    name (str): Name of the R variable.
+
+    Returns:
+    str: R code assigning the vector, e.g. "liability <- c(1, 5, 3)".
+    """
+    liability_str = f"{name} <- c(" + ", ".join(map(str, liability_vector)) + ")"
+    logging.debug(liability_str)
+    return liability_str
+
+def compact_liabilities(liability_vector, penetrance_matrix):
+    """
+    Restricts a penetrance matrix to the liability classes used in a pedigree and merges
+    identical rows, so the R input scales with the pedigree instead of the liability table.
+
+    Parameters:
+    liability_vector (list): 1-based liability class indices, one per individual.
+    penetrance_matrix (array-like): Penetrances of all liability classes, shape (classes, 3).
+
+    Returns:
+    tuple: (liability vector indexing the compacted matrix, compacted penetrance matrix).
+    """
+    penetrance_matrix = np.asarray(penetrance_matrix, dtype=float)
+    row_numbers = {}
+    rows = []
+    compact_vector = []
+    for liability_class in liability_vector:
+        row = penetrance_matrix[liability_class - 1]
+        # Rows are compared bytewise, so identical NaN rows are merged as well
+        key = row.tobytes()
+        if key not in row_numbers:
+            row_numbers[key] = len(rows) + 1
+            rows.append(row)
+        compact_vector.append(row_numbers[key])
+    compact_matrix = np.array(rows).reshape(-1, penetrance_matrix.shape[1])
+    logging.debug(f"Penetrance matrix compacted from {len(penetrance_matrix)} to {len(compact_matrix)} rows.")
+    return compact_vector, compact_matrix
+
+def compute_liability_vector(liabilities_df, pedigree_df):
+    """
+    Determines the 1-based liability class index for every individual in the pedigree.
+
+    Parameters:
+    liabilities_df (pd.DataFrame or LiabilityBundle): Liability classes with gender, phenotype and age class bounds.
+    pedigree_df (pd.DataFrame): Pedigree members with gender, age and phenotype information.
+
+    Returns:
+    list: Liability class indices in the order of the pedigree sorted by 'id'.
+    """
     
     # Load liabilities and pedigree data
     #liabilities_df = pd.read_pickle(liabilities_file)
     #pedigree_df = pd.read_csv(pedigree_file, delim_whitespace=True)
     
+    # Only the class index is needed; for bundles this avoids touching the penetrances
+    liabilities_df = liability_classes(liabilities_df)
+
     # Ensure the pedigree data is sorted by 'id'
     pedigree_df = pedigree_df.sort_values(by='id').reset_index(drop=True)
     logging.debug(pedigree_df)
@@ -52,10 +120,10 @@ def map_liabilities(liabilities_df, pedigree_df):
         ]
 
 
-        # Find the matching liability class based on age range
+        # Find the matching liability class based on age range (the last age class has no upper bound)
         matched_liability = matching_liabilities[
             (matching_liabilities['age_class_lower'] <= ped_age) &
-            (matching_liabilities['age_class_upper'] >= ped_age)
+            ((matching_liabilities['age_class_upper'] >= ped_age) | matching_liabilities['age_class_upper'].isna())
         ]        
         logging.debug ("Matching liabilities - age class:")
         logging.debug(matched_liability)
@@ -69,8 +137,4 @@ def map_liabilities(liabilities_df, pedigree_df):
 
         liability_vector.append(liability_class_index)
 
-    # Convert the liability vector to a string format suitable for R
-    liability_str = "liability <- c(" + ", ".join(map(str, liability_vector)) + ")"
-    logging.debug(liability_str)
-    #sys.exit(0)
-    return liability_str
\ No newline at end of file
+    return liability_vector
\ No newline at end of file
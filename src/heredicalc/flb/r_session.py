@@ -0,0 +1,93 @@
+# flb/r_session.py
+import subprocess
+import threading
+import logging
+from .flb_runner import R_SCRIPT_PATH
+
+WORKER_END_MARKER = "#<END>"
+WORKER_ERROR_PREFIX = "#<ERROR> "
+
+class RSession:
+    """
+    A long-lived R process running the FLB script in worker mode.
+
+    Starting R and loading segregatr dominates the cost of a single FLB evaluation. An RSession
+    starts R once and then evaluates one FLB input after the other over stdin/stdout. Calls to
+    `evaluate` are serialized, so a session can be shared between threads; use several sessions
+    to evaluate inputs in parallel.
+    """
+
+    def __init__(self, r_script_path=None):
+        """
+        Parameters:
+            r_script_path (Path): Path to the FLB R script (default: the bundled flb_script.R).
+        """
+        self.r_script_path = r_script_path or R_SCRIPT_PATH
+        self._process = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Starts the R worker process if it is not running."""
+        if self._process is not None and self._process.poll() is None:
+            return
+        if not self.r_script_path.exists():
+            raise FileNotFoundError(f"R script not found at {self.r_script_path}")
+        logging.debug(f"Starting R worker session with {self.r_script_path}")
+        self._process = subprocess.Popen(
+            ["Rscript", self.r_script_path, "--worker"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1
+        )
+
+    def evaluate(self, r_input_str):
+        """
+        Evaluates one FLB input (single or sweep) in the running session.
+
+        Parameters:
+            r_input_str (str): R code defining the FLB inputs, as for `execute_r_input`.
+
+        Returns:
+            str: The output of the evaluation, as printed by the FLB script.
+
+        Raises:
+            RuntimeError: If R reports an error or the worker process terminates.
+        """
+        with self._lock:
+            self.start()
+            try:
+                self._process.stdin.write(r_input_str.rstrip("\n") + f"\n{WORKER_END_MARKER}\n")
+                self._process.stdin.flush()
+            except BrokenPipeError:
+                self._process = None
+                raise RuntimeError("Error in FLB calculation: R worker session terminated.")
+
+            output_lines = []
+            for line in self._process.stdout:
+                line = line.rstrip("\n")
+                if line == WORKER_END_MARKER:
+                    break
+                output_lines.append(line)
+            else:
+                self._process = None
+                raise RuntimeError("Error in FLB calculation: R worker session terminated.")
+
+        if output_lines and output_lines[0].startswith(WORKER_ERROR_PREFIX):
+            raise RuntimeError(f"Error in FLB calculation: {output_lines[0][len(WORKER_ERROR_PREFIX):]}")
+        return "\n".join(output_lines).strip()
+
+    def close(self):
+        """Stops the R worker process."""
+        with self._lock:
+            if self._process is not None:
+                self._process.stdin.close()
+                try:
+                    self._process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+                self._process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
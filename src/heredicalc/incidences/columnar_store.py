@@ -0,0 +1,194 @@
+# incidences/columnar_store.py
+import os
+import json
+import shutil
+import logging
+import pandas as pd
+
+# pyarrow is an optional dependency and slow to import, so it is loaded on first use
+pa = ds = pq = None
+
+STORE_DIR_NAME = "columnar_store"
+STORE_METADATA_FILE = "_store.json"
+DEFAULT_ROW_GROUP_SIZE = 512
+
+def _require_pyarrow():
+    global pa, ds, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The columnar incidence store needs pyarrow (pip install pyarrow).")
+        pa, ds, pq = pyarrow, pyarrow.dataset, pyarrow.parquet
+
+def _column_name(spec):
+    # Headerless CSVs are addressed by column position, stored under the position as name
+    return str(spec)
+
+class ColumnarIncidenceStore:
+    """
+    Parquet store of all per-population CSV files of a dataset volume.
+
+    The store is partitioned by population (one hive partition per population file). Inside a
+    partition the rows are sorted by phenotype and split into row groups of bounded size, whose
+    min/max statistics let reads with a phenotype, gender or age filter skip unrelated row groups.
+    Rows are kept exactly as in the CSV files, so the incidence models parse them unchanged.
+    """
+
+    def __init__(self, store_dir):
+        """
+        Parameters:
+            store_dir (str): Directory of the store (see `build`).
+        """
+        _require_pyarrow()
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, STORE_METADATA_FILE), "r") as f:
+            self.metadata = json.load(f)
+        self._dataset = None
+
+    @staticmethod
+    def store_path(data_dir):
+        return os.path.join(data_dir, STORE_DIR_NAME)
+
+    @classmethod
+    def open(cls, data_dir):
+        """Returns the store of a data directory, or None if it was not built or pyarrow is missing."""
+        store_dir = cls.store_path(data_dir)
+        if not os.path.exists(os.path.join(store_dir, STORE_METADATA_FILE)):
+            return None
+        try:
+            return cls(store_dir)
+        except ImportError as e:
+            logging.warning(f"Ignoring columnar store {store_dir}: {e}")
+            return None
+
+    @classmethod
+    def build(cls, data_dir, source_config, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        """
+        Converts the per-population CSV files of a data directory into a store.
+
+        Parameters:
+            data_dir (str): Directory holding the <population>.csv files.
+            source_config (dict): Configuration of the dataset from sources.yaml.
+            row_group_size (int): Maximum number of rows per row group.
+
+        Returns:
+            ColumnarIncidenceStore: The new store (an existing store is replaced).
+        """
+        _require_pyarrow()
+        has_header = source_config.get("has_header", False)
+        column_mappings = source_config.get("column_mappings", {})
+        phenotype_column = _column_name(column_mappings.get("phenotype_col"))
+        csv_files = sorted(name for name in os.listdir(data_dir) if name.endswith(".csv"))
+        if not csv_files:
+            raise FileNotFoundError(f"No population files found in {data_dir}")
+
+        tables = {}
+        for file_name in csv_files:
+            df = pd.read_csv(os.path.join(data_dir, file_name), header=0 if has_header else None)
+            df.columns = [str(column) for column in df.columns]
+            df = df.sort_values(phenotype_column, kind="stable").reset_index(drop=True)
+            tables[file_name[:-len(".csv")]] = pa.Table.from_pandas(df, preserve_index=False)
+        schema = pa.unify_schemas([table.schema for table in tables.values()], promote_options="permissive")
+
+        store_dir = cls.store_path(data_dir)
+        tmp_dir = store_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        for population, table in tables.items():
+            partition_dir = os.path.join(tmp_dir, f"population={population}")
+            os.makedirs(partition_dir)
+            pq.write_table(table.cast(schema), os.path.join(partition_dir, "part-0.parquet"),
+                           row_group_size=row_group_size, write_statistics=True)
+        metadata = {
+            "has_header": has_header,
+            "columns": schema.names,
+            "phenotype_column": phenotype_column,
+            "gender_column": _column_name(column_mappings.get("gender_col")),
+            "age_column": _column_name(column_mappings.get("age_col")),
+            "populations": sorted(tables),
+        }
+        with open(os.path.join(tmp_dir, STORE_METADATA_FILE), "w") as f:
+            json.dump(metadata, f, indent=2)
+        shutil.rmtree(store_dir, ignore_errors=True)
+        os.replace(tmp_dir, store_dir)
+        logging.info(f"Columnar store with {len(tables)} populations written to {store_dir}")
+        return cls(store_dir)
+
+    @property
+    def populations(self):
+        return self.metadata["populations"]
+
+    @property
+    def dataset(self):
+        if self._dataset is None:
+            partitioning = ds.partitioning(pa.schema([("population", pa.string())]), flavor="hive")
+            self._dataset = ds.dataset(self.store_dir, format="parquet", partitioning=partitioning,
+                                       exclude_invalid_files=True)
+        return self._dataset
+
+    def read(self, populations=None, phenotype_ids=None, gender_codes=None, age_class_ids=None):
+        """
+        Reads the raw rows matching the filters; filters are pushed down to partitions and row groups.
+
+        Parameters:
+            populations (list): Population keys (default: all).
+            phenotype_ids (list): Raw phenotype IDs as used in the CSV files.
+            gender_codes (list): Raw gender codes.
+            age_class_ids (list): Raw age class IDs.
+
+        Returns:
+            pd.DataFrame: Rows with the CSV columns (named as in the CSV, or by position for headerless
+            files) and a 'population' column.
+        """
+        expression = None
+        if populations is not None:
+            expression = ds.field("population").isin([str(population) for population in populations])
+        for column, values in ((self.metadata["phenotype_column"], phenotype_ids),
+                               (self.metadata["gender_column"], gender_codes),
+                               (self.metadata["age_column"], age_class_ids)):
+            if values is None:
+                continue
+            condition = ds.field(column).isin(list(values))
+            expression = condition if expression is None else expression & condition
+        df = self.dataset.to_table(filter=expression).to_pandas()
+        if not self.metadata["has_header"]:
+            df.columns = [int(column) if column.isdigit() else column for column in df.columns]
+        return df
+
+    def read_population(self, population, phenotype_ids=None):
+        """Reads the rows of one population, in the layout of its CSV file."""
+        return self.read(populations=[population], phenotype_ids=phenotype_ids).drop(columns="population")
+
+def query_incidences(source_config, data_dir, populations=None, phenotypes=None, genders=None, age_class_ids=None):
+    """
+    Queries raw incidence rows across populations by canonical phenotype names and genders.
+
+    Example: breast cancer rows of women aged 40-44 in all registries:
+        query_incidences(config, data_dir, phenotypes=["BreastCancer"], genders=["F"], age_class_ids=[9])
+
+    Parameters:
+        source_config (dict): Configuration of the dataset from sources.yaml.
+        data_dir (str): Data directory of the dataset.
+        populations (list): Population keys (default: all).
+        phenotypes (list): Canonical phenotype names (mapped to IDs via phenotype_mappings).
+        genders (list): "M" and/or "F" (mapped via gender_mapping).
+        age_class_ids (list): Raw age class IDs (1-based, as in the data files).
+
+    Returns:
+        pd.DataFrame: Matching rows with a 'population' column.
+    """
+    store = ColumnarIncidenceStore.open(data_dir)
+    if store is None:
+        raise FileNotFoundError(f"No columnar store in {data_dir}; build it first (requires pyarrow).")
+    phenotype_ids = None
+    if phenotypes is not None:
+        mappings = source_config.get("phenotype_mappings", {})
+        phenotype_ids = [id_ for phenotype in phenotypes for id_ in mappings.get(phenotype, [])]
+    gender_codes = None
+    if genders is not None:
+        gender_mapping = source_config.get("gender_mapping", {})
+        codes = {"M": gender_mapping.get("male", 1), "F": gender_mapping.get("female", 2)}
+        gender_codes = [codes[gender] for gender in genders]
+    return store.read(populations, phenotype_ids, gender_codes, age_class_ids)
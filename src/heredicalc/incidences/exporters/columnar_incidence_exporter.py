@@ -0,0 +1,27 @@
+# src/incidences/exporters/columnar_incidence_exporter.py
+from .incidence_exporter import IncidenceExporter
+from heredicalc.core.columnar_export import ColumnarExporterMixin
+
+class ColumnarIncidenceExporter(ColumnarExporterMixin, IncidenceExporter):
+    """
+    Exports incidence tables in a portable columnar format (see core.columnar_export).
+    Subclasses set `table_format`.
+    """
+
+class ArrowIncidenceExporter(ColumnarIncidenceExporter):
+    """
+    Exports incidence tables as Arrow IPC (Feather v2) files.
+    """
+    table_format = "arrow"
+
+class ParquetIncidenceExporter(ColumnarIncidenceExporter):
+    """
+    Exports incidence tables as Parquet files.
+    """
+    table_format = "parquet"
+
+class NpyIncidenceExporter(ColumnarIncidenceExporter):
+    """
+    Exports incidence tables as a directory of .npy files with a metadata.json description.
+    """
+    table_format = "npy"
@@ -0,0 +1,21 @@
+# src/incidences/exporters/incidence_exporter.py
+
+from abc import ABC, abstractmethod
+
+class IncidenceExporter(ABC):
+    """
+    Abstract base class for incidence table exporters.
+    """
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+
+    @abstractmethod
+    def export_data(self, incidence_table):
+        """
+        Abstract method to export an incidence table.
+
+        Parameters:
+            incidence_table (pd.DataFrame): Incidence table with cases, person years and rates.
+        """
+        pass
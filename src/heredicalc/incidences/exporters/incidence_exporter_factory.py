@@ -0,0 +1,34 @@
+# src/incidences/exporters/incidence_exporter_factory.py
+
+import logging
+from heredicalc.core.plugin_registry import PluginRegistry
+
+INCIDENCE_EXPORTERS = PluginRegistry("incidence_exporters", {
+    "plain": ".plain_incidence_exporter:PlainIncidenceExporter",
+    "arrow": ".columnar_incidence_exporter:ArrowIncidenceExporter",
+    "parquet": ".columnar_incidence_exporter:ParquetIncidenceExporter",
+    "npy": ".columnar_incidence_exporter:NpyIncidenceExporter",
+}, package=__package__)
+
+class IncidenceExporterFactory:
+    """
+    Factory class to create incidence exporter instances based on specified output format.
+    """
+
+    @staticmethod
+    def create_exporter(output_format, output_file):
+        """
+        Create an incidence exporter based on the specified format.
+
+        Parameters:
+            output_format (str): The format of the export (e.g., "parquet").
+            output_file (str): Path to the output file or "stdout" for standard output.
+
+        Returns:
+            IncidenceExporter: An instance of a specific incidence exporter.
+        """
+        if output_format not in INCIDENCE_EXPORTERS:
+            raise ValueError(f"Unknown incidence export format: {output_format}")
+        exporter_class = INCIDENCE_EXPORTERS.get(output_format)
+        logging.debug(f"Creating {exporter_class.__name__} instance.")
+        return exporter_class(output_file)
@@ -0,0 +1,29 @@
+# src/incidences/exporters/plain_incidence_exporter.py
+import logging
+import pandas as pd
+from .incidence_exporter import IncidenceExporter
+
+class PlainIncidenceExporter(IncidenceExporter):
+    """
+    Exports incidence tables in plain text (stdout) or as CSV file.
+    """
+
+    def export_data(self, incidence_table):
+        """
+        Prints the incidence table or writes it as CSV.
+
+        Parameters:
+            incidence_table (pd.DataFrame): Incidence table with cases, person years and rates.
+        """
+        if self.output_file is None:
+            return incidence_table
+        elif self.output_file == "stdout":
+            print(incidence_table)
+            return True
+        try:
+            incidence_table.to_csv(self.output_file)
+            logging.debug(f"Data successfully saved to {self.output_file}")
+            return True
+        except (FileNotFoundError, IOError, OSError) as e:
+            logging.error(f"Error saving data to {self.output_file}: {e}")
+            return False
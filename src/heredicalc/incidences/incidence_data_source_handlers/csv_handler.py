@@ -8,7 +8,7 @@ class CsvDataHandler(DataSourceHandler):
     def __init__(self, source_config, base_data_dir=None, force_download=False):
         super().__init__(source_config, base_data_dir=base_data_dir, force_download=force_download)
 
-    def download_and_extract(self):
+    def download_and_extract(self, file_path=None):
         """
         Downloads an uncompressed file directly into the data directory.
         Since CSV is an uncompressed format, no download is necessary.
@@ -1,21 +1,51 @@
 # incidences/incidence_data_source_handlers/data_source_handler.py
 import os
+import json
+import shutil
 import logging
 from datetime import datetime
-import requests
 from abc import ABC, abstractmethod
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+from pathlib import Path
 from heredicalc.core.config import PROJECT_ROOT
+from heredicalc.core.file_lock import data_dir_lock, sibling_path
+from heredicalc.core.run_context import current_context
+
+# Mirror base URLs (or local directories) of this deployment, separated by commas. A dataset is
+# looked up as <mirror>/<data_dir>/<file name of its url> before falling back to its url.
+MIRRORS_ENV = "HEREDICALC_INCIDENCE_MIRRORS"
+FETCH_METADATA_FILE = "fetch_metadata.json"
+HISTORY_FILE = "download_history.log"
+# Seconds to wait for a connection and between received bytes, so a stalled location is skipped
+# (sources.yaml: `download_timeout`)
+DOWNLOAD_TIMEOUT = (10, 60)
 
 class DataSourceHandler(ABC):
-    """Abstract base class for data download, verification, and management."""
+    """
+    Abstract base class for data download, verification, and management.
+
+    Downloads go to `work_dir`: the data directory itself, or a staging directory while
+    `handle_data` updates the data of a dataset (see `update_atomically`).
+    """
 
     def __init__(self, source_config, base_data_dir=None, force_download=False):
         self.base_data_dir = base_data_dir or os.path.join(PROJECT_ROOT,"data_sources","incidences")
         self.source_config = source_config
         self.data_dir = os.path.join(self.base_data_dir, source_config["data_dir"])
         self.force_download = force_download
-        self.history_file = os.path.join(self.data_dir, "download_history.log")
+        self.work_dir = self.data_dir
+        self.lock = data_dir_lock(self.data_dir)
         self.url = source_config["url"]
+        self.fetched_url = None
+
+    @property
+    def history_file(self):
+        return os.path.join(self.work_dir, HISTORY_FILE)
+
+    @property
+    def metadata_file(self):
+        return os.path.join(self.work_dir, FETCH_METADATA_FILE)
 
     def check_data_exists(self):
         """Check if the data directory already exists."""
@@ -25,11 +55,18 @@ class DataSourceHandler(ABC):
         """Logs a new timestamp in the download history file."""
         timestamp = datetime.now().isoformat()
         with open(self.history_file, "a") as f:
-            f.write(f"Downloaded data from {self.url} : {timestamp}\n")
+            f.write(f"Downloaded data from {self.fetched_url or self.url} : {timestamp}\n")
         logging.info(f"Download timestamp logged: {timestamp}")
 
     def prompt_for_redownload(self):
-        """Prompt the user if they want to redownload existing data."""
+        """
+        Prompt the user if they want to redownload existing data.
+
+        Outside an interactive run context (see RunContext) the data is kept without asking.
+        """
+        context = current_context()
+        if not context.interactive:
+            return context.confirm(f"Redownload the existing data of {self.data_dir}?")
         if os.path.exists(self.history_file):
             with open(self.history_file, "r") as f:
                 last_download = f.readlines()[-1].strip()
@@ -37,54 +74,259 @@ class DataSourceHandler(ABC):
         else:
             print("Data directory exists but no history found.")
 
-        user_input = input("\nDo you want to redownload the data? (y/n): ").strip().lower()
-        return user_input == "y"
+        return context.confirm("\nDo you want to redownload the data?")
+
+    def data_dir_stamp(self):
+        """Returns an identifier of the published data directory (changes when it is replaced), or None."""
+        try:
+            stat = os.stat(self.data_dir)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
 
     def handle_data(self):
-        """Main method to handle data download based on conditions."""
+        """
+        Main method to handle data download based on conditions.
+
+        Safe to run in several processes at once: downloads run under the exclusive lock of the
+        dataset and are published atomically (see `update_atomically`). Processes that waited for
+        the lock reuse data published in the meantime instead of downloading it again.
+        """
         if self.check_data_exists():
             if self.force_download == "ask":
-                if self.prompt_for_redownload():
-                    self.force_download == "no"
-                else:
-                    self.force_download == "yes"
-            if self.force_download == "yes":
-                self.clear_data_dir()
-                self.download_and_extract()
-            else:
+                self.force_download = "yes" if self.prompt_for_redownload() else "no"
+            if self.force_download not in ("yes", "if_changed"):
                 logging.info("Data download skipped.")
-        else:
-            self.download_and_extract()
+                self.update_columnar_store()
+                return
 
-    def clear_data_dir(self):
-        """Clears all files from the data directory except for the history file."""
-        logging.info(f"Clearing data directory: {self.data_dir}")
-        for file in os.listdir(self.data_dir):
-            file_path = os.path.join(self.data_dir, file)
-            if file_path != self.history_file:
-                os.remove(file_path)
-        logging.info("Data directory cleared except for download history.")
+        stamp = self.data_dir_stamp()
+        with self.lock.exclusive():
+            published_stamp = self.data_dir_stamp()
+            if published_stamp is not None and published_stamp != stamp:
+                logging.info("Incidence data was published by another process, download skipped.")
+            elif published_stamp is None or self.force_download == "yes":
+                self.update_atomically(self.download_and_extract)
+            else:
+                self.refresh_if_changed()
+        self.update_columnar_store()
+
+    def update_atomically(self, update):
+        """
+        Runs a data update in a staging directory and publishes it in place of the data directory.
+
+        The staging directory starts with the download history and fetch metadata of the current
+        data. Readers holding the shared lock never see a partial directory, and a failed update
+        leaves the current data untouched. Must be called with the exclusive lock held.
+
+        Parameters:
+            update (callable): Fills `work_dir`; returning False discards the staging directory.
+
+        Returns:
+            bool: True if the update was published.
+        """
+        # Under the exclusive lock, a staging directory can only be left over by a crashed process
+        staging_dir = sibling_path(self.data_dir, ".staging")
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+        for file_name in (HISTORY_FILE, FETCH_METADATA_FILE):
+            if os.path.exists(os.path.join(self.data_dir, file_name)):
+                shutil.copy2(os.path.join(self.data_dir, file_name), staging_dir)
+
+        self.work_dir = staging_dir
+        try:
+            published = update() is not False
+        except BaseException:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+        finally:
+            self.work_dir = self.data_dir
+        if not published:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return False
+
+        previous_dir = sibling_path(self.data_dir, ".previous")
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        if os.path.exists(self.data_dir):
+            os.replace(self.data_dir, previous_dir)
+        os.replace(staging_dir, self.data_dir)
+        shutil.rmtree(previous_dir, ignore_errors=True)
+        logging.info(f"Incidence data published to {self.data_dir}")
+        return True
+
+    def columnar_store_outdated(self):
+        """Returns True if the columnar store is enabled but missing or older than the downloaded files."""
+        if not self.source_config.get("columnar_store") or not os.path.isdir(self.data_dir):
+            return False
+        from heredicalc.incidences.columnar_store import ColumnarIncidenceStore
+        store = ColumnarIncidenceStore.open(self.data_dir)
+        csv_mtimes = [entry.stat().st_mtime for entry in os.scandir(self.data_dir) if entry.name.endswith(".csv")]
+        return store is None or not csv_mtimes or os.path.getmtime(store.store_dir) < max(csv_mtimes)
+
+    def update_columnar_store(self):
+        """
+        Optional post-download step: builds the columnar store of the dataset if it is enabled
+        in sources.yaml (`columnar_store: true`, or a mapping with `row_group_size`) and missing
+        or older than the downloaded files. The store is built under the exclusive lock.
+        """
+        if not self.columnar_store_outdated():
+            return
+        with self.lock.exclusive():
+            if self.columnar_store_outdated():  # unless built by another process in the meantime
+                self._build_columnar_store()
+
+    def _build_columnar_store(self):
+        from heredicalc.incidences.columnar_store import ColumnarIncidenceStore, DEFAULT_ROW_GROUP_SIZE
+        store_config = self.source_config.get("columnar_store")
+        row_group_size = store_config.get("row_group_size", DEFAULT_ROW_GROUP_SIZE) if isinstance(store_config, dict) \
+            else DEFAULT_ROW_GROUP_SIZE
+        try:
+            ColumnarIncidenceStore.build(self.data_dir, self.source_config, row_group_size=row_group_size)
+        except ImportError as e:
+            logging.warning(f"Columnar store not built: {e}")
+
+    def refresh_if_changed(self):
+        """
+        Downloads the data again only if the source changed since the last download.
+
+        Costs one conditional request (ETag / Last-Modified) when nothing changed. New data is
+        published atomically; must be called with the exclusive lock held.
+
+        Returns:
+            bool: True if new data was downloaded.
+        """
+        def update():
+            file_path = self.fetch(conditional=True)
+            if file_path is None:
+                return False
+            self.download_and_extract(file_path)
+            return True
+
+        if not self.update_atomically(update):
+            logging.info("Incidence data unchanged, download skipped.")
+            return False
+        return True
+
+    def source_urls(self):
+        """
+        Returns the locations to fetch the data from, in order: the mirrors of the dataset
+        (`mirrors` in sources.yaml), those of the deployment (HEREDICALC_INCIDENCE_MIRRORS),
+        and the upstream url. Mirrors may be URLs (http(s)://, file://) or local directories.
+        """
+        mirrors = list(self.source_config.get("mirrors", []))
+        mirrors += [mirror.strip() for mirror in os.environ.get(MIRRORS_ENV, "").split(",") if mirror.strip()]
+        file_name = os.path.basename(urlparse(self.url).path)
+        urls = []
+        for mirror in mirrors:
+            if not urlparse(mirror).scheme:
+                mirror = Path(mirror).resolve().as_uri()
+            urls.append(f"{mirror.rstrip('/')}/{self.source_config['data_dir']}/{file_name}")
+        return urls + [self.url]
+
+    def load_fetch_metadata(self):
+        """Returns the validators (ETag, Last-Modified) stored with the last download, or {}."""
+        try:
+            with open(self.metadata_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_fetch_metadata(self, url, file_name, etag=None, last_modified=None):
+        with open(self.metadata_file, "w") as f:
+            json.dump({"url": url, "file_name": file_name, "etag": etag, "last_modified": last_modified,
+                       "fetched": datetime.now().isoformat(timespec="seconds")}, f, indent=2)
+
+    def fetch(self, conditional=False):
+        """
+        Fetches the data file from the first reachable location (see `source_urls`).
+
+        Parameters:
+            conditional (bool): Only download if the file changed since the last fetch from the same location.
+
+        Returns:
+            str: Path of the downloaded file, or None if it did not change.
+
+        Raises:
+            ConnectionError: If no location could be fetched.
+        """
+        created = not os.path.exists(self.work_dir)
+        os.makedirs(self.work_dir, exist_ok=True)
+        metadata = self.load_fetch_metadata() if conditional else {}
+        errors = []
+        for url in self.source_urls():
+            validators = metadata if metadata.get("url") == url else {}
+            try:
+                if urlparse(url).scheme == "file":
+                    file_path = self._fetch_local(url, validators)
+                else:
+                    file_path = self._fetch_http(url, validators)
+            except OSError as e:  # also covers requests' exceptions
+                logging.warning(f"Fetching {url} failed: {e}")
+                errors.append(f"{url}: {e}")
+                continue
+            if file_path is not None:
+                # Only set for new content (see prefetch)
+                self.fetched_url = url
+            return file_path
+        if created:
+            # An empty data directory would be taken for downloaded data on the next run
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        raise ConnectionError("Incidence data could not be fetched from any location: " + "; ".join(errors))
+
+    def _fetch_local(self, url, validators):
+        source_path = url2pathname(urlparse(url).path)
+        stat = os.stat(source_path)
+        etag = f"{stat.st_mtime_ns}-{stat.st_size}"
+        if validators.get("etag") == etag:
+            return None
+        file_name = os.path.basename(source_path)
+        file_path = os.path.join(self.work_dir, file_name)
+        logging.info(f"Copying data from {source_path}...")
+        shutil.copyfile(source_path, file_path)
+        self.save_fetch_metadata(url, file_name, etag=etag)
+        return file_path
+
+    def _fetch_http(self, url, validators):
+        import requests  # deferred: only needed when downloading
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        timeout = self.source_config.get("download_timeout", DOWNLOAD_TIMEOUT)
+        response = requests.get(url, stream=True, headers=headers,
+                                timeout=tuple(timeout) if isinstance(timeout, list) else timeout)
+        if response.status_code == 304:
+            response.close()
+            return None
+        response.raise_for_status()
 
-    def download_file(self):
-        """Downloads a file and returns its path."""
-        os.makedirs(self.data_dir, exist_ok=True)
-        response = requests.get(self.url, stream=True)
-        
         content_disposition = response.headers.get('content-disposition')
         if content_disposition:
             file_name = content_disposition.split("filename=")[-1].strip('"')
         else:
-            file_name = "downloaded_file"
-        
-        file_path = os.path.join(self.data_dir, file_name)
-        logging.info(f"Downloading data from {self.url}...")
+            file_name = os.path.basename(urlparse(url).path) or "downloaded_file"
+
+        file_path = os.path.join(self.work_dir, file_name)
+        logging.info(f"Downloading data from {url}...")
         with open(file_path, "wb") as file:
             for chunk in response.iter_content(chunk_size=8192):
                 file.write(chunk)
+        self.save_fetch_metadata(url, file_name, etag=response.headers.get("ETag"),
+                                 last_modified=response.headers.get("Last-Modified"))
         logging.info(f"Download completed: {file_path}")
         return file_path
 
+    def download_file(self):
+        """Downloads a file and returns its path."""
+        return self.fetch()
+
     @abstractmethod
-    def download_and_extract(self):
-        """To be implemented by subclasses for specific data types."""
+    def download_and_extract(self, file_path=None):
+        """
+        To be implemented by subclasses for specific data types.
+
+        Parameters:
+            file_path (str): An already downloaded file (default: download it first).
+        """
         pass
\ No newline at end of file
@@ -1,7 +1,11 @@
 # incidences/incidence_data_source_handlers/data_source_handler_factory.py
 import logging
-from .zip_data_handler import ZipDataHandler
-from .uncompressed_data_handler import UncompressedDataHandler
+from heredicalc.core.plugin_registry import PluginRegistry
+
+DATA_SOURCE_HANDLERS = PluginRegistry("data_source_handlers", {
+    "zip": ".zip_data_handler:ZipDataHandler",
+    "uncompressed": ".uncompressed_data_handler:UncompressedDataHandler",
+}, package=__package__)
 
 class DataSourceHandlerFactory:
     """
@@ -26,11 +30,8 @@ class DataSourceHandlerFactory:
         """
         data_format = source_config.get("format", "uncompressed").lower()
 
-        if data_format == "zip":
-            logging.debug("Creating ZipDataHandler instance.")
-            return ZipDataHandler(source_config, base_data_dir=base_data_dir, force_download=force_download)
-        elif data_format == "uncompressed":
-            logging.debug("Creating UncompressedDataHandler instance.")
-            return UncompressedDataHandler(source_config, base_data_dir=base_data_dir, force_download=force_download)
-        else:
-            raise ValueError(f"Unsupported data format: {data_format}")
\ No newline at end of file
+        if data_format not in DATA_SOURCE_HANDLERS:
+            raise ValueError(f"Unsupported data format: {data_format}")
+        handler_class = DATA_SOURCE_HANDLERS.get(data_format)
+        logging.debug(f"Creating {handler_class.__name__} instance.")
+        return handler_class(source_config, base_data_dir=base_data_dir, force_download=force_download)
\ No newline at end of file
@@ -8,12 +8,12 @@ class UncompressedDataHandler(DataSourceHandler):
     def __init__(self, source_config, base_data_dir=None, force_download=False):
         super().__init__(source_config, base_data_dir=base_data_dir, force_download=force_download)
 
-    def download_and_extract(self):
+    def download_and_extract(self, file_path=None):
         """
         Downloads an uncompressed file directly into the data directory.
         
         Since the data is uncompressed, no extraction is required.
         """
-        file_path = self.download_file()  # Download the file
+        file_path = file_path or self.download_file()  # Download the file
         self.log_download_timestamp()
         logging.info(f"File saved as {file_path}, no extraction required.")
\ No newline at end of file
@@ -10,19 +10,19 @@ class ZipDataHandler(DataSourceHandler):
     def __init__(self, source_config, base_data_dir=None, force_download=False):
         super().__init__(source_config, base_data_dir=base_data_dir, force_download=force_download)
 
-    def download_and_extract(self):
+    def download_and_extract(self, file_path=None):
         """
         Downloads and extracts the ZIP data file.
         
-        The ZIP file is downloaded, extracted into the data directory,
-        and the original ZIP file is removed afterward.
+        The ZIP file is downloaded (unless `file_path` is given), extracted into the working
+        directory, and the original ZIP file is removed afterward.
         """
-        zip_path = self.download_file()  # Download the ZIP file to the specified path
+        zip_path = file_path or self.download_file()  # Download the ZIP file to the specified path
 
-        # Extract the contents of the ZIP file to the data directory
+        # Extract the contents of the ZIP file to the working directory
         with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(self.data_dir)
+            zip_ref.extractall(self.work_dir)
         os.remove(zip_path)  # Remove the ZIP file after extraction
         
-        logging.info(f"Data extracted to {self.data_dir}")
+        logging.info(f"Data extracted to {self.work_dir}")
         self.log_download_timestamp()
\ No newline at end of file
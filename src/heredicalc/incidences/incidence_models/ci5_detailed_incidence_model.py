@@ -10,9 +10,7 @@ class CI5DetailedIncidenceModel(IncidenceDataModel):
     def parse_data(self, df=None):
         """Parse the CSV data file for the selected population in CI5 detailed format."""
         if df is None:
-            file_path = self.get_population_file_path()
-            has_header = self.source_config.get("has_header", False)
-            df = pd.read_csv(file_path, header=0 if has_header else None)
+            df = self.load_raw_data()
         #unknown_age_class = self.source_config.get("unknown_age_class")
         unknown_age_class = self.source_config['age_structure']['unknown_age_class']
         age_column = self.column_mappings.get("age_col")
@@ -56,6 +54,7 @@ class CI5DetailedIncidenceModel(IncidenceDataModel):
             pd.DataFrame: The final incidence table with readable gender, aggregated cases,
                           and single rows for each age, gender, and phenotype combination.
         """
+        df = df.copy()  # The filtered rows may share their data with the raw data
         # Transform gender to readable format
         gender_col = "gender" # "gender" is name of the gender column in our interim incidence data frame.
         df[gender_col] = df[gender_col].map(
@@ -89,19 +88,24 @@ class CI5DetailedIncidenceModel(IncidenceDataModel):
         
         return incidence_table
     
-    def add_incidence_rate_column(self):
+    def add_incidence_rate_column(self, data_frame=None):
         """
         Add an incidence rate column to the incidence DataFrame.
+
+        Parameters:
+            data_frame (pd.DataFrame): The incidence table (not modified; default: the table
+                built by `build_incidence_table`).
         
         Returns:
-            pd.DataFrame: Updated DataFrame with an 'incidence_rate' column.
+            pd.DataFrame: Copy of the DataFrame with an 'incidence_rate' column.
         """
-        self.data_frame['incidence_rate'] = self.data_frame.apply(
+        data_frame = (self.data_frame if data_frame is None else data_frame).copy()
+        data_frame['incidence_rate'] = data_frame.apply(
             lambda row: self.calculate_incidence_rate(row['cases'], row['person_years']),
             axis=1
         )
         logging.info("Incidence rate column added to the DataFrame.")
-        return self.data_frame
+        return data_frame
 
     def get_age_range(self, age_class_id):
         """Return the age range (lower, upper) for a given age class ID based on sources.yaml."""
@@ -4,6 +4,8 @@ import logging
 import pandas as pd
 from abc import ABC, abstractmethod
 from heredicalc.core.config import PROJECT_ROOT
+from heredicalc.core.file_lock import data_dir_lock
+from heredicalc.incidences.columnar_store import ColumnarIncidenceStore
 
 
 class IncidenceDataModel(ABC):
@@ -79,7 +81,7 @@ class IncidenceDataModel(ABC):
         for phenotype in phenotypes:
             mapped_ids = self.phenotype_mappings.get(phenotype, [])
             if not mapped_ids:
-                print(f"Warning: Phenotype '{phenotype}' not found in mappings.")
+                logging.warning(f"Phenotype '{phenotype}' not found in mappings.")
             phenotype_ids.extend(mapped_ids)
         
         # Filter data by phenotype IDs in the 'phenotype' column
@@ -88,6 +90,34 @@ class IncidenceDataModel(ABC):
         
         return filtered_df
     
+    def get_phenotype_ids(self, phenotypes):
+        """Returns the raw phenotype IDs mapped to the given canonical phenotype names."""
+        return [id_ for phenotype in phenotypes for id_ in self.phenotype_mappings.get(phenotype, [])]
+
+    def load_raw_data(self, phenotypes=None):
+        """
+        Loads the raw rows of the selected population.
+
+        If the dataset has a columnar store (see ColumnarIncidenceStore), the rows are read from it,
+        restricted to the given phenotypes; otherwise the population's CSV file is parsed. The data
+        directory is read under the shared lock of the dataset, so it is not replaced meanwhile.
+
+        Parameters:
+            phenotypes (list): Canonical phenotype names; only used to skip unrelated rows in the store.
+
+        Returns:
+            pd.DataFrame: Raw rows in the column layout of the CSV files.
+        """
+        with data_dir_lock(self.data_dir).shared():
+            store = ColumnarIncidenceStore.open(self.data_dir)
+            if store is not None and str(self.population) in store.populations:
+                logging.info(f"Using columnar store for population {self.population}: {store.store_dir}")
+                phenotype_ids = self.get_phenotype_ids(phenotypes) if phenotypes else None
+                return store.read_population(self.population, phenotype_ids)
+            file_path = self.get_population_file_path()
+            has_header = self.source_config.get("has_header", False)
+            return pd.read_csv(file_path, header=0 if has_header else None)
+
     def get_population_file_path(self):
         """Determine the correct file path for the given population."""
         file_name = f"{self.population}.csv" # caveat: this could lead to problems in other formats, fine for now (CI5 specific parser)
@@ -104,12 +134,13 @@ class IncidenceDataModel(ABC):
         Default implementation to add an 'age_span' column to the DataFrame.
         
         Parameters:
-            data_frame (pd.DataFrame): The incidence data DataFrame.
+            data_frame (pd.DataFrame): The incidence data DataFrame (not modified).
         
         Returns:
-            pd.DataFrame: Updated DataFrame with an 'age_span' column.
+            pd.DataFrame: Copy of the DataFrame with an 'age_span' column.
         """
         if 'age_class_lower' in data_frame.columns and 'age_class_upper' in data_frame.columns:
+            data_frame = data_frame.copy()
             data_frame['age_span'] = data_frame.apply(
                 lambda row: (row['age_class_upper'] - row['age_class_lower'])+1 if pd.notnull(row['age_class_upper']) else 0, #was:'open-ended'
                 axis=1
@@ -1,8 +1,11 @@
 # incidences/incidence_models/incidence_data_model_factory.py
 import logging
-from .ci5_detailed_incidence_model import CI5DetailedIncidenceModel
-from .ci5_summary_incidence_model import CI5SummaryIncidenceModel
-from .incidence_data_model import IncidenceDataModel
+from heredicalc.core.plugin_registry import PluginRegistry
+
+INCIDENCE_MODELS = PluginRegistry("incidence_models", {
+    "ci5_detailed_incidence_model": ".ci5_detailed_incidence_model:CI5DetailedIncidenceModel",
+    "ci5_summary_incidence_model": ".ci5_summary_incidence_model:CI5SummaryIncidenceModel",
+}, package=__package__)
 
 class IncidenceDataModelFactory:
     """Factory for creating data parsers based on dataset type."""
@@ -10,11 +13,8 @@ class IncidenceDataModelFactory:
     @staticmethod
     def create_incidence_model(source_config, population=None):
         incidence_model_type = source_config.get("parser")
-        
-        if incidence_model_type == "ci5_detailed_incidence_model":
-            return CI5DetailedIncidenceModel(source_config, population)
-        elif incidence_model_type == "ci5_summary_incidence_model":
-            return CI5SummaryIncidenceModel(source_config, population)
-        else:
+
+        if incidence_model_type not in INCIDENCE_MODELS:
             logging.error(f"Unknown incidence model type: {incidence_model_type}")
-            raise ValueError(f"Unsupported incidence model: {incidence_model_type}")
\ No newline at end of file
+            raise ValueError(f"Unsupported incidence model: {incidence_model_type}")
+        return INCIDENCE_MODELS.get(incidence_model_type)(source_config, population)
\ No newline at end of file
@@ -0,0 +1,142 @@
+# incidences/shared_incidence_table.py
+import sys
+import uuid
+import logging
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+def _attach_block(name):
+    # Python >= 3.13 can attach without registering the block with the resource tracker,
+    # which would otherwise try to clean up blocks it does not own.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+class SharedIncidenceTable:
+    """
+    An incidence table published once into shared memory blocks, for process-pool workers.
+
+    Every numeric column (incidence rates, age bounds, lambdas, ...) is stored in its own block;
+    text columns such as gender and phenotype are stored as categorical codes. The `handle` is a
+    small picklable description of the blocks, which workers pass to `attach` to get read-only
+    array views without copying or unpickling the table.
+
+    Usage:
+        with SharedIncidenceTable.publish(df) as table:
+            pool.map(task, [table.handle] * n)
+        # in a worker:
+        df = SharedIncidenceTable.attach(handle).to_dataframe()
+    """
+
+    def __init__(self, handle, blocks, owner=False):
+        self.handle = handle
+        self._blocks = blocks
+        self._owner = owner
+        self._arrays = {}
+        for column in handle["columns"]:
+            block = blocks[column["block"]]
+            array = np.ndarray((handle["rows"],), dtype=column["dtype"], buffer=block.buf)
+            array.flags.writeable = False
+            self._arrays[column["name"]] = array
+
+    @classmethod
+    def publish(cls, df):
+        """
+        Copies an incidence table into new shared memory blocks.
+
+        Parameters:
+            df (pd.DataFrame): Incidence table, e.g. as returned by `build_incidence_data`.
+
+        Returns:
+            SharedIncidenceTable: The owning table; call `unlink` (or use it as a context manager)
+            to release the blocks once all workers are done.
+        """
+        prefix = f"heredicalc_{uuid.uuid4().hex[:12]}"
+        columns, blocks = [], {}
+        try:
+            for position, name in enumerate(df.columns):
+                series = df[name]
+                categories = None
+                if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                    values = series.to_numpy()
+                else:
+                    categorical = pd.Categorical(series)
+                    categories = [str(category) for category in categorical.categories]
+                    values = categorical.codes
+                block_name = f"{prefix}_{position}"
+                block = shared_memory.SharedMemory(name=block_name, create=True, size=max(values.nbytes, 1))
+                blocks[block_name] = block
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                columns.append({"name": name, "block": block_name, "dtype": values.dtype.str, "categories": categories})
+        except Exception:
+            for block in blocks.values():
+                block.close()
+                block.unlink()
+            raise
+        handle = {
+            "rows": len(df),
+            "columns": columns,
+            "index": None if isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+                     else df.index.tolist(),
+            "index_name": df.index.name,
+        }
+        logging.debug(f"Published incidence table with {len(df)} rows in {len(blocks)} shared memory blocks.")
+        return cls(handle, blocks, owner=True)
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Attaches to a published table by its handle.
+
+        Returns:
+            SharedIncidenceTable: A table with read-only views of the shared blocks.
+        """
+        blocks = {column["block"]: _attach_block(column["block"]) for column in handle["columns"]}
+        return cls(handle, blocks)
+
+    def array(self, name):
+        """Returns the read-only array of a column (codes for categorical columns)."""
+        return self._arrays[name]
+
+    def to_dataframe(self):
+        """
+        Returns the table as a DataFrame backed by the shared blocks.
+
+        Numeric columns are views of the shared memory, text columns are categoricals over the
+        shared codes. The DataFrame stays valid as long as this object is open.
+        """
+        data = {}
+        for column in self.handle["columns"]:
+            values = self._arrays[column["name"]]
+            if column["categories"] is not None:
+                values = pd.Categorical.from_codes(values, categories=column["categories"])
+            data[column["name"]] = values
+        if self.handle["index"] is None:
+            index = pd.RangeIndex(self.handle["rows"], name=self.handle["index_name"])
+        else:
+            index = pd.Index(self.handle["index"], name=self.handle["index_name"])
+        return pd.DataFrame(data, index=index, copy=False)
+
+    def close(self):
+        """Detaches from the shared blocks (kept mapped while DataFrames still reference them)."""
+        self._arrays = {}
+        for block in self._blocks.values():
+            try:
+                block.close()
+            except BufferError:
+                logging.debug(f"Shared memory block {block.name} is still referenced, keeping it mapped.")
+
+    def unlink(self):
+        """Detaches and, for the publishing process, frees the shared blocks."""
+        self.close()
+        if self._owner:
+            for block in self._blocks.values():
+                block.unlink()
+            self._owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unlink()
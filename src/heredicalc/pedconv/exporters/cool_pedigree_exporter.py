@@ -1,5 +1,6 @@
 # pedconv/exporters/cool_pedigree_exporter.py
 
+import logging
 import pandas as pd
 from .pedigree_exporter import PedigreeExporter
 
@@ -39,6 +40,59 @@ class CoolPedigreeExporter(PedigreeExporter):
         Parameters:
             pedigree (Pedigree): The Pedigree instance containing the data.
         """
+        export_df = self._build_export_df(pedigree)
+        if self.file_path is None:
+            return export_df
+        elif self.file_path == "stdout":
+            print(export_df)
+        else:
+            # Write Data to file 
+            # Save to a tab-delimited file
+            export_df.to_csv(self.file_path, sep="\t", index=False, lineterminator="\n")
+
+    def export_pedigrees(self, pedigrees):
+        """
+        Exports several pedigrees to one COOL file, one family after the other.
+
+        Families are converted and written as they are consumed from `pedigrees`, so a
+        generator (e.g. `CoolPedigreeImporter.iter_pedigrees`) is never held in memory
+        as a whole. Pedigrees without a `ped_id` are numbered by their position.
+
+        Parameters:
+            pedigrees (iterable of Pedigree): The Pedigree instances to export.
+
+        Returns:
+            int: The number of exported pedigrees (or the concatenated DataFrame if no file path is set).
+        """
+        if self.file_path is None:
+            frames = [self._build_export_df(pedigree, default_ped_id=str(number))
+                      for number, pedigree in enumerate(pedigrees, start=1)]
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+        count = 0
+        if self.file_path == "stdout":
+            for count, pedigree in enumerate(pedigrees, start=1):
+                print(self._build_export_df(pedigree, default_ped_id=str(count)))
+            return count
+
+        with open(self.file_path, "w", newline="") as file:
+            for count, pedigree in enumerate(pedigrees, start=1):
+                export_df = self._build_export_df(pedigree, default_ped_id=str(count))
+                export_df.to_csv(file, sep="\t", index=False, header=(count == 1), lineterminator="\n")
+        logging.debug(f"Exported {count} pedigrees to {self.file_path}.")
+        return count
+
+    def _build_export_df(self, pedigree, default_ped_id="1"):
+        """
+        Maps a Pedigree to the COOL column layout.
+
+        Parameters:
+            pedigree (Pedigree): The Pedigree instance containing the data.
+            default_ped_id (str): PedID used if the pedigree has no `ped_id` of its own.
+
+        Returns:
+            pd.DataFrame: The pedigree in COOL format.
+        """
         # Map Pedigree DataFrame to COOL-specific columns
         df = pedigree.members_df.copy()
         df = df.infer_objects()
@@ -51,29 +105,21 @@ class CoolPedigreeExporter(PedigreeExporter):
             "hom": "Hom"
         }
 
-        df["Geno"] = df["genotype_status"].map(genotype_map)
+        ped_id = pedigree.ped_id if getattr(pedigree, "ped_id", None) is not None else default_ped_id
+        first_phenotypes = [ph[0]["phenotype"] if ph else None for ph in df["phenotypes"]]
+
         # Define COOL-specific columns and handle data transformations
         export_df = pd.DataFrame({
-            "PedID": ["1"] * len(df),  # Default PedID set to "1" for single pedigree
+            "PedID": [str(ped_id)] * len(df),
             "IndID": df["id"].astype(str).fillna("."),
             "Father": df["father_id"],
             "Mother": df["mother_id"],
             "Sex": df["gender"].fillna("."),
-            "Aff": df["phenotypes"].apply(lambda ph: self.COOL_MAPPINGS.get(ph[0]["phenotype"], ".") if ph else "."),
+            "Aff": pd.Series(first_phenotypes, index=df.index).map(self.COOL_MAPPINGS).fillna("."),
             "Age": df["age_last_seen"].fillna(".").astype(str),
-            "Geno": df["Geno"],
-            "FPTP": df["is_index_person"].apply(lambda x: 1 if x else 0)
+            "Geno": df["genotype_status"].map(genotype_map),
+            "FPTP": df["is_index_person"].astype(bool).astype(int)
         })
 
-
-
         # Replace any empty cells with the Cool-specific placeholder "."
-        export_df = export_df.replace({"": "."})
-        if self.file_path is None:
-            return export_df
-        elif self.file_path == "stdout":
-            print(export_df)
-        else:
-            # Write Data to file 
-            # Save to a tab-delimited file
-            export_df.to_csv(self.file_path, sep="\t", index=False, lineterminator="\n")
\ No newline at end of file
+        return export_df.replace({"": "."})
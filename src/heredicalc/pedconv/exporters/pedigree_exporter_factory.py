@@ -1,10 +1,13 @@
 # pedconv/exporters/pedigree_exporter_factory.py
 
 import logging
-#from .pedigree_exporter import PedigreeExporter
-#from .csv_pedigree_exporter import CsvPedigreeExporter  
-from .cool_pedigree_exporter import CoolPedigreeExporter  
-from .segregatr_flb_pedigree_exporter import SegregatrFLBPedigreeExporter
+from heredicalc.core.plugin_registry import PluginRegistry
+
+PEDIGREE_EXPORTERS = PluginRegistry("pedigree_exporters", {
+    "cool": ".cool_pedigree_exporter:CoolPedigreeExporter",
+    #"csv": ".csv_pedigree_exporter:CsvPedigreeExporter",
+    "segregatr_flb": ".segregatr_flb_pedigree_exporter:SegregatrFLBPedigreeExporter",
+}, package=__package__)
 
 
 class PedigreeExporterFactory:
@@ -26,14 +29,8 @@ class PedigreeExporterFactory:
         Raises:
             ValueError: If the specified exporter type is not supported.
         """
-        if exporter_type == "cool":
-            logging.debug("Creating CoolPedigreeExporter instance.")
-            return CoolPedigreeExporter(file_path)
-        #elif exporter_type == "csv":
-        #    logging.debug("Creating CsvPedigreeExporter instance.")
-        #    return CsvPedigreeExporter(file_path)
-        elif exporter_type == "segregatr_flb":
-            logging.debug("Creating SegregatrFlbPedigreeExporter instance.")
-            return SegregatrFLBPedigreeExporter(file_path)
-        else:
-            raise ValueError(f"Unknown pedigree exporter type: {exporter_type}")
\ No newline at end of file
+        if exporter_type not in PEDIGREE_EXPORTERS:
+            raise ValueError(f"Unknown pedigree exporter type: {exporter_type}")
+        exporter_class = PEDIGREE_EXPORTERS.get(exporter_type)
+        logging.debug(f"Creating {exporter_class.__name__} instance.")
+        return exporter_class(file_path)
\ No newline at end of file
@@ -1,13 +1,23 @@
 # pedconv/importers/cool_pedigree_importer.py
 
+import logging
 import pandas as pd
 from .pedigree_importer import PedigreeImporter
+from ..pedconv.pedigree import Pedigree
 
 class CoolPedigreeImporter(PedigreeImporter):
     """
     Importer for the COOL pedigree format (Co-Segregation Online).
     Maps COOL-specific columns to the Pedigree data structure.
     """
+    GENOTYPE_MAPPINGS = {
+        ".": "unk",
+        "0": "unk",
+        "Neg": "neg",
+        "Het": "het",
+        "Hom": "hom"
+    }
+
     def __init__(self, file_path):
         self.COOL_MAPPINGS = {
             'unaff': 'Unaffected', 
@@ -97,37 +107,98 @@ class CoolPedigreeImporter(PedigreeImporter):
         """
         Reads the COOL file and adds individuals to the Pedigree.
         
+        All rows are imported into the given Pedigree, regardless of their PedID.
+        Use `iter_pedigrees` to read files holding several families.
+
         Parameters:
             pedigree (Pedigree): The Pedigree instance to populate with imported data.
         """
-        df = pd.read_csv(self.file_path, sep="\t")
-        phenos = []
-        
-        for _, row in df.iterrows():
-            # Map COOL columns to Pedigree structure
-            genotype_status = {
-                ".": "unk",
-                "0": "unk",
-                "Neg": "neg",
-                "Het": "het",
-                "Hom": "hom"
-            }.get(row["Geno"], "unk")
-
-            if row["Aff"] not in (".", 0):
-                phenotype_name = self.COOL_MAPPINGS.get(row["Aff"], None)
-                phenos = [{"phenotype": phenotype_name}]
-            else: 
-                phenos = [{"phenotype": "Unknown"}]
-
-            pedigree.add_member(
-                id=row["IndID"],
-                pseudonym=str(row["IndID"]),  # Use IndID as pseudonym initially
-                father_id=row["Father"],
-                mother_id=row["Mother"],
-                gender= row["Sex"],
-                phenotypes= phenos,
-                age_last_seen=row["Age"],
-                death_age=None,
-                is_index_person = (row["FPTP"] == 1),
-                genotype_status=genotype_status  
-            )
\ No newline at end of file
+        df = pd.read_csv(self.file_path, sep="\t", dtype={"PedID": str})
+        pedigree.add_members(self._map_members(df))
+
+    def iter_pedigrees(self, chunksize=10000):
+        """
+        Streams the COOL file and yields one Pedigree per PedID.
+
+        The file is read in chunks of `chunksize` rows, so memory use is bounded by the
+        chunk size plus the largest family, not by the size of the file. Rows of one
+        family must be contiguous, which is how COOL exports are written.
+
+        Parameters:
+            chunksize (int): Number of rows to read from the file at a time.
+
+        Yields:
+            Pedigree: A Pedigree per family, with `ped_id` set to the family's PedID.
+
+        Raises:
+            ValueError: If the rows of a family are not contiguous in the file.
+        """
+        seen_ped_ids = set()
+        pending = None
+        reader = pd.read_csv(self.file_path, sep="\t", dtype={"PedID": str}, chunksize=chunksize)
+        for chunk in reader:
+            if "PedID" not in chunk.columns:
+                chunk["PedID"] = None
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
+
+            # The last family of a chunk may continue in the next one, so hold it back.
+            family_runs = chunk["PedID"].ne(chunk["PedID"].shift()).cumsum()
+            is_tail = family_runs == family_runs.iloc[-1]
+            pending = chunk[is_tail]
+            for _, family_df in chunk[~is_tail].groupby(family_runs[~is_tail], sort=False):
+                yield self._build_pedigree(family_df, seen_ped_ids)
+
+        if pending is not None and not pending.empty:
+            yield self._build_pedigree(pending, seen_ped_ids)
+
+    def _build_pedigree(self, family_df, seen_ped_ids):
+        """
+        Creates a Pedigree from the rows of a single family.
+
+        Parameters:
+            family_df (pd.DataFrame): COOL rows sharing one PedID.
+            seen_ped_ids (set): PedIDs already yielded, used to detect split families.
+
+        Returns:
+            Pedigree: The populated Pedigree.
+        """
+        ped_id = family_df["PedID"].iloc[0]
+        if ped_id in seen_ped_ids:
+            raise ValueError(f"Rows of pedigree '{ped_id}' are not contiguous in {self.file_path}.")
+        seen_ped_ids.add(ped_id)
+
+        pedigree = Pedigree(ped_id=ped_id)
+        pedigree.add_members(self._map_members(family_df))
+        logging.debug(f"Imported pedigree {ped_id} with {len(family_df)} members.")
+        return pedigree
+
+    def _map_members(self, df):
+        """
+        Maps COOL columns to the Pedigree structure for all rows at once.
+
+        Parameters:
+            df (pd.DataFrame): Rows of a COOL file.
+
+        Returns:
+            pd.DataFrame: Members in the column layout of `Pedigree.members_df`.
+        """
+        genotype_status = df["Geno"].map(self.GENOTYPE_MAPPINGS).fillna("unk")
+
+        # "." and 0 mark an unknown affection status, any other code is looked up.
+        phenotype_names = df["Aff"].map(self.COOL_MAPPINGS).astype(object)
+        phenotype_names = phenotype_names.where(phenotype_names.notna(), None)
+        phenotype_names = phenotype_names.mask(df["Aff"].isin([".", 0]), "Unknown")
+
+        return pd.DataFrame({
+            "id": df["IndID"],
+            "pseudonym": df["IndID"].astype(str),  # Use IndID as pseudonym initially
+            "father_id": df["Father"],
+            "mother_id": df["Mother"],
+            "gender": df["Sex"],
+            "phenotypes": [[{"phenotype": name}] for name in phenotype_names],
+            "age_last_seen": df["Age"],
+            "death_age": None,
+            "is_index_person": df["FPTP"] == 1,
+            "genotype_status": genotype_status,
+        })
@@ -1,6 +1,7 @@
 # pedconv/importers/pedigree_importer.py
 
 from abc import ABC, abstractmethod
+from ..pedconv.pedigree import Pedigree
 
 class PedigreeImporter(ABC):
     """
@@ -30,4 +31,21 @@ class PedigreeImporter(ABC):
         Returns:
             pd.DataFrame: DataFrame with pedigree information.
         """
-        pass
\ No newline at end of file
+        pass
+
+    def iter_pedigrees(self, chunksize=None):
+        """
+        Yields the pedigrees contained in the file, one at a time.
+
+        Formats holding a single family yield exactly one Pedigree. Importers for
+        multi-family formats override this to stream the file family by family.
+
+        Parameters:
+            chunksize (int): Optional number of rows to read at a time (ignored here).
+
+        Yields:
+            Pedigree: The imported Pedigree.
+        """
+        pedigree = Pedigree()
+        self.import_data(pedigree)
+        yield pedigree
@@ -1,6 +1,10 @@
 # pedconv/importers/pedigree_importer_factory.py
 
-from .cool_pedigree_importer import CoolPedigreeImporter
+from heredicalc.core.plugin_registry import PluginRegistry
+
+PEDIGREE_IMPORTERS = PluginRegistry("pedigree_importers", {
+    "cool": ".cool_pedigree_importer:CoolPedigreeImporter",
+}, package=__package__)
 
 class PedigreeImporterFactory:
     """
@@ -22,7 +26,6 @@ class PedigreeImporterFactory:
         Raises:
             ValueError: If the specified file type is not supported.
         """
-        if importer_type.lower() == "cool":
-            return CoolPedigreeImporter(file_path)
-        else:
-            raise ValueError(f"Unsupported file type: {importer_type}")
\ No newline at end of file
+        if importer_type.lower() not in PEDIGREE_IMPORTERS:
+            raise ValueError(f"Unsupported file type: {importer_type}")
+        return PEDIGREE_IMPORTERS.get(importer_type.lower())(file_path)
\ No newline at end of file
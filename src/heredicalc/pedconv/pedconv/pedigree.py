@@ -2,18 +2,21 @@
 import pandas as pd
 
 class Pedigree:
-    def __init__(self):
-        self.members_df = pd.DataFrame(columns=[
-            'id', 'pseudonym', 'father_id', 'mother_id', 'gender',
-            'phenotypes', 'age_last_seen', 'death_age', 'is_index_person', 'genotype_status'
-        ])
+    COLUMNS = [
+        'id', 'pseudonym', 'father_id', 'mother_id', 'gender',
+        'phenotypes', 'age_last_seen', 'death_age', 'is_index_person', 'genotype_status'
+    ]
+
+    def __init__(self, ped_id=None):
+        self.ped_id = ped_id
+        self.members_df = pd.DataFrame(columns=self.COLUMNS)
 
     def add_member(self, id, pseudonym, father_id, mother_id, gender, phenotypes=None, age_last_seen=None, death_age=None, is_index_person=False, genotype_status="unk"):
         # Ensure correct data types for specific columns
         id = int(id) if pd.notna(id) else None
         father_id = int(father_id) if pd.notna(father_id) else None
         mother_id = int(mother_id) if pd.notna(mother_id) else None
-        
+
         member_data = {
             'id': id,
             'pseudonym': pseudonym,
@@ -24,8 +27,50 @@ class Pedigree:
             'age_last_seen': age_last_seen,
             'death_age': death_age,
             'is_index_person': is_index_person,
-            'genotype_status': genotype_status 
+            'genotype_status': genotype_status
         }
-        
+
         new_row = pd.DataFrame([member_data])
-        self.members_df = pd.concat([self.members_df, new_row], ignore_index=True)
\ No newline at end of file
+        self.members_df = pd.concat([self.members_df, new_row], ignore_index=True)
+
+    def add_members(self, members_df):
+        """
+        Adds several members at once from a DataFrame with the Pedigree columns.
+
+        Missing optional columns are filled with the same defaults as in `add_member`,
+        and all columns are stored with object dtype, matching rows added one at a time.
+
+        Parameters:
+            members_df (pd.DataFrame): DataFrame with at least 'id', 'father_id', 'mother_id' and 'gender'.
+        """
+        new_rows = members_df.copy()
+        defaults = {
+            'pseudonym': new_rows['id'].astype(str),
+            'phenotypes': [[] for _ in range(len(new_rows))],
+            'age_last_seen': None,
+            'death_age': None,
+            'is_index_person': False,
+            'genotype_status': "unk",
+        }
+        for column, default in defaults.items():
+            if column not in new_rows.columns:
+                new_rows[column] = default
+
+        new_rows = new_rows[self.COLUMNS].astype(object)
+        for column in ('id', 'father_id', 'mother_id'):
+            new_rows[column] = [int(value) if pd.notna(value) else None for value in new_rows[column]]
+
+        if self.members_df.empty:
+            self.members_df = new_rows.reset_index(drop=True)
+        else:
+            self.members_df = pd.concat([self.members_df, new_rows], ignore_index=True)
+
+    def graph(self):
+        """
+        Builds the graph index of the current members (see PedigreeGraph).
+
+        Returns:
+            PedigreeGraph: Parent/child adjacency, founders, generations, components and loops.
+        """
+        from .pedigree_graph import PedigreeGraph
+        return PedigreeGraph(self.members_df)
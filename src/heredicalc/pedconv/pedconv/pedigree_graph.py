@@ -0,0 +1,197 @@
+# pedconv/pedigree_graph.py
+import logging
+from collections import deque
+import numpy as np
+import pandas as pd
+
+NO_PARENT = -1
+UNKNOWN_PARENT = -2
+GENOTYPED_STATUSES = ("het", "hom", "neg")
+
+def _format_id(member_id):
+    # IDs may come as floats from columns with missing values
+    if isinstance(member_id, (float, np.floating)) and float(member_id).is_integer():
+        return str(int(member_id))
+    return str(member_id)
+
+def _is_missing_parent(parent_id):
+    # Founders have no parent IDs, or 0 as in the pedigree files and in pedtools; IDs read
+    # as strings give "0" or ""
+    if pd.isna(parent_id):
+        return True
+    if isinstance(parent_id, str):
+        return parent_id.strip() in ("", "0")
+    return parent_id == 0
+
+class PedigreeValidationError(ValueError):
+    """
+    Raised for structurally invalid pedigrees; `problems` lists every problem found.
+    """
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("Invalid pedigree: " + "; ".join(self.problems))
+
+class PedigreeGraph:
+    """
+    Graph index of a pedigree, built in linear time from its members DataFrame.
+
+    Members are addressed by position (row of the DataFrame). The index holds the parent
+    positions of every member (NO_PARENT for founders, UNKNOWN_PARENT for parent IDs that are
+    not pedigree members), the children as CSR arrays, founders, generation depths, connected
+    components and the number of pedigree loops (marriage or inbreeding loops).
+    """
+
+    def __init__(self, members_df):
+        """
+        Parameters:
+            members_df (pd.DataFrame): Members with at least 'id', 'father_id', 'mother_id' and 'gender'.
+        """
+        self.members_df = members_df
+        self.ids = members_df['id'].to_numpy()
+        self.size = len(self.ids)
+        self.position = {}
+        self.duplicate_ids = []
+        for position, member_id in enumerate(self.ids):
+            if member_id in self.position:
+                self.duplicate_ids.append(member_id)
+            else:
+                self.position[member_id] = position
+        self.father = self._parent_positions(members_df['father_id'])
+        self.mother = self._parent_positions(members_df['mother_id'])
+
+        # Children in CSR layout: children of member p are child_index[child_offset[p]:child_offset[p + 1]]
+        children = np.concatenate([np.arange(self.size), np.arange(self.size)])
+        parents = np.concatenate([self.father, self.mother])
+        known = parents >= 0
+        children, parents = children[known], parents[known]
+        order = np.argsort(parents, kind="stable")
+        self.child_index = children[order]
+        self.child_offset = np.concatenate([[0], np.cumsum(np.bincount(parents, minlength=self.size))])
+
+        self.founders = np.flatnonzero((self.father == NO_PARENT) & (self.mother == NO_PARENT))
+        self.generation, self.cyclic = self._generations()
+        self.component, self.component_count = self._components()
+        self.loop_count = self._loop_count()
+
+    def _parent_positions(self, parent_ids):
+        return np.array([
+            NO_PARENT if _is_missing_parent(parent_id) else self.position.get(parent_id, UNKNOWN_PARENT)
+            for parent_id in parent_ids
+        ], dtype=np.int64)
+
+    def children(self, position):
+        """Returns the positions of the children of a member."""
+        return self.child_index[self.child_offset[position]:self.child_offset[position + 1]]
+
+    def _generations(self):
+        """
+        Generation depth of every member (founders 0, children one below their deepest parent),
+        by topological order. Members that are their own ancestors are left unprocessed.
+
+        Returns:
+            tuple: (generation array, positions of members on or below an ancestry cycle).
+        """
+        generation = np.zeros(self.size, dtype=np.int64)
+        pending_parents = (self.father >= 0).astype(np.int64) + (self.mother >= 0)
+        queue = deque(np.flatnonzero(pending_parents == 0))
+        processed = 0
+        while queue:
+            position = queue.popleft()
+            processed += 1
+            for child in self.children(position):
+                generation[child] = max(generation[child], generation[position] + 1)
+                pending_parents[child] -= 1
+                if pending_parents[child] == 0:
+                    queue.append(child)
+        cyclic = np.flatnonzero(pending_parents > 0) if processed < self.size else np.array([], dtype=np.int64)
+        return generation, cyclic
+
+    def _components(self):
+        """Connected components over parent-child links, by breadth-first search."""
+        component = np.full(self.size, -1, dtype=np.int64)
+        count = 0
+        for start in range(self.size):
+            if component[start] >= 0:
+                continue
+            component[start] = count
+            queue = deque([start])
+            while queue:
+                position = queue.popleft()
+                neighbours = [parent for parent in (self.father[position], self.mother[position]) if parent >= 0]
+                for neighbour in (*neighbours, *self.children(position)):
+                    if component[neighbour] < 0:
+                        component[neighbour] = count
+                        queue.append(neighbour)
+            count += 1
+        return component, count
+
+    def _loop_count(self):
+        """
+        Number of independent pedigree loops: the cyclomatic number (edges - nodes + components)
+        of the graph linking parents and children to mating nodes, one per parent pair.
+        """
+        with_parents = (self.father >= 0) & (self.mother >= 0)
+        matings = set(zip(self.father[with_parents].tolist(), self.mother[with_parents].tolist()))
+        linked = {parent for mating in matings for parent in mating} | set(np.flatnonzero(with_parents).tolist())
+        edges = 2 * len(matings) + int(with_parents.sum())
+        # The mating graph connects the same members as the parent-child graph
+        components = len({self.component[position] for position in linked})
+        return edges - len(matings) - len(linked) + components
+
+    def problems(self):
+        """Returns a list of human-readable structural problems (empty for valid pedigrees)."""
+        problems = []
+        if pd.isna(self.ids).any():
+            problems.append(f"{int(pd.isna(self.ids).sum())} member(s) without ID")
+        if self.duplicate_ids:
+            problems.append(f"duplicate IDs {', '.join(sorted({_format_id(member_id) for member_id in self.duplicate_ids}))}")
+        genders = self.members_df['gender'].to_numpy()
+        for parent_column, parents, expected_gender, role in (('father_id', self.father, 'M', 'father'),
+                                                              ('mother_id', self.mother, 'F', 'mother')):
+            parent_ids = self.members_df[parent_column].to_numpy()
+            for position in np.flatnonzero(parents == UNKNOWN_PARENT):
+                problems.append(f"{role} {_format_id(parent_ids[position])} of member {_format_id(self.ids[position])} "
+                                f"is not in the pedigree")
+            for position in np.flatnonzero(parents >= 0):
+                if parents[position] == position:
+                    problems.append(f"member {_format_id(self.ids[position])} is its own {role}")
+                elif genders[parents[position]] != expected_gender:
+                    problems.append(f"{role} {_format_id(self.ids[parents[position]])} of member {_format_id(self.ids[position])} "
+                                    f"has gender {genders[parents[position]]!r}, expected {expected_gender!r}")
+        for position in np.flatnonzero((self.father == NO_PARENT) != (self.mother == NO_PARENT)):
+            problems.append(f"member {_format_id(self.ids[position])} has only one parent")
+        if len(self.cyclic):
+            members = ", ".join(_format_id(member_id) for member_id in self.ids[self.cyclic])
+            problems.append(f"members {members} are their own ancestors or descend from such members")
+        return problems
+
+    def validate(self):
+        """
+        Checks the pedigree structure before it is passed to R.
+
+        Raises:
+            PedigreeValidationError: Listing all problems found.
+        """
+        problems = self.problems()
+        if problems:
+            raise PedigreeValidationError(problems)
+        if self.loop_count:
+            logging.info(f"Pedigree has {self.loop_count} loop(s).")
+        if self.component_count > 1:
+            logging.info(f"Pedigree consists of {self.component_count} disconnected components.")
+
+    def components(self):
+        """Returns the member IDs of every connected component, largest first."""
+        members = [self.ids[self.component == component] for component in range(self.component_count)]
+        return sorted(members, key=len, reverse=True)
+
+    def informative_components(self):
+        """
+        Returns the component numbers that can change an FLB: those with genotyped members
+        (without genotypes, both hypotheses give the same likelihood) or with the index person.
+        """
+        genotyped = self.members_df['genotype_status'].isin(GENOTYPED_STATUSES).to_numpy()
+        if 'is_index_person' in self.members_df.columns:
+            genotyped = genotyped | self.members_df['is_index_person'].fillna(False).astype(bool).to_numpy()
+        return sorted(set(self.component[genotyped].tolist()))
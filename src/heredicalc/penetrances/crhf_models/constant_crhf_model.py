@@ -1,17 +1,15 @@
 # penetrances/crhf_models/constant_crhf_model.py
 
-import os
-import pandas as pd
 import logging
 from .crhf_model import CRHFModel
-from heredicalc.core.config import PROJECT_ROOT
-from pathlib import Path
+from heredicalc.penetrances.gene_parameter_store import GeneParameterStore, InvalidCRHFValueError, DEFAULT_CRHF_FILE
 
 class ConstantCRHFModel(CRHFModel):
     """
     Constant CRHF model where the CRHF value is independent of age, gender, and phenotype.
     
     This model loads a constant CRHF value from a CSV file and provides it for the specified gene.
+    The file is read once per process through the shared GeneParameterStore.
     """
 
     def __init__(self, gene, data_frame, crhf_file_path=None):
@@ -24,33 +22,32 @@ class ConstantCRHFModel(CRHFModel):
             crhf_file_path (str): Path to the CSV file with constant CRHF values.
         """
         super().__init__(gene, data_frame)
-        self.crhf_file_path = crhf_file_path or PROJECT_ROOT / "data_sources" / "penetrances" / "crhf" / "constant_crhf_model.csv"
-        #os.path.join(os.path.dirname(__file__), "..", "..", "data_sources", "penetrances", "crhf", "constant_crhf_model.csv")
+        self.crhf_file_path = crhf_file_path or DEFAULT_CRHF_FILE
         self.crhf_value = self._load_crhf_value()
 
     def _load_crhf_value(self):
         """
-        Load the CRHF value for the specified gene from the CSV file.
+        Load the CRHF value for the specified gene from the shared gene parameter store.
         
         Returns:
             float: The CRHF value for the gene.
+
+        Raises:
+            InvalidCRHFValueError: If the CRHF value of the gene is not a frequency.
         """
         try:
-            crhf_df = pd.read_csv(self.crhf_file_path)
-            if 'gene' not in crhf_df.columns:
-                raise ValueError(f"'gene' column not found in CRHF file {self.crhf_file_path}")
- 
-            crhf_row = crhf_df[crhf_df['gene'] == self.gene]
-            if crhf_row.empty:
+            crhf_value = GeneParameterStore.shared(crhf_file_path=self.crhf_file_path).crhf_value(self.gene)
+            if crhf_value is None:
                 logging.warning(f"CRHF value for gene '{self.gene}' not found. Using default of 0.0.")
                 return 0.0
 
-            crhf_value = crhf_row.iloc[0]['crhf_value']
             logging.info(f"Loaded CRHF value {crhf_value} for gene {self.gene}.")
             return crhf_value
         except FileNotFoundError:
             logging.error(f"CRHF file not found at {self.crhf_file_path}. Using default value of 0.0.")
             return 0.0
+        except InvalidCRHFValueError:
+            raise
         except Exception as e:
             logging.error(f"Error loading CRHF value for gene {self.gene}: {e}")
             return 0.0
@@ -1,6 +1,10 @@
 # penetrances/crhf_models/crhf_model_factory.py
 
-from .constant_crhf_model import ConstantCRHFModel
+from heredicalc.core.plugin_registry import PluginRegistry
+
+CRHF_MODELS = PluginRegistry("crhf_models", {
+    "constant": ".constant_crhf_model:ConstantCRHFModel",
+}, package=__package__)
 
 class CRHFModelFactory:
     """Factory to create CRHF model instances."""
@@ -19,9 +23,8 @@ class CRHFModelFactory:
         Returns:
             CRHFModel: An instance of a CRHF model.
         """
-        if model_name == "constant":
-            if gene is None or data_frame is None:
-                raise ValueError("Gene and data_frame must be provided for the constant CRHF model.")
-            return ConstantCRHFModel(gene, data_frame, crhf_file_path)
-        else:
-            raise ValueError(f"CRHF model '{model_name}' is not implemented.")
\ No newline at end of file
+        if model_name not in CRHF_MODELS:
+            raise ValueError(f"CRHF model '{model_name}' is not implemented.")
+        if gene is None or data_frame is None:
+            raise ValueError(f"Gene and data_frame must be provided for the {model_name} CRHF model.")
+        return CRHF_MODELS.get(model_name)(gene, data_frame, crhf_file_path)
\ No newline at end of file
@@ -0,0 +1,35 @@
+# src/penetrances/exporters/bundle_penetrance_exporter.py
+import logging
+from .penetrance_exporter import PenetranceExporter
+from ..liability_bundle import write_liability_bundle
+
+class BundlePenetranceExporter(PenetranceExporter):
+    """
+    Exports penetrance data as a memory-mappable liability bundle (see LiabilityBundle).
+    """
+
+    def export_data(self, liability_classes_df):
+        """
+        Writes the liability classes to a bundle file.
+
+        Generating parameters and input hashes are taken from `liability_classes_df.attrs`
+        ("parameters", "input_hashes") and recorded in the bundle header.
+
+        Parameters:
+            liability_classes (pd.DataFrame): Penetrance data with liability classes.
+        """
+        if self.output_file is None:
+            return liability_classes_df
+        if self.output_file == "stdout":
+            logging.error("Liability bundles are binary files, please specify an output file.")
+            return False
+        try:
+            write_liability_bundle(
+                self.output_file, liability_classes_df,
+                parameters=liability_classes_df.attrs.get("parameters"),
+                input_hashes=liability_classes_df.attrs.get("input_hashes")
+            )
+            return True
+        except (FileNotFoundError, IOError, OSError) as e:
+            logging.error(f"Error saving data to {self.output_file}: {e}")
+            return False
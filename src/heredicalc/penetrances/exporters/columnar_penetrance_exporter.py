@@ -0,0 +1,27 @@
+# src/penetrances/exporters/columnar_penetrance_exporter.py
+from .penetrance_exporter import PenetranceExporter
+from heredicalc.core.columnar_export import ColumnarExporterMixin
+
+class ColumnarPenetranceExporter(ColumnarExporterMixin, PenetranceExporter):
+    """
+    Exports penetrance data (liability classes) in a portable columnar format (see core.columnar_export).
+    Subclasses set `table_format`.
+    """
+
+class ArrowPenetranceExporter(ColumnarPenetranceExporter):
+    """
+    Exports penetrance data as an Arrow IPC (Feather v2) file.
+    """
+    table_format = "arrow"
+
+class ParquetPenetranceExporter(ColumnarPenetranceExporter):
+    """
+    Exports penetrance data as a Parquet file.
+    """
+    table_format = "parquet"
+
+class NpyPenetranceExporter(ColumnarPenetranceExporter):
+    """
+    Exports penetrance data as a directory of .npy files with a metadata.json description.
+    """
+    table_format = "npy"
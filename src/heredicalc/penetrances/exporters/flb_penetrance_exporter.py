@@ -3,6 +3,7 @@ import numpy as np
 import pandas as pd
 import logging
 from .penetrance_exporter import PenetranceExporter
+from ..liability_bundle import LiabilityBundle
 
 class FLBPenetranceExporter(PenetranceExporter):
     """
@@ -14,38 +15,23 @@ class FLBPenetranceExporter(PenetranceExporter):
         Exports penetrance data in FLB-compatible format.
 
         Parameters:
-            liability_classes (pd.DataFrame): Penetrance data with liability classes.
+            liability_classes (pd.DataFrame or LiabilityBundle): Penetrance data with liability classes.
         """
-        liability_classes_df.iloc[:, 0] = '"' + liability_classes_df.iloc[:, 0].astype(str) + '"'
-        liability_classes_df.iloc[:, 1] = '"' + liability_classes_df.iloc[:, 1].astype(str) + '"'
-        # liability_classes_df = liability_classes_df[
-        #     (liability_classes_df["age_class_lower"].notnull()) & 
-        #     (liability_classes_df["age_class_upper"].notnull())
-        # ]
-        # for idx, row in liability_classes_df.iterrows():
-        #     if pd.isna(row["age_class_upper"]) and not pd.isna(row["age_class_lower"]):
-        #         # Setze die Penetranzwerte dieser Zeile auf die Werte der vorhergehenden Zeile
-        #         liability_classes_df.at[idx, "penetrance_nc"] = liability_classes_df.at[idx - 1, "penetrance_nc"]
-        #         liability_classes_df.at[idx, "penetrance_het"] = liability_classes_df.at[idx - 1, "penetrance_het"]
-        #         liability_classes_df.at[idx, "penetrance_hom"] = liability_classes_df.at[idx - 1, "penetrance_hom"]
-        liability_classes_df = liability_classes_df.replace({np.nan: 'NaN'})
-        # import sys
-        # print (liability_classes_df)
-        # sys.exit(0)
-
-        # convert penetrance data to R-Style FLB() matrix like
-        #penetrance_matrix = liability_classes_df.to_numpy()
-        penetrance_matrix = liability_classes_df[["penetrance_nc", "penetrance_het", "penetrance_hom"]].to_numpy()
+        if isinstance(liability_classes_df, LiabilityBundle):
+            # Bundles hold the penetrance matrix already, no need to build a DataFrame
+            return self._write_output("penetrances = " + self.format_penetrance_matrix(liability_classes_df.penetrances) + "\n\n")
+        # Only the penetrance columns are exported; the input DataFrame is left unchanged
+        penetrance_matrix = liability_classes_df[["penetrance_nc", "penetrance_het", "penetrance_hom"]].to_numpy(dtype=float)
 
-        output = "penetrances = matrix(c(\n"
-        #output += ",\n".join(", ".join(map(str, row)) for row in penetrance_matrix)
-        output += ",\n".join(", ".join(map(lambda x: f"{x:.10f}", row)) for row in penetrance_matrix)
-        output += "), ncol=3, byrow=TRUE)\n\n"
+        output = "penetrances = " + self.format_penetrance_matrix(penetrance_matrix) + "\n\n"
 
         # logging.debug(output)
         # import sys
         # sys.exit(0)
 
+        return self._write_output(output)
+
+    def _write_output(self, output):
         if self.output_file is None:
             return output
         elif self.output_file == "stdout":
@@ -53,4 +39,23 @@ class FLBPenetranceExporter(PenetranceExporter):
         else:
             # Write Data to file
             with open(self.output_file, "w") as file:
-                file.write(output)
\ No newline at end of file
+                file.write(output)
+
+    @staticmethod
+    def format_penetrance_matrix(penetrance_matrix):
+        """
+        Formats a penetrance matrix as an R matrix expression.
+
+        Parameters:
+            penetrance_matrix (array-like): Rows of (non-carrier, heterozygous, homozygous) penetrances.
+
+        Returns:
+            str: R code of the form "matrix(c(...), ncol=3, byrow=TRUE)".
+        """
+        output = "matrix(c(\n"
+        penetrance_matrix = np.asarray(penetrance_matrix, dtype=float)
+        # Missing penetrances are written as R's NaN
+        formatted = np.where(np.isnan(penetrance_matrix), "NaN", np.char.mod("%.10f", penetrance_matrix))
+        output += ",\n".join(", ".join(row) for row in formatted)
+        output += "), ncol=3, byrow=TRUE)"
+        return output
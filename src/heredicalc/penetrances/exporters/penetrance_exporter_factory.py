@@ -1,9 +1,16 @@
 # src/penetrances/exporters/penetrance_exporter_factory.py
 
 import logging
-from .penetrance_exporter import PenetranceExporter
-from .flb_penetrance_exporter import FLBPenetranceExporter
-from .plain_penetrance_exporter import PlainPenetranceExporter
+from heredicalc.core.plugin_registry import PluginRegistry
+
+PENETRANCE_EXPORTERS = PluginRegistry("penetrance_exporters", {
+    "flb": ".flb_penetrance_exporter:FLBPenetranceExporter",
+    "plain": ".plain_penetrance_exporter:PlainPenetranceExporter",
+    "bundle": ".bundle_penetrance_exporter:BundlePenetranceExporter",
+    "arrow": ".columnar_penetrance_exporter:ArrowPenetranceExporter",
+    "parquet": ".columnar_penetrance_exporter:ParquetPenetranceExporter",
+    "npy": ".columnar_penetrance_exporter:NpyPenetranceExporter",
+}, package=__package__)
 
 class PenetranceExporterFactory:
     """
@@ -22,11 +29,8 @@ class PenetranceExporterFactory:
         Returns:
             PenetranceExporter: An instance of a specific penetrance exporter.
         """
-        if output_format == "flb":
-            logging.debug("Creating FLBPenetranceExporter instance.")
-            return FLBPenetranceExporter(output_file)
-        elif output_format == "plain":
-            logging.debug("Creating PlainPenetranceExporter instance.")
-            return PlainPenetranceExporter(output_file)
-        else:
-            raise ValueError(f"Unknown penetrance export format: {output_format}")
\ No newline at end of file
+        if output_format not in PENETRANCE_EXPORTERS:
+            raise ValueError(f"Unknown penetrance export format: {output_format}")
+        exporter_class = PENETRANCE_EXPORTERS.get(output_format)
+        logging.debug(f"Creating {exporter_class.__name__} instance.")
+        return exporter_class(output_file)
\ No newline at end of file
@@ -15,21 +15,22 @@ class PlainPenetranceExporter(PenetranceExporter):
         Parameters:
             liability_classes (pd.DataFrame): Penetrance data with liability classes.
         """
-        pd.set_option('display.max_rows', None)
         if self.output_file is None:
             return liability_classes_df
         elif self.output_file == "stdout":
-            pd.options.display.float_format = '{:.10f}'.format
-            print(liability_classes_df)
-            pd.reset_option('display.max_rows')
+            # Printed like the DataFrame's repr, with all rows and 10 decimals; formatting arguments
+            # instead of setting pandas display options, which are process-wide
+            print(liability_classes_df.to_string(
+                float_format='{:.10f}'.format, max_rows=None, max_cols=pd.get_option("display.max_columns"),
+                line_width=pd.get_option("display.width"), max_colwidth=pd.get_option("display.max_colwidth"),
+                show_dimensions=pd.get_option("display.show_dimensions")
+            ))
             return True
         else:
             try:
                 liability_classes_df.to_pickle(self.output_file)
                 logging.debug(f"Data successfully saved to {self.output_file}")
-                pd.reset_option('display.max_rows')
                 return True
             except (FileNotFoundError, IOError, OSError) as e:
                 logging.error(f"Error saving data to {self.output_file}: {e}")
-                pd.reset_option('display.max_rows')
                 return False
\ No newline at end of file
@@ -0,0 +1,220 @@
+# penetrances/gene_parameter_store.py
+import os
+import math
+import pickle
+import logging
+import threading
+import pandas as pd
+from heredicalc.core.config import PROJECT_ROOT
+
+DEFAULT_CRHF_FILE = PROJECT_ROOT / "data_sources" / "penetrances" / "crhf" / "constant_crhf_model.csv"
+DEFAULT_RR_DATA_DIR = PROJECT_ROOT / "data_sources" / "penetrances" / "relative_risks" / "static_lookup_tables"
+RR_REQUIRED_COLUMNS = {"gender", "age_from", "age_to", "phenotype", "heterozygous_rr", "homozygous_rr"}
+SNAPSHOT_VERSION = 1
+# Path of the binary snapshot used by the shared stores (see GeneParameterStore.shared)
+SNAPSHOT_ENV = "HEREDICALC_GENE_PARAMS_SNAPSHOT"
+
+class InvalidCRHFValueError(ValueError):
+    """Raised for a gene whose CRHF value in the CRHF file is not a frequency."""
+
+class GeneParameterStore:
+    """
+    Gene parameters (constant CRHF values and static relative risk tables), loaded once per process.
+
+    CRHF values are read from one CSV file, all relative risk tables from one directory
+    (<gene>.csv). Tables are validated when loaded and indexed by gene, phenotype and gender,
+    with the age intervals in file order. Invalid tables are reported when their gene is requested,
+    so one broken file does not affect other genes.
+
+    The parsed parameters can be kept in a binary snapshot, which is used instead of the CSV files
+    as long as none of them changed. The shared stores use the snapshot path set in the
+    HEREDICALC_GENE_PARAMS_SNAPSHOT environment variable, if any.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, crhf_file_path=None, rr_data_dir=None, snapshot_path=None):
+        """
+        Parameters:
+            crhf_file_path (str or Path): CSV file with 'gene' and 'crhf_value' columns.
+            rr_data_dir (str or Path): Directory with one relative risk table per gene.
+            snapshot_path (str or Path): Optional path of a binary snapshot of the parsed parameters.
+        """
+        self.crhf_file_path = str(crhf_file_path or DEFAULT_CRHF_FILE)
+        self.rr_data_dir = str(rr_data_dir or DEFAULT_RR_DATA_DIR)
+        self.snapshot_path = str(snapshot_path) if snapshot_path else None
+        self._lock = threading.RLock()
+        self._crhf = None          # gene -> value, or an Exception if the file could not be used
+        self._rr_tables = None     # gene -> validated DataFrame, or an Exception
+        self._rr_index = None      # gene -> {(phenotype, gender): [(age_from, age_to, het, hom), ...]}
+
+    @classmethod
+    def shared(cls, crhf_file_path=None, rr_data_dir=None, snapshot_path=None):
+        """
+        Returns the process-wide store for the given sources, creating it on first use.
+
+        The snapshot path defaults to the HEREDICALC_GENE_PARAMS_SNAPSHOT environment variable.
+        """
+        key = (str(crhf_file_path or DEFAULT_CRHF_FILE), str(rr_data_dir or DEFAULT_RR_DATA_DIR))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                snapshot_path = snapshot_path or os.environ.get(SNAPSHOT_ENV) or None
+                cls._shared[key] = cls(crhf_file_path, rr_data_dir, snapshot_path)
+            return cls._shared[key]
+
+    # --- CRHF values ---
+
+    def _load_crhf(self):
+        try:
+            crhf_df = pd.read_csv(self.crhf_file_path)
+        except FileNotFoundError as e:
+            return e
+        except Exception as e:
+            return ValueError(f"Error loading CRHF file {self.crhf_file_path}: {e}")
+        missing_columns = {"gene", "crhf_value"} - set(crhf_df.columns)
+        if missing_columns:
+            return ValueError(f"Columns {missing_columns} not found in CRHF file {self.crhf_file_path}")
+        values = {}
+        for gene, value in zip(crhf_df["gene"], crhf_df["crhf_value"]):
+            if gene in values:  # first row per gene wins
+                continue
+            if not 0 <= value <= 1:
+                # Reported when the gene is requested, so other genes stay usable
+                values[gene] = InvalidCRHFValueError(
+                    f"CRHF value {value} for gene {gene} in {self.crhf_file_path} is not a frequency.")
+            else:
+                values[gene] = value
+        return values
+
+    def crhf_value(self, gene):
+        """
+        Returns the constant CRHF value of a gene, or None if the gene is not listed.
+
+        Raises:
+            FileNotFoundError: If the CRHF file does not exist.
+            ValueError: If the CRHF file is invalid.
+            InvalidCRHFValueError: If the CRHF value of the gene is not between 0 and 1.
+        """
+        self._ensure_loaded()
+        if isinstance(self._crhf, Exception):
+            raise self._crhf
+        value = self._crhf.get(gene)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    # --- relative risks ---
+
+    def _rr_files(self):
+        if not os.path.isdir(self.rr_data_dir):
+            return {}
+        return {name[:-len(".csv")]: os.path.join(self.rr_data_dir, name)
+                for name in sorted(os.listdir(self.rr_data_dir)) if name.endswith(".csv")}
+
+    @staticmethod
+    def _load_rr_table(gene, file_path):
+        try:
+            df = pd.read_csv(file_path)
+        except Exception as e:
+            return ValueError(f"Error loading relative risk file {file_path}: {e}")
+        if not RR_REQUIRED_COLUMNS.issubset(df.columns):
+            missing_columns = RR_REQUIRED_COLUMNS - set(df.columns)
+            return ValueError(f"CSV file for {gene} is missing required columns: {missing_columns}")
+        invalid_intervals = df["age_to"].notna() & (df["age_to"] < df["age_from"])
+        if invalid_intervals.any():
+            return ValueError(f"CSV file for {gene} has age intervals ending before they start "
+                              f"(rows {list(df.index[invalid_intervals])}).")
+        return df
+
+    @staticmethod
+    def _index_rr_table(df):
+        index = {}
+        for row in df.itertuples(index=False):
+            index.setdefault((row.phenotype, row.gender), []).append(
+                (row.age_from, row.age_to, row.heterozygous_rr, row.homozygous_rr)
+            )
+        return index
+
+    def rr_table(self, gene):
+        """
+        Returns the validated relative risk table of a gene (shared, do not modify).
+
+        Raises:
+            FileNotFoundError: If there is no table for the gene.
+            ValueError: If the table is invalid.
+        """
+        self._ensure_loaded()
+        table = self._rr_tables.get(gene)
+        if table is None:
+            logging.error(f"Relative risk file for gene '{gene}' not found at {os.path.join(self.rr_data_dir, gene + '.csv')}")
+            raise FileNotFoundError(f"Relative risk file for gene '{gene}' not found.")
+        if isinstance(table, Exception):
+            raise table
+        return table
+
+    def relative_risk(self, gene, age, phenotype, gender):
+        """
+        Looks up the (heterozygous, homozygous) relative risks for an age, phenotype and gender.
+
+        Intervals are matched in file order; an empty 'age_to' is open-ended.
+
+        Returns:
+            tuple: The relative risks of the first matching interval, or None if none matches.
+        """
+        self.rr_table(gene)  # raises for unknown or invalid genes
+        for age_from, age_to, heterozygous_rr, homozygous_rr in self._rr_index[gene].get((phenotype, gender), ()):
+            if age_from <= age and (age_to >= age or math.isnan(age_to)):
+                return heterozygous_rr, homozygous_rr
+        return None
+
+    # --- loading and snapshots ---
+
+    def _source_signature(self):
+        files = [self.crhf_file_path] + list(self._rr_files().values())
+        return [(path, os.path.getmtime(path), os.path.getsize(path)) for path in files if os.path.exists(path)]
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._rr_index is not None:
+                return
+            signature = self._source_signature()
+            if self.snapshot_path and self._load_snapshot(signature):
+                return
+            self._crhf = self._load_crhf()
+            self._rr_tables = {gene: self._load_rr_table(gene, path) for gene, path in self._rr_files().items()}
+            self._rr_index = {gene: self._index_rr_table(table) for gene, table in self._rr_tables.items()
+                              if not isinstance(table, Exception)}
+            logging.info(f"Loaded gene parameters: {len(self._rr_index)} relative risk tables from {self.rr_data_dir}.")
+            if self.snapshot_path:
+                self._save_snapshot(signature)
+
+    def _load_snapshot(self, signature):
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return False
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("signature") != signature:
+            logging.debug(f"Gene parameter snapshot {self.snapshot_path} is outdated.")
+            return False
+        self._crhf, self._rr_tables, self._rr_index = snapshot["crhf"], snapshot["rr_tables"], snapshot["rr_index"]
+        logging.debug(f"Loaded gene parameters from snapshot {self.snapshot_path}.")
+        return True
+
+    def _save_snapshot(self, signature):
+        snapshot = {"version": SNAPSHOT_VERSION, "signature": signature,
+                    "crhf": self._crhf, "rr_tables": self._rr_tables, "rr_index": self._rr_index}
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logging.warning(f"Could not write gene parameter snapshot {self.snapshot_path}: {e}")
+
+    def reload(self):
+        """Drops the loaded parameters; they are read again on next use."""
+        with self._lock:
+            self._crhf = self._rr_tables = self._rr_index = None
@@ -0,0 +1,199 @@
+# penetrances/liability_bundle.py
+import os
+import json
+import struct
+import hashlib
+import logging
+import uuid
+import numpy as np
+import pandas as pd
+
+BUNDLE_MAGIC = b"HCLBNDL1"
+BUNDLE_PREAMBLE = struct.Struct("<8sQ")  # magic, header length
+BUNDLE_ALIGNMENT = 64
+BUNDLE_SUFFIX = ".hclb"
+LIABILITY_CLASS_COLUMNS = ['gender', 'phenotype', 'age_class_lower', 'age_class_upper']
+PENETRANCE_COLUMNS = ['penetrance_nc', 'penetrance_het', 'penetrance_hom']
+
+class LiabilityBundle:
+    """
+    A liability table stored as a read-only, memory-mapped penetrance matrix.
+
+    The file starts with a JSON header holding the liability class index (gender, phenotype,
+    age class bounds), the generating parameters and input hashes, followed by the penetrances
+    as a contiguous little-endian float64 array of shape (classes, 3). Opening a bundle maps the
+    array instead of reading it, so any number of processes share one copy in the page cache.
+    """
+
+    def __init__(self, path):
+        """
+        Parameters:
+            path (str or Path): Path to the bundle file.
+
+        Raises:
+            ValueError: If the file is not a liability bundle.
+        """
+        self.path = str(path)
+        with open(self.path, "rb") as file:
+            magic, header_length = BUNDLE_PREAMBLE.unpack(file.read(BUNDLE_PREAMBLE.size))
+            if magic != BUNDLE_MAGIC:
+                raise ValueError(f"{self.path} is not a liability bundle.")
+            self.header = json.loads(file.read(header_length))
+        rows = self.header["rows"]
+        if rows:
+            self.penetrances = np.memmap(self.path, dtype="<f8", mode="r",
+                                         offset=self.header["data_offset"], shape=(rows, len(PENETRANCE_COLUMNS)))
+        else:
+            self.penetrances = np.empty((0, len(PENETRANCE_COLUMNS)))
+        self._classes = None
+
+    @property
+    def parameters(self):
+        """Parameters the liability table was generated with."""
+        return self.header.get("parameters", {})
+
+    @property
+    def input_hashes(self):
+        """Hashes of the inputs the liability table was generated from."""
+        return self.header.get("input_hashes", {})
+
+    @property
+    def classes(self):
+        """pd.DataFrame: The liability class index (gender, phenotype, age class bounds)."""
+        if self._classes is None:
+            classes = pd.DataFrame(self.header["classes"], columns=LIABILITY_CLASS_COLUMNS)
+            for column in ('age_class_lower', 'age_class_upper'):
+                classes[column] = classes[column].astype(float)
+            self._classes = classes
+        return self._classes
+
+    @property
+    def empty(self):
+        return self.header["rows"] == 0
+
+    def __len__(self):
+        return self.header["rows"]
+
+    def verify(self):
+        """Returns True if the penetrances match the checksum recorded in the header."""
+        return _sha256(self.penetrances) == self.header["penetrances_sha256"]
+
+    def to_dataframe(self):
+        """Returns the bundle as a liability table, as produced by `calculate_liability_classes`."""
+        df = self.classes.copy()
+        df[PENETRANCE_COLUMNS] = np.array(self.penetrances)
+        df.index.name = 'liability_class'
+        return df
+
+def _sha256(penetrances):
+    return hashlib.sha256(np.ascontiguousarray(penetrances, dtype="<f8").tobytes()).hexdigest()
+
+def hash_dataframe(df):
+    """Returns a SHA-256 hash of the content of a DataFrame, used to record bundle inputs."""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()
+
+def liability_fingerprint(liabilities):
+    """
+    Returns a SHA-256 fingerprint of the liability classes and penetrances of a table or bundle.
+    For bundles it is derived from the header, without reading the penetrances.
+    """
+    if isinstance(liabilities, LiabilityBundle):
+        classes, penetrances_sha256 = liabilities.header["classes"], liabilities.header["penetrances_sha256"]
+    else:
+        classes_df = liabilities[LIABILITY_CLASS_COLUMNS].astype(object)
+        classes = classes_df.where(classes_df.notna(), None).values.tolist()
+        penetrances_sha256 = _sha256(liabilities[PENETRANCE_COLUMNS].to_numpy(dtype=float))
+    canonical = json.dumps({"classes": classes, "penetrances_sha256": penetrances_sha256}, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def liability_bundle_bytes(liability_classes_df, parameters=None, input_hashes=None):
+    """
+    Serializes a liability table in the bundle format.
+
+    Parameters:
+        liability_classes_df (pd.DataFrame): Liability classes with penetrances.
+        parameters (dict): Parameters the table was generated with.
+        input_hashes (dict): Hashes of the inputs the table was generated from.
+
+    Returns:
+        bytes: The content of a bundle file.
+    """
+    penetrances = np.ascontiguousarray(liability_classes_df[PENETRANCE_COLUMNS].to_numpy(dtype=float), dtype="<f8")
+    classes = liability_classes_df[LIABILITY_CLASS_COLUMNS].astype(object)
+    classes = classes.where(classes.notna(), None)
+    header = {
+        "format_version": 1,
+        "rows": len(penetrances),
+        "dtype": "<f8",
+        "parameters": parameters or {},
+        "input_hashes": input_hashes or {},
+        "penetrances_sha256": _sha256(penetrances),
+        "classes": classes.values.tolist(),
+    }
+    # The data offset depends on the header length, which depends on the offset's digits
+    header["data_offset"] = 0
+    while True:
+        header_bytes = json.dumps(header, default=str).encode()
+        data_offset = -(-(BUNDLE_PREAMBLE.size + len(header_bytes)) // BUNDLE_ALIGNMENT) * BUNDLE_ALIGNMENT
+        if header["data_offset"] == data_offset:
+            break
+        header["data_offset"] = data_offset
+    header_bytes = header_bytes.ljust(data_offset - BUNDLE_PREAMBLE.size)
+    return BUNDLE_PREAMBLE.pack(BUNDLE_MAGIC, len(header_bytes)) + header_bytes + penetrances.tobytes()
+
+def write_liability_bundle(path, liability_classes_df, parameters=None, input_hashes=None):
+    """
+    Writes a liability table as a bundle. The file is replaced atomically, so processes
+    reading a previous version of the bundle are not affected.
+
+    Parameters:
+        path (str or Path): Target path.
+        liability_classes_df (pd.DataFrame): Liability classes with penetrances.
+        parameters (dict): Parameters the table was generated with.
+        input_hashes (dict): Hashes of the inputs the table was generated from.
+    """
+    content = liability_bundle_bytes(liability_classes_df, parameters, input_hashes)
+    directory = os.path.dirname(os.path.abspath(path))
+    # Created like a regular file (0666 less the umask), unlike tempfile's private (0600) files
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{uuid.uuid4().hex}.tmp")
+    with os.fdopen(os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0), 0o666),
+                   "wb") as file:
+        file.write(content)
+    os.replace(tmp_path, path)
+    logging.debug(f"Liability bundle with {len(liability_classes_df)} classes written to {path}")
+
+def is_liability_bundle(path):
+    """Returns True if the file at `path` starts with the bundle magic."""
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(BUNDLE_MAGIC)) == BUNDLE_MAGIC
+    except OSError:
+        return False
+
+def load_liability_table(path):
+    """
+    Loads a liability table from a bundle (memory-mapped) or a pickled DataFrame.
+
+    Returns:
+        LiabilityBundle or pd.DataFrame: The liability table.
+    """
+    if is_liability_bundle(path):
+        return LiabilityBundle(path)
+    return pd.read_pickle(path)
+
+def liability_classes(liabilities):
+    """Returns the liability class index of a bundle, or a liability table unchanged."""
+    if isinstance(liabilities, LiabilityBundle):
+        return liabilities.classes
+    return liabilities
+
+def liability_parts(liabilities):
+    """
+    Splits a liability table or bundle into its class index and penetrance matrix.
+
+    Returns:
+        tuple: (pd.DataFrame with the liability class columns, array of shape (classes, 3)).
+    """
+    if isinstance(liabilities, LiabilityBundle):
+        return liabilities.classes, liabilities.penetrances
+    return liabilities[LIABILITY_CLASS_COLUMNS], liabilities[PENETRANCE_COLUMNS].to_numpy(dtype=float)
@@ -16,4 +16,23 @@ class PenetranceModel(ABC):
         Raises:
             NotImplementedError: Must be implemented in subclasses.
         """
-        raise NotImplementedError("Subclasses must implement this method.")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement this method.")
+
+    def calculate_penetrance_replicates(self, liability_classes_df, cumulative_risk_df, lambdas, cumulative_risks):
+        """
+        Vectorized penetrance calculation for many replicates at once (e.g. bootstrap samples).
+
+        Parameters:
+            liability_classes_df (pd.DataFrame): Liability classes of the point estimate, one row per lambda.
+            cumulative_risk_df (pd.DataFrame): Cumulative risk age classes of the point estimate.
+            lambdas (np.ndarray): Lambda values of shape (replicates, liability classes, 3) for
+                non-carriers, heterozygotes and homozygotes.
+            cumulative_risks (np.ndarray): Cumulative risks of shape (replicates, age classes, 3).
+
+        Returns:
+            np.ndarray: Penetrances of shape (replicates, liability classes, 3).
+
+        Raises:
+            NotImplementedError: If the model has no vectorized implementation.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support replicate calculations.")
\ No newline at end of file
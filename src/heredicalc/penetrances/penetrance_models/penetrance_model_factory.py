@@ -1,8 +1,12 @@
 # penetrances/penetrance_models/penetrance_model_factory.py
 import logging
-from .uniform_penetrance_model import UniformPenetranceModel
-from .uniform_survival_penetrance_model import UniformSurvivalPenetranceModel
-from .dummy_penetrance_model import DummyPenetranceModel
+from heredicalc.core.plugin_registry import PluginRegistry
+
+PENETRANCE_MODELS = PluginRegistry("penetrance_models", {
+    "uniform": ".uniform_penetrance_model:UniformPenetranceModel",
+    "uniform_survival": ".uniform_survival_penetrance_model:UniformSurvivalPenetranceModel",
+    "dummy": ".dummy_penetrance_model:DummyPenetranceModel",
+}, package=__package__)
 
 class PenetranceModelFactory:
     """
@@ -24,14 +28,8 @@ class PenetranceModelFactory:
         Raises:
             ValueError: If the specified model type is not supported.
         """
-        if model_type == "uniform":
-            logging.debug("Creating UniformPenetranceModel instance.")
-            return UniformPenetranceModel(*args, **kwargs)
-        elif model_type == "uniform_survival":
-            logging.debug("Creating UniformSurvivalPenetranceModel instance.")
-            return UniformSurvivalPenetranceModel(*args, **kwargs)
-        elif model_type == "dummy":
-            logging.debug("Creating DummyPenetranceModel instance.")
-            return DummyPenetranceModel(*args, **kwargs)
-        else:
-            raise ValueError(f"Unknown penetrance model type: {model_type}")    
\ No newline at end of file
+        if model_type not in PENETRANCE_MODELS:
+            raise ValueError(f"Unknown penetrance model type: {model_type}")
+        model_class = PENETRANCE_MODELS.get(model_type)
+        logging.debug(f"Creating {model_class.__name__} instance.")
+        return model_class(*args, **kwargs)    
\ No newline at end of file
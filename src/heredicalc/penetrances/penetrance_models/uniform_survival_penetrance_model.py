@@ -1,6 +1,7 @@
 # penetrances/penetrance_models/uniform_survival_penetrance_model.py
 
 import logging
+import numpy as np
 from .penetrance_model import PenetranceModel
 
 class UniformSurvivalPenetranceModel(PenetranceModel):
@@ -60,4 +61,37 @@ class UniformSurvivalPenetranceModel(PenetranceModel):
                 else:
                     logging.warning(f"No previous age class found for gender={gender}, age_upper={age_upper}")
         
-        return liability_classes_df
\ No newline at end of file
+        return liability_classes_df
+
+    def calculate_penetrance_replicates(self, liability_classes_df, cumulative_risk_df, lambdas, cumulative_risks):
+        """
+        Vectorized form of `calculate_penetrance` for many replicates at once.
+
+        The previous age class of every liability class is resolved once; penetrances of all
+        replicates are then computed with a single gather and multiplication.
+
+        Parameters:
+            liability_classes_df (pd.DataFrame): Liability classes of the point estimate, one row per lambda.
+            cumulative_risk_df (pd.DataFrame): Cumulative risk age classes of the point estimate.
+            lambdas (np.ndarray): Lambda values of shape (replicates, liability classes, 3).
+            cumulative_risks (np.ndarray): Cumulative risks of shape (replicates, age classes, 3).
+
+        Returns:
+            np.ndarray: Penetrances of shape (replicates, liability classes, 3); NaN where the
+            point estimate has no previous age class either.
+        """
+        replicates, age_classes = cumulative_risks.shape[:2]
+        # Extra columns: risk 0 for first age classes, NaN where no previous age class exists
+        padded_risks = np.concatenate(
+            [cumulative_risks, np.zeros((replicates, 1, 3)), np.full((replicates, 1, 3), np.nan)], axis=1
+        )
+        cr_genders = cumulative_risk_df['gender'].to_numpy()
+        cr_uppers = cumulative_risk_df['age_class_upper'].to_numpy()
+        previous_classes = []
+        for gender, age_lower in zip(liability_classes_df['gender'], liability_classes_df['age_class_lower']):
+            matches = np.flatnonzero((cr_genders == gender) & (cr_uppers == age_lower - 1))
+            if age_lower == 0:
+                previous_classes.append(age_classes)
+            else:
+                previous_classes.append(matches[0] if len(matches) else age_classes + 1)
+        return lambdas * (1 - padded_risks[:, previous_classes, :])
\ No newline at end of file
@@ -1,7 +1,11 @@
 # penetrances/relative_risk_models/relative_risk_model_factory.py
 
 import logging
-from .static_lookup_rr_model import StaticLookupRRModel
+from heredicalc.core.plugin_registry import PluginRegistry
+
+RELATIVE_RISK_MODELS = PluginRegistry("relative_risk_models", {
+    "static_lookup": ".static_lookup_rr_model:StaticLookupRRModel",
+}, package=__package__)
 
 class RelativeRiskModelFactory:
     """
@@ -24,8 +28,8 @@ class RelativeRiskModelFactory:
         Raises:
             ValueError: If the specified model type is not supported.
         """
-        if model_type == "static_lookup":
-            logging.debug(f"Creating StaticLookupRRModel instance for gene '{gene}'.")
-            return StaticLookupRRModel(gene, data_frame, rr_file_path)
-        else:
-            raise ValueError(f"Unknown relative risk model type: {model_type}")
\ No newline at end of file
+        if model_type not in RELATIVE_RISK_MODELS:
+            raise ValueError(f"Unknown relative risk model type: {model_type}")
+        model_class = RELATIVE_RISK_MODELS.get(model_type)
+        logging.debug(f"Creating {model_class.__name__} instance for gene '{gene}'.")
+        return model_class(gene, data_frame, rr_file_path)
\ No newline at end of file
@@ -1,10 +1,9 @@
 # penetrances/relative_risk_models/static_lookup_rr_model.py
 
-import os
 import pandas as pd
 import logging
 from .relative_risk_model import RelativeRiskModel
-from heredicalc.core.config import PROJECT_ROOT
+from heredicalc.penetrances.gene_parameter_store import GeneParameterStore, DEFAULT_RR_DATA_DIR
 
 
 class StaticLookupRRModel(RelativeRiskModel):
@@ -12,7 +11,8 @@ class StaticLookupRRModel(RelativeRiskModel):
     Model for calculating relative risks using a static lookup table.
     
     This model loads relative risk data from gene-specific CSV files and provides
-    relative risk values based on age, phenotype, and gender.
+    relative risk values based on age, phenotype, and gender. The tables are read and
+    indexed once per process by the shared GeneParameterStore.
     """
 
     def __init__(self, gene: str, data_frame: pd.DataFrame, data_dir: str = None):
@@ -25,9 +25,7 @@ class StaticLookupRRModel(RelativeRiskModel):
         """
         # Define the default path based on the file location if none provided
         if data_dir is None:
-            data_dir = os.path.join(
-                PROJECT_ROOT, "data_sources", "penetrances", "relative_risks", "static_lookup_tables"
-            )
+            data_dir = str(DEFAULT_RR_DATA_DIR)
 
         self.gene = gene
         self.data_dir = data_dir
@@ -36,30 +34,17 @@ class StaticLookupRRModel(RelativeRiskModel):
 
     def _load_lookup_table(self) -> pd.DataFrame:
         """
-        Load the relative risk lookup table for the specified gene from a CSV file.
+        Load the relative risk lookup table for the specified gene from the shared gene parameter store.
         
         Returns:
-            pd.DataFrame: DataFrame containing relative risks for the gene.
+            pd.DataFrame: DataFrame containing relative risks for the gene (shared, not to be modified).
         
         Raises:
             FileNotFoundError: If the file for the gene does not exist.
             ValueError: If required columns are missing in the CSV.
         """
-        file_path = os.path.join(self.data_dir, f"{self.gene}.csv")
-        if not os.path.isfile(file_path):
-            logging.error(f"Relative risk file for gene '{self.gene}' not found at {file_path}")
-            raise FileNotFoundError(f"Relative risk file for gene '{self.gene}' not found.")
-        
-        # Load the CSV file into a DataFrame
-        logging.info(f"Loading relative risk data from {file_path}")
-        df = pd.read_csv(file_path)
-        
-        # Validate columns are as expected
-        required_columns = {"gender", "age_from", "age_to", "phenotype", "heterozygous_rr", "homozygous_rr"}
-        if not required_columns.issubset(df.columns):
-            missing_columns = required_columns - set(df.columns)
-            raise ValueError(f"CSV file for {self.gene} is missing required columns: {missing_columns}")
-        return df
+        self.store = GeneParameterStore.shared(rr_data_dir=self.data_dir)
+        return self.store.rr_table(self.gene)
 
     def calculate_relative_risk(self, age: int, phenotype: str, gender: str) -> tuple:
         """
@@ -73,25 +58,20 @@ class StaticLookupRRModel(RelativeRiskModel):
         Returns:
             tuple: (heterozygous_risk, homozygous_risk) for the given parameters.
         """
-        # Filter the lookup table by phenotype, gender, and age range
-        filtered_df = self.lookup_table[
-            (self.lookup_table["phenotype"] == phenotype) &
-            (self.lookup_table["gender"] == gender) &
-            (self.lookup_table["age_from"] <= age) &
-            ((self.lookup_table["age_to"] >= age) | (self.lookup_table["age_to"].isna()))
-        ]
+        # First matching age interval for phenotype and gender, from the store's index
+        risks = self.store.relative_risk(self.gene, age, phenotype, gender)
 
-        if filtered_df.empty:
+        if risks is None:
             logging.warning(f"No relative risk data found for {self.gene} with age={age}, phenotype={phenotype}, gender={gender}")
             return 0, 0
         
-        # Retrieve the risks for the first matched row
-        heterozygous_risk = filtered_df.iloc[0]["heterozygous_rr"]
-        homozygous_risk = filtered_df.iloc[0]["homozygous_rr"] if not pd.isna(filtered_df.iloc[0]["homozygous_rr"]) else 0
+        heterozygous_risk, homozygous_risk = risks
+        if pd.isna(homozygous_risk):
+            homozygous_risk = 0
         
         logging.info(
             f"Retrieved RR for {self.gene}, age={age}, phenotype={phenotype}, gender={gender}: "
             f"Heterozygous={heterozygous_risk}, Homozygous={homozygous_risk}"
         )
         
-        return heterozygous_risk, homozygous_risk
\ No newline at end of file
+        return heterozygous_risk, homozygous_risk
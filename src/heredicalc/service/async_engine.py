@@ -0,0 +1,232 @@
+# service/async_engine.py
+import io
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from heredicalc.core.run_context import RunContext
+from heredicalc.bin.penetrances import build_incidence_data, calculate_liability_classes
+from heredicalc.pedconv.pedconv.pedigree import Pedigree
+from heredicalc.flb.flb_runner import load_flb_pedigree, prepare_flb_pedigree, run_flb_calculation_async
+from heredicalc.flb.flb_sweep import prepare_sweep_input, parse_sweep_output
+
+class AsyncEngine:
+    """
+    Asyncio interface for penetrance and FLB calculations.
+
+    Jobs are submitted to a bounded queue and executed by a fixed number of worker tasks, so
+    at most `concurrency` jobs run at the same time and `submit` waits while the queue is full
+    (backpressure). FLB evaluations run R as an asyncio subprocess; pandas work (incidence
+    tables, liability classes, FLB inputs) is offloaded to a thread pool. Cancelling an awaiting
+    caller cancels its job, and a job exceeding its deadline raises asyncio.TimeoutError; in
+    both cases a running R process is killed. Work in the thread pool runs with the engine's
+    RunContext active.
+
+    Usage:
+        async with AsyncEngine(concurrency=4) as engine:
+            liabilities_df = await engine.liabilities("ci5_ix", ["C50"], "BRCA1")
+            flb_df = await engine.flb(pedigree, liabilities={"BRCA1": liabilities_df})
+    """
+
+    def __init__(self, concurrency=4, max_queue=64, default_timeout=None, service=None, force_download="no",
+                 context=None):
+        """
+        Parameters:
+            concurrency (int): Number of jobs executed at the same time.
+            max_queue (int): Maximum number of pending jobs before submitting waits.
+            default_timeout (float): Deadline in seconds for jobs without an explicit timeout
+                (measured from submission, None for no deadline).
+            service (HeredicalcService): Optional service whose caches are used for liability tables.
+            force_download (str): Download option passed to the data source handlers.
+            context (RunContext): Configuration, cache directory and logging of the jobs (default: the
+                context of `service`, or a non-interactive context for the current working directory).
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.service = service
+        self.force_download = force_download
+        self.context = context or (service.context if service is not None else RunContext())
+        self._queue = None
+        self._workers = []
+        self._executor = None
+
+    async def start(self):
+        """Starts the worker tasks (called automatically on first submission)."""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="heredicalc")
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        logging.debug(f"Started async engine with {self.concurrency} workers.")
+
+    async def close(self):
+        """Cancels pending and running jobs and stops the workers."""
+        if not self._workers:
+            return
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            future.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    @property
+    def pending(self):
+        """Number of jobs waiting in the queue."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, job, timeout=None):
+        """
+        Queues a job and waits for its result.
+
+        Parameters:
+            job (callable): Coroutine function without arguments performing the work.
+            timeout (float): Deadline in seconds from submission (default: `default_timeout`).
+
+        Returns:
+            The result of the job.
+
+        Raises:
+            asyncio.TimeoutError: If the job does not finish before its deadline.
+        """
+        await self.start()
+        loop = asyncio.get_running_loop()
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = loop.time() + timeout if timeout is not None else None
+        future = loop.create_future()
+        await self._queue.put((job, future, deadline))
+        try:
+            return await future
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    async def run_in_executor(self, function, *args):
+        """Runs a blocking function in the engine's thread pool, with the engine's RunContext active."""
+        await self.start()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(self.context.run, function, *args)
+        )
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, future, deadline = await self._queue.get()
+            try:
+                if future.done():
+                    continue
+                remaining = deadline - loop.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    future.set_exception(asyncio.TimeoutError("Job deadline expired while queued."))
+                    continue
+                task = asyncio.create_task(job())
+                future.add_done_callback(lambda f, task=task: task.cancel() if f.cancelled() else None)
+                try:
+                    result = await asyncio.wait_for(asyncio.shield(task), remaining)
+                except asyncio.TimeoutError:
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    if not future.done():
+                        future.set_exception(asyncio.TimeoutError("Job exceeded its deadline."))
+                    continue
+                except asyncio.CancelledError:
+                    if not task.cancelled():
+                        # The worker itself is being stopped
+                        task.cancel()
+                        await asyncio.gather(task, return_exceptions=True)
+                        future.cancel()
+                        raise
+                    continue
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    def _get_source_config(self, dataset):
+        if self.service is not None:
+            return self.service.get_source_config(dataset)
+        return self.context.source_config(dataset)
+
+    def _calculate_liabilities(self, dataset, phenotypes, gene, population, models):
+        if self.service is not None:
+            return self.service.liabilities(dataset, phenotypes, gene, population=population, **models)
+        df, _ = build_incidence_data(self._get_source_config(dataset), population, phenotypes, self.force_download)
+        return calculate_liability_classes(df, phenotypes, gene, **models)
+
+    async def liabilities(self, dataset, phenotypes, gene, population=None, crhf_model="constant",
+                          rr_model="static_lookup", cr_model="simple", penetrance_model="uniform_survival",
+                          timeout=None):
+        """
+        Calculates the liability classes for a gene (see `calculate_liability_classes`).
+
+        Returns:
+            pd.DataFrame: Liability classes with penetrances.
+        """
+        models = dict(crhf_model=crhf_model, rr_model=rr_model, cr_model=cr_model, penetrance_model=penetrance_model)
+        phenotypes = sorted(set(phenotypes))
+
+        async def job():
+            return await self.run_in_executor(
+                self._calculate_liabilities, dataset, phenotypes, gene, population, models
+            )
+        return await self.submit(job, timeout)
+
+    async def flb(self, pedigree, liabilities=None, afreq=(0.0001,), pedigree_format="cool", timeout=None,
+                  **liability_parameters):
+        """
+        Calculates FLB values for a pedigree.
+
+        Parameters:
+            pedigree (Pedigree or str): A Pedigree or the content of a pedigree file.
+            liabilities (pd.DataFrame or dict): Liability table, or mapping of set name to liability
+                table. If None, the table is calculated from `liability_parameters`.
+            afreq (float or list): Allele frequencies to evaluate.
+            pedigree_format (str): Format of `pedigree` if it is given as file content.
+            timeout (float): Deadline in seconds for the FLB job.
+            **liability_parameters: Parameters of `liabilities` (dataset, phenotypes, gene, ...).
+                `gene` may be a list of genes, which are evaluated as a panel.
+
+        Returns:
+            pd.DataFrame: Table with columns 'liability_set', 'afreq' and 'flb'.
+        """
+        if liabilities is None:
+            if "gene" not in liability_parameters:
+                raise ValueError("Either liabilities or the liability parameters (dataset, phenotypes, gene) are required.")
+            genes = liability_parameters.pop("gene")
+            genes = [genes] if isinstance(genes, str) else list(dict.fromkeys(genes))
+            tables = await asyncio.gather(*(self.liabilities(gene=gene, **liability_parameters, timeout=timeout)
+                                            for gene in genes))
+            liabilities = dict(zip(genes, tables))
+        elif not isinstance(liabilities, dict):
+            liabilities = {"liability": liabilities}
+        allele_freqs = [float(freq) for freq in (afreq if isinstance(afreq, (list, tuple)) else [afreq])]
+
+        def prepare_input():
+            if isinstance(pedigree, Pedigree):
+                pedigree_obj = Pedigree(pedigree.ped_id)
+                pedigree_obj.members_df = pedigree.members_df.copy()
+                flb_pedigree = prepare_flb_pedigree(pedigree_obj)
+            else:
+                pedigree_obj, flb_pedigree = load_flb_pedigree(io.StringIO(pedigree), pedigree_format)
+            return prepare_sweep_input(flb_pedigree, pedigree_obj.members_df, liabilities, allele_freqs)
+
+        async def job():
+            r_input_str = await self.run_in_executor(prepare_input)
+            return parse_sweep_output(await run_flb_calculation_async(r_input_str))
+        return await self.submit(job, timeout)
@@ -0,0 +1,80 @@
+# service/client.py
+# Only depends on the standard library, so client processes start quickly.
+import json
+import socket
+import http.client
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection talking to a server on a Unix domain socket."""
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class ServiceClient:
+    """
+    Client for a running heredicalc service (see heredicalc.service.server).
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, socket_path=None, timeout=None):
+        """
+        Parameters:
+            host (str): Host of the service (ignored if socket_path is set).
+            port (int): TCP port of the service (ignored if socket_path is set).
+            socket_path (str): Path to the Unix socket of the service.
+            timeout (float): Optional timeout per request, in seconds.
+        """
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connection(self):
+        if self.socket_path:
+            return UnixHTTPConnection(self.socket_path, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, payload=None):
+        """
+        Sends a request and returns the decoded JSON answer.
+
+        Raises:
+            RuntimeError: If the service answers with an error status.
+        """
+        connection = self._connection()
+        try:
+            body = json.dumps(payload).encode() if payload is not None else None
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            answer = json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise RuntimeError(f"Service error {response.status}: {answer.get('error', 'unknown error')}")
+        return answer
+
+    def health(self):
+        return self.request("GET", "/health")
+
+    def stats(self):
+        return self.request("GET", "/stats")
+
+    def reload(self):
+        """Makes the service re-read sources.yaml; returns the names of changed datasets."""
+        return self.request("POST", "/reload", {})["changed"]
+
+    def liabilities(self, **parameters):
+        """Returns the liability table as a dict with 'columns', 'index' and 'data'."""
+        return self.request("POST", "/liabilities", parameters)["liabilities"]
+
+    def flb(self, pedigree, pedigree_format="cool", afreq=(0.0001,), **liability_parameters):
+        """Returns the FLB results as a list of {'liability_set', 'afreq', 'flb'} records."""
+        payload = dict(liability_parameters, pedigree=pedigree, pedigree_format=pedigree_format, afreq=list(afreq))
+        return self.request("POST", "/flb", payload)["results"]
@@ -0,0 +1,164 @@
+# service/heredicalc_service.py
+import io
+import queue
+import logging
+from heredicalc.core.lru_cache import LRUCache
+from heredicalc.core.run_context import RunContext
+from heredicalc.core.artifact_manifest import dataset_fingerprints
+from heredicalc.bin.penetrances import build_incidence_data, calculate_liability_classes
+from heredicalc.penetrances.crhf_models.crhf_model_factory import CRHFModelFactory
+from heredicalc.penetrances.relative_risk_models.relative_risk_model_factory import RelativeRiskModelFactory
+from heredicalc.flb.flb_runner import load_flb_pedigree
+from heredicalc.flb.flb_sweep import run_flb_sweep
+from heredicalc.flb.r_session import RSession
+
+LIABILITY_PARAMETERS = ("dataset", "population", "phenotypes", "gene",
+                        "crhf_model", "rr_model", "cr_model", "penetrance_model")
+
+class HeredicalcService:
+    """
+    Keeps the data needed for penetrance and FLB calculations in memory between requests.
+
+    The source catalog is parsed once. Incidence tables, CRHF/RR models and liability tables
+    are held in LRU caches of bounded size, and FLB inputs are evaluated by a pool of
+    long-lived R sessions, so a warm request does not pay for process start-up, CSV parsing
+    or loading R packages. Requests may be served from several threads at once; they run with
+    the service's RunContext active, which is not interactive unless given otherwise.
+    """
+
+    def __init__(self, cache_size=32, r_sessions=1, force_download="no", context=None):
+        """
+        Parameters:
+            cache_size (int): Maximum number of entries in each of the in-memory caches.
+            r_sessions (int): Number of R worker sessions evaluating FLB inputs in parallel.
+            force_download (str): Download option passed to the data source handlers.
+            context (RunContext): Configuration, cache directory and logging of the requests
+                (default: a non-interactive context for the current working directory).
+        """
+        self.context = context or RunContext()
+        self.sources = self.context.sources
+        self.fingerprints = dataset_fingerprints(self.sources)
+        self.force_download = force_download
+        self.incidence_tables = LRUCache(cache_size)
+        self.models = LRUCache(cache_size)
+        self.liability_tables = LRUCache(cache_size)
+        self._r_sessions = queue.Queue()
+        for _ in range(max(1, r_sessions)):
+            self._r_sessions.put(RSession())
+
+    def reload_sources(self):
+        """
+        Re-reads sources.yaml through the service's RunContext and drops the cached tables and
+        models of datasets whose configuration block changed; entries of other datasets stay warm.
+
+        Returns:
+            list: Names of the changed (or removed) datasets.
+        """
+        sources = self.context.reload_sources()
+        fingerprints = dataset_fingerprints(sources)
+        changed = sorted(dataset for dataset in set(self.fingerprints) | set(fingerprints)
+                         if self.fingerprints.get(dataset) != fingerprints.get(dataset))
+        self.sources, self.fingerprints = sources, fingerprints
+        for dataset in changed:
+            self.incidence_tables.discard_if(lambda key: key[0] == dataset)
+            self.liability_tables.discard_if(lambda key: key[0] == dataset)
+            self.models.discard_if(lambda key: key[3] == dataset)
+        if changed:
+            logging.info(f"Configuration changed for {', '.join(changed)}; dropped their cached tables.")
+        return changed
+
+    def get_source_config(self, dataset):
+        """Returns the sources.yaml block of a dataset, raising ValueError for unknown datasets."""
+        if dataset not in self.sources:
+            raise ValueError(f"Dataset '{dataset}' not found in sources.yaml.")
+        return self.sources[dataset]
+
+    def incidence_table(self, dataset, population, phenotypes):
+        """
+        Returns the incidence table for a dataset, population and phenotype selection.
+
+        Returns:
+            pd.DataFrame: Incidence table with age spans and incidence rates (shared, do not modify).
+        """
+        source_config = self.get_source_config(dataset)
+        population = str(population or source_config.get("default_population"))
+        key = (dataset, population, tuple(sorted(set(phenotypes))))
+
+        def build():
+            with self.context.activate():
+                df, _ = build_incidence_data(source_config, population, sorted(set(phenotypes)), self.force_download)
+            logging.info(f"Loaded incidence table for {dataset}, population {population}.")
+            return df
+        return self.incidence_tables.get_or_create(key, build)
+
+    def liabilities(self, dataset, phenotypes, gene, population=None, crhf_model="constant",
+                    rr_model="static_lookup", cr_model="simple", penetrance_model="uniform_survival"):
+        """
+        Returns the liability table for the given parameters, computing it on a cache miss.
+
+        Returns:
+            pd.DataFrame: Liability classes with penetrances (shared, do not modify).
+        """
+        phenotypes = sorted(set(phenotypes))
+        population = str(population or self.get_source_config(dataset).get("default_population"))
+        key = (dataset, population, tuple(phenotypes), gene, crhf_model, rr_model, cr_model, penetrance_model)
+
+        def build():
+            df = self.incidence_table(dataset, population, phenotypes)
+            crhf = self.models.get_or_create(
+                ("crhf", crhf_model, gene, dataset, population, tuple(phenotypes)),
+                lambda: CRHFModelFactory.create_model(crhf_model, gene, df)
+            )
+            rr = self.models.get_or_create(
+                ("rr", rr_model, gene, dataset, population, tuple(phenotypes)),
+                lambda: RelativeRiskModelFactory.create_model(rr_model, gene, df)
+            )
+            with self.context.activate():
+                return calculate_liability_classes(
+                    df, phenotypes, gene, crhf_model=crhf, rr_model=rr,
+                    penetrance_model=penetrance_model, cr_model=cr_model
+                )
+        return self.liability_tables.get_or_create(key, build)
+
+    def flb(self, pedigree, pedigree_format="cool", afreq=(0.0001,), **liability_parameters):
+        """
+        Calculates FLB values for a pedigree given as file content.
+
+        Parameters:
+            pedigree (str): Content of the pedigree file.
+            pedigree_format (str): Format of the pedigree (e.g., cool).
+            afreq (list): Allele frequencies to evaluate.
+            **liability_parameters: Parameters of `liabilities` (dataset, phenotypes, gene, ...).
+                `gene` may be a list of genes, which are evaluated as a panel.
+
+        Returns:
+            pd.DataFrame: Table with columns 'liability_set' (the gene), 'afreq' and 'flb'.
+        """
+        unknown_parameters = set(liability_parameters) - set(LIABILITY_PARAMETERS)
+        if unknown_parameters:
+            raise ValueError(f"Unknown liability parameters: {', '.join(sorted(unknown_parameters))}")
+        pedigree_obj, flb_pedigree = load_flb_pedigree(io.StringIO(pedigree), pedigree_format)
+        genes = liability_parameters.pop("gene", None)
+        genes = [genes] if isinstance(genes, str) or genes is None else list(dict.fromkeys(genes))
+        liability_tables = {gene: self.liabilities(gene=gene, **liability_parameters) for gene in genes}
+
+        r_session = self._r_sessions.get()
+        try:
+            with self.context.activate():
+                return run_flb_sweep(flb_pedigree, pedigree_obj.members_df, liability_tables,
+                                     [float(freq) for freq in afreq], r_session=r_session)
+        finally:
+            self._r_sessions.put(r_session)
+
+    def stats(self):
+        """Returns the state of the in-memory caches."""
+        return {
+            "incidence_tables": self.incidence_tables.stats(),
+            "models": self.models.stats(),
+            "liability_tables": self.liability_tables.stats(),
+        }
+
+    def close(self):
+        """Stops the R sessions."""
+        while not self._r_sessions.empty():
+            self._r_sessions.get_nowait().close()
@@ -0,0 +1,101 @@
+# service/server.py
+import os
+import json
+import logging
+import socketserver
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON-over-HTTP interface of a HeredicalcService.
+
+    Endpoints:
+        GET  /health       - liveness check
+        GET  /stats        - cache statistics
+        POST /liabilities  - liability table for the given parameters
+        POST /flb          - FLB values for a pedigree and liability parameters
+        POST /reload       - re-read sources.yaml, dropping caches of changed datasets
+    """
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self._send_json(200, self.service.stats())
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/liabilities":
+                liabilities_df = self.service.liabilities(**request)
+                self._send_json(200, {"liabilities": json.loads(liabilities_df.to_json(orient="split"))})
+            elif self.path == "/reload":
+                self._send_json(200, {"changed": self.service.reload_sources()})
+            elif self.path == "/flb":
+                flb_df = self.service.flb(**request)
+                self._send_json(200, {"results": json.loads(flb_df.to_json(orient="records"))})
+            else:
+                self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+        except (ValueError, TypeError, KeyError) as e:
+            logging.warning(f"Rejected request to {self.path}: {e}")
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            logging.error(f"Request to {self.path} failed: {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix-socket"
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} - {format % args}")
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server on a TCP port, serving a HeredicalcService."""
+    daemon_threads = True
+
+    def __init__(self, server_address, service):
+        self.service = service
+        super().__init__(server_address, ServiceRequestHandler)
+
+class ServiceUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a Unix domain socket, serving a HeredicalcService."""
+    daemon_threads = True
+
+    def __init__(self, socket_path, service):
+        self.service = service
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        super().__init__(socket_path, ServiceRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+def create_server(service, host="127.0.0.1", port=8765, socket_path=None):
+    """
+    Creates an HTTP server for the service, on a Unix socket if `socket_path` is given.
+
+    Returns:
+        socketserver.BaseServer: The server; call `serve_forever()` to handle requests.
+    """
+    if socket_path:
+        return ServiceUnixServer(socket_path, service)
+    return ServiceHTTPServer((host, port), service)
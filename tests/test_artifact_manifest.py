@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+from heredicalc.core.artifact_manifest import ArtifactManifest
+
+def test_instances_keep_each_others_entries(tmp_path):
+    # Two processes with the manifest loaded before either of them records an artifact
+    path = tmp_path / "manifest.json"
+    first, second = ArtifactManifest(path), ArtifactManifest(path)
+    first.record(tmp_path / "a.hclb", "liability_table", {"ci5_ix": "f1"})
+    second.record(tmp_path / "b.hclb", "liability_table", {"ci5_ix": "f1"})
+    assert set(ArtifactManifest(path).artifacts) == {str(tmp_path / "a.hclb"), str(tmp_path / "b.hclb")}
+    assert set(second.artifacts) == set(ArtifactManifest(path).artifacts)
+
+    first.remove(tmp_path / "b.hclb")
+    assert set(ArtifactManifest(path).artifacts) == {str(tmp_path / "a.hclb")}
+
+def test_concurrent_records_are_merged(tmp_path):
+    path = tmp_path / "manifest.json"
+
+    def record(number):
+        ArtifactManifest(path).record(tmp_path / f"{number}.hclb", "liability_table", {"ci5_ix": "f1"})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(record, range(32)))
+    assert len(ArtifactManifest(path).artifacts) == 32
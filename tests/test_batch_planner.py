@@ -0,0 +1,144 @@
+import os
+import sys
+import textwrap
+from types import SimpleNamespace
+import pandas as pd
+import pytest
+import heredicalc.flb.flb_sweep as flb_sweep
+import heredicalc.batch.batch_planner as batch_planner
+import heredicalc.bin.batch as batch_cli
+from heredicalc.batch.batch_planner import BatchExecutor, BatchPlan, load_jobs
+
+SOURCES = {"ci5_ix": {"default_population": "10120199"}}
+
+JOBS = """
+defaults:
+  dataset: ci5_ix
+  pedigree: pedigrees/family.ped
+jobs:
+  - name: a
+    phenotypes: [BreastCancer, OvarianCancer]
+    gene: BRCA1
+    afreq: [0.0001, 0.001]
+  - name: b
+    population: 10120199
+    phenotypes: [OvarianCancer, BreastCancer]
+    gene: [BRCA1, BRCA2]
+  - name: c
+    phenotypes: BreastCancer
+    gene: BRCA1
+"""
+
+def write_jobs(tmp_path, content=JOBS):
+    job_file = tmp_path / "jobs.yaml"
+    job_file.write_text(textwrap.dedent(content))
+    return job_file
+
+class MissingData:
+    """Data source handler of a dataset that has not been downloaded yet."""
+
+    def check_data_exists(self):
+        return False
+
+def test_load_jobs_applies_defaults(tmp_path):
+    jobs = load_jobs(write_jobs(tmp_path))
+    assert [job["name"] for job in jobs] == ["a", "b", "c"]
+    assert jobs[0]["phenotypes"] == jobs[1]["phenotypes"] == ["BreastCancer", "OvarianCancer"]
+    assert jobs[2]["phenotypes"] == ["BreastCancer"]
+    assert jobs[1]["gene"] == ["BRCA1", "BRCA2"]
+    assert jobs[1]["afreq"] == [0.0001]
+    assert jobs[0]["crhf_model"] == "constant"
+    assert jobs[0]["pedigree"] == os.path.join(str(tmp_path), "pedigrees", "family.ped")
+
+@pytest.mark.parametrize("content", [
+    "- {name: a, dataset: ci5_ix, phenotypes: [BreastCancer], gene: BRCA1}",
+    "- {name: a, dataset: ci5_ix, phenotypes: [BreastCancer], gene: BRCA1, pedigree: x.ped}\n"
+    "- {name: a, dataset: ci5_ix, phenotypes: [BreastCancer], gene: BRCA2, pedigree: x.ped}",
+    "jobs: {name: a}",
+])
+def test_load_jobs_rejects_invalid_files(tmp_path, content):
+    with pytest.raises(ValueError):
+        load_jobs(write_jobs(tmp_path, content))
+
+def test_plan_deduplicates_shared_artifacts(tmp_path):
+    plan = BatchPlan(load_jobs(write_jobs(tmp_path)), sources=SOURCES)
+    # Population defaults to that of the dataset, so jobs a and b share their incidence table
+    assert plan.counts() == {
+        "dataset": (3, 1),
+        "incidence_table": (3, 2),
+        "liability_table": (4, 3),
+        "pedigree": (3, 1),
+        "flb": (5, 4),
+    }
+    assert plan.dedup_ratio() == pytest.approx(18 / 11)
+    shared_flb = plan.job_outputs["a"][("BRCA1", 0.0001)]
+    assert shared_flb == plan.job_outputs["b"][("BRCA1", 0.0001)]
+    assert plan.artifacts[shared_flb].jobs == ["a", "b"]
+
+def test_plan_lists_dependencies_first(tmp_path):
+    plan = BatchPlan(load_jobs(write_jobs(tmp_path)), sources=SOURCES)
+    seen = set()
+    for key, artifact in plan.artifacts.items():
+        assert set(artifact.dependencies) <= seen
+        seen.add(key)
+
+def test_plan_rejects_unknown_datasets(tmp_path):
+    with pytest.raises(ValueError):
+        BatchPlan(load_jobs(write_jobs(tmp_path)), sources={})
+
+def test_dry_run_only_reports_the_plan(tmp_path, monkeypatch, capsys):
+    def fail(*args, **kwargs):
+        raise AssertionError("A dry run must not compute artifacts.")
+
+    monkeypatch.setattr(sys, "argv", ["batch", str(write_jobs(tmp_path)), "--dry-run", "--log-level", "ERROR"])
+    monkeypatch.setattr(batch_cli, "BatchPlan", lambda jobs: BatchPlan(jobs, sources=SOURCES))
+    monkeypatch.setattr(batch_cli, "BatchExecutor", fail)
+    monkeypatch.setattr(batch_planner, "_data_handler", lambda source_config, force_download="no": MissingData())
+    batch_cli.main()
+    report = capsys.readouterr().out
+    assert report.startswith("3 jobs\n")
+    assert "Deduplication ratio: 1.64 (7 computations saved)" in report
+    assert "Estimated work: 1 download(s), 2 incidence table(s), 3 liability table(s), 4 FLB evaluation(s)" in report
+
+def fake_compute(executor, artifact, inputs):
+    # Stands in for downloads and calculations; the liability tables of BRCA2 fail
+    parameters = artifact.parameters
+    if artifact.kind == "liability_table":
+        if parameters["gene"] == "BRCA2":
+            raise ValueError("no relative risks")
+        return f"{parameters['gene']} {','.join(parameters['phenotypes'])}"
+    if artifact.kind == "pedigree":
+        return SimpleNamespace(members_df=pd.DataFrame({"id": [1]})), os.path.basename(parameters["pedigree"])
+    return artifact.key
+
+def test_flb_evaluations_of_a_pedigree_share_one_sweep(tmp_path, monkeypatch):
+    sweeps = []
+
+    def run_flb_sweep(flb_pedigree, pedigree_df, liability_tables, allele_freqs):
+        sweeps.append((flb_pedigree, dict(liability_tables), list(allele_freqs)))
+        return pd.DataFrame([{"liability_set": name, "afreq": afreq, "flb": len(table) + afreq}
+                             for name, table in liability_tables.items() for afreq in allele_freqs])
+
+    monkeypatch.setattr(BatchExecutor, "_compute", fake_compute)
+    monkeypatch.setattr(flb_sweep, "run_flb_sweep", run_flb_sweep)
+    jobs = JOBS + """
+  - name: d
+    phenotypes: [BreastCancer]
+    gene: BRCA1
+    pedigree: pedigrees/other.ped
+"""
+    plan = BatchPlan(load_jobs(write_jobs(tmp_path, jobs)), sources=SOURCES)
+    executor = BatchExecutor(plan, workers=4)
+    executor.run()
+
+    # One sweep per pedigree, with unique names for the two BRCA1 tables of family.ped
+    assert sorted((pedigree, sorted(tables), afreqs) for pedigree, tables, afreqs in sweeps) == [
+        ("family.ped", ["BRCA1#1", "BRCA1#2"], [0.0001, 0.001]),
+        ("other.ped", ["BRCA1"], [0.0001]),
+    ]
+    results = executor.job_results().set_index(["job", "gene", "afreq"])
+    assert results.loc[("a", "BRCA1", 0.001), "flb"] == len("BRCA1 BreastCancer,OvarianCancer") + 0.001
+    assert results.loc[("c", "BRCA1", 0.0001), "flb"] == len("BRCA1 BreastCancer") + 0.0001
+    assert results.loc[("d", "BRCA1", 0.0001), "flb"] == len("BRCA1 BreastCancer") + 0.0001
+    assert results.loc[("b", "BRCA2", 0.0001), "error"].startswith("skipped, liability_table")
+    assert (results.drop(("b", "BRCA2", 0.0001))["error"] == "").all()
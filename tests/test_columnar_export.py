@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heredicalc.core.columnar_export import read_npy_table, write_table
+
+def liability_table():
+    df = pd.DataFrame({
+        "gender": ["F", "F", "M"], "phenotype": ["Unaffected", None, "BreastCancer"],
+        "age_class_lower": [0.0, 5.0, 85.0], "age_class_upper": [4.0, 9.0, np.nan],
+        "penetrance_nc": [0.01, 0.02, 0.005],
+    })
+    df.index.name = "liability_class"
+    df.attrs["parameters"] = {"gene": "BRCA1"}
+    return df
+
+def expected_values(df):
+    return df.reset_index().astype({"gender": object, "phenotype": object})
+
+@pytest.mark.parametrize("table_format", ["arrow", "parquet"])
+def test_text_columns_are_dictionary_encoded(table_format, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather
+    import pyarrow.parquet
+    df = liability_table()
+    path = tmp_path / f"liabilities.{table_format}"
+    write_table(df, str(path), table_format)
+    table = pa.feather.read_table(path) if table_format == "arrow" else pa.parquet.read_table(path)
+    for name in ("gender", "phenotype"):
+        assert pa.types.is_dictionary(table.schema.field(name).type)
+    assert pa.types.is_float64(table.schema.field("penetrance_nc").type)
+    restored = table.to_pandas().astype({"gender": object, "phenotype": object})
+    pd.testing.assert_frame_equal(restored, expected_values(df))
+    pd.testing.assert_frame_equal(df, liability_table())  # the input is not modified
+
+def test_npy_round_trip(tmp_path):
+    df = liability_table()
+    write_table(df, str(tmp_path / "liabilities"), "npy")
+    restored = read_npy_table(str(tmp_path / "liabilities"))
+    pd.testing.assert_frame_equal(restored, expected_values(df), check_dtype=False)
+    assert restored.attrs == {"parameters": {"gene": "BRCA1"}}
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heredicalc.bin.penetrances import calculate_liability_classes
+from heredicalc.compute_backends.compute_backend_factory import ComputeBackendFactory
+from heredicalc.core.run_context import current_context
+from heredicalc.incidences.incidence_models.incidence_data_model_factory import IncidenceDataModelFactory
+
+pytest.importorskip("polars")
+
+POPULATION = "10120199"
+PHENOTYPES = ["BreastCancer", "ColorectalCancer", "OvarianCancer"]
+
+def write_population(data_dir):
+    """CI5 detailed rows (no header) for both genders, some phenotypes with several IDs, and unknown ages."""
+    rng = np.random.default_rng(11)
+    rows = []
+    for gender in (1, 2):
+        for phenotype_id in (113, 133, 42, 48, 49, 77):
+            for age_class in range(1, 20):
+                rows.append((gender, phenotype_id, age_class, int(rng.integers(0, 200)), 100000 - 2500 * age_class))
+    pd.DataFrame(rows).to_csv(data_dir / f"{POPULATION}.csv", header=False, index=False)
+
+@pytest.fixture
+def data_parsers(tmp_path):
+    write_population(tmp_path)
+    source_config = dict(current_context().sources["ci5_ix"], data_dir=str(tmp_path))
+    return lambda: IncidenceDataModelFactory.create_incidence_model(source_config, population=POPULATION)
+
+def incidence_tables(data_parsers):
+    return {
+        name: ComputeBackendFactory.create_backend(name).build_incidence_table(data_parsers(), PHENOTYPES)
+        for name in ("pandas", "polars")
+    }
+
+def test_backends_build_the_same_incidence_table(data_parsers):
+    tables = incidence_tables(data_parsers)
+    assert len(tables["pandas"]) == 2 * len(PHENOTYPES) * 18
+    pd.testing.assert_frame_equal(tables["polars"], tables["pandas"])
+
+def test_polars_backend_leaves_the_parser_unchanged(data_parsers):
+    data_parser = data_parsers()
+    before = dict(vars(data_parser))
+    ComputeBackendFactory.create_backend("polars").build_incidence_table(data_parser, PHENOTYPES)
+    assert vars(data_parser).keys() == before.keys()
+    assert all(vars(data_parser)[name] is value for name, value in before.items())
+
+def test_backends_calculate_the_same_liability_classes(data_parsers):
+    df = incidence_tables(data_parsers)["pandas"]
+    phenotypes = ["BreastCancer", "OvarianCancer"]
+    pd.testing.assert_frame_equal(
+        calculate_liability_classes(df, phenotypes, "BRCA1", backend="polars"),
+        calculate_liability_classes(df, phenotypes, "BRCA1", backend="pandas"),
+    )
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+import pandas as pd
+import pytest
+import heredicalc.bin.flb as flb_cli
+from heredicalc.flb.flb_result_cache import FLBResultCache, pedigree_fingerprint
+from heredicalc.penetrances.liability_bundle import liability_fingerprint
+
+ALLELE_FREQS = [0.0001, 0.001]
+
+def liability_table(scale=1.0):
+    return pd.DataFrame({
+        "gender": ["F", "F"], "phenotype": ["Unaffected", "BreastCancer"],
+        "age_class_lower": [0.0, 0.0], "age_class_upper": [float("nan"), float("nan")],
+        "penetrance_nc": [0.01 * scale, 0.02 * scale], "penetrance_het": [0.1, 0.2], "penetrance_hom": [0.1, 0.2],
+    })
+
+def pedigree():
+    return SimpleNamespace(members_df=pd.DataFrame({"id": [1, 2], "father_id": [0, 0], "mother_id": [0, 0]}))
+
+def fake_flb(liabilities_data, afreq):
+    # Distinct, reproducible result per combination, as printed by R
+    return f"{int(liability_fingerprint(liabilities_data)[:4], 16) / 1000 + afreq * 1000:.4f}"
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replaces the R evaluations of the single and sweep paths, recording the allele frequencies evaluated."""
+    calls = []
+
+    def calculate_flb(flb_pedigree, pedigree, liabilities_data, allele_freq):
+        calls.append(("single", allele_freq))
+        return fake_flb(liabilities_data, allele_freq)
+
+    def run_flb_sweep(flb_pedigree, pedigree_df, liability_tables, allele_freqs):
+        rows = []
+        for set_name, liabilities_data in liability_tables.items():
+            for afreq in allele_freqs:
+                calls.append(("sweep", afreq))
+                rows.append({"liability_set": set_name, "afreq": afreq, "flb": float(fake_flb(liabilities_data, afreq))})
+        return pd.DataFrame(rows)
+
+    monkeypatch.setattr(flb_cli, "calculate_flb", calculate_flb)
+    monkeypatch.setattr(flb_cli, "run_flb_sweep", run_flb_sweep)
+    return calls
+
+def run_single(result_cache, set_name, table, afreq, capsys):
+    args = SimpleNamespace(output="stdout", pedigree_file=None)
+    flb_cli.run_flb_command(args, "", pedigree(), {set_name: table}, [afreq], result_cache, None)
+    return float(capsys.readouterr().out)
+
+def test_cache_keys_match_the_result_cache_key(tmp_path):
+    table, members = liability_table(), pedigree()
+    result_cache = FLBResultCache(tmp_path)
+    keys = flb_cli.result_cache_keys(result_cache.engine_version, members, {"BRCA1": table}, ALLELE_FREQS)
+    assert list(keys) == [("BRCA1", afreq) for afreq in ALLELE_FREQS]
+    for afreq in ALLELE_FREQS:
+        assert keys[("BRCA1", afreq)] == result_cache.key(
+            pedigree_fingerprint(members.members_df), liability_fingerprint(table), afreq)
+
+def test_single_results_are_reused_by_the_sweep(calls, tmp_path, capsys):
+    table = liability_table()
+    single = run_single(FLBResultCache(tmp_path), "BRCA1", table, ALLELE_FREQS[0], capsys)
+    sweep = flb_cli.run_cached_flb_sweep("", pedigree(), {"BRCA1": table}, ALLELE_FREQS, FLBResultCache(tmp_path))
+    assert calls == [("single", ALLELE_FREQS[0]), ("sweep", ALLELE_FREQS[1])]
+    assert sweep["flb"].tolist()[0] == single
+    # Cached like sweep results, as a number
+    key = flb_cli.result_cache_keys(FLBResultCache(tmp_path).engine_version, pedigree(), {"BRCA1": table},
+                                    ALLELE_FREQS)[("BRCA1", ALLELE_FREQS[0])]
+    assert FLBResultCache(tmp_path).get(key) == single
+
+def test_sweep_results_are_reused_by_the_single_path(calls, tmp_path, capsys):
+    tables = {"BRCA1": liability_table(), "BRCA2": liability_table(scale=2.0)}
+    sweep = flb_cli.run_cached_flb_sweep("", pedigree(), tables, ALLELE_FREQS, FLBResultCache(tmp_path))
+    calls.clear()
+    for row in sweep.itertuples():
+        assert run_single(FLBResultCache(tmp_path), row.liability_set, tables[row.liability_set],
+                          row.afreq, capsys) == row.flb
+    assert calls == []
@@ -0,0 +1,87 @@
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+from heredicalc.flb.flb_simulation import GeneDropSimulator
+from heredicalc.flb.liabilities_mapper import compute_liability_vector
+
+AGE_CLASSES = [(0, 39), (40, 59), (60, None)]
+
+def liability_table():
+    """Liability classes for both genders, three phenotypes and an open-ended last age class."""
+    rows = []
+    for gender in ("F", "M"):
+        for phenotype, risk in (("Unaffected", 0.2), ("BreastCancer", 0.1), ("OvarianCancer", 0.05)):
+            for step, (lower, upper) in enumerate(AGE_CLASSES, start=1):
+                rows.append({
+                    "gender": gender, "phenotype": phenotype,
+                    "age_class_lower": lower, "age_class_upper": np.nan if upper is None else upper,
+                    "penetrance_nc": risk * step / 10, "penetrance_het": risk * step, "penetrance_hom": risk * step,
+                })
+    return pd.DataFrame(rows)
+
+def member(member_id, father, mother, gender, age, phenotype=None, genotype="unk", index=False):
+    return {
+        "id": member_id, "father_id": father, "mother_id": mother, "gender": gender, "age_last_seen": age,
+        "phenotypes": [{"phenotype": phenotype}] if phenotype else [{"phenotype": "Unknown"}],
+        "genotype_status": genotype, "is_index_person": index,
+    }
+
+def pedigree():
+    """Three generations; the proband (3) is a carrier, her brother (4) a non-carrier, member 5 has no age."""
+    return pd.DataFrame([
+        member(1, 0, 0, "M", 72),
+        member(2, 0, 0, "F", 70, "OvarianCancer"),
+        member(3, 1, 2, "F", 45, "BreastCancer", "het", index=True),
+        member(4, 1, 2, "M", 42, "Unaffected", "neg"),
+        member(5, 1, 2, "F", np.nan),
+        member(6, 0, 0, "M", 48, "Unaffected"),
+        member(7, 6, 3, "F", 21, "Unaffected"),
+    ])
+
+@pytest.fixture
+def simulator():
+    return GeneDropSimulator(pedigree(), liability_table())
+
+def unmatched_classes(caplog, function):
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        result = function()
+    return result, sum(record.levelno >= logging.CRITICAL for record in caplog.records)
+
+def test_liabilities_are_only_mapped_for_simulated_members(caplog):
+    # Assumed phenotypes are only mapped for simulated members, so only the observed phenotypes of
+    # members without age are unmatched, as in the FLB of the observed pedigree
+    _, observed_unmatched = unmatched_classes(
+        caplog, lambda: compute_liability_vector(liability_table(), pedigree()))
+    simulator, unmatched = unmatched_classes(caplog, lambda: GeneDropSimulator(pedigree(), liability_table()))
+    assert observed_unmatched == 1
+    assert unmatched == observed_unmatched
+    assert simulator.simulated.tolist() == [True, True, False, True, False, True, True]
+
+def test_proband_always_carries(simulator):
+    counts = simulator.simulate(500, seed=1)["counts"]
+    assert (counts[:, simulator.proband] > 0).all()
+
+def test_observed_genotypes_are_respected(simulator):
+    counts = simulator.simulate(500, seed=2)["counts"]
+    assert (counts[:, 3] == 0).all()  # member 4 is an observed non-carrier
+    assert (counts[:, 2] == 1).all()  # the proband is an observed heterozygote
+
+def test_members_not_simulated_keep_their_observed_phenotype(simulator):
+    replicates = simulator.simulate(200, seed=3)
+    fixed = ~simulator.simulated
+    assert (replicates["affected"][:, fixed] == simulator.observed_affected[fixed]).all()
+    assert (replicates["classes"][:, fixed] == simulator.observed_classes[fixed]).all()
+
+def test_seeded_simulation_is_reproducible(simulator):
+    first = simulator.simulate(100, seed=42, genotyped=[7])
+    second = GeneDropSimulator(pedigree(), liability_table()).simulate(100, seed=42, genotyped=[7])
+    for key in ("counts", "genotyped", "affected", "classes"):
+        np.testing.assert_array_equal(first[key], second[key])
+    other = simulator.simulate(100, seed=43, genotyped=[7])
+    assert not np.array_equal(first["counts"], other["counts"]) or not np.array_equal(first["affected"], other["affected"])
+
+def test_unknown_genotyped_members_are_rejected(simulator):
+    with pytest.raises(ValueError):
+        simulator.simulate(10, seed=1, genotyped=[99])
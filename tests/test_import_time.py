@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+# Wall-clock budget (seconds) for importing a CLI module in a fresh interpreter; pandas alone
+# takes a few hundred milliseconds, override on slow machines with HEREDICALC_IMPORT_BUDGET.
+IMPORT_BUDGET = float(os.environ.get("HEREDICALC_IMPORT_BUDGET", "2.0"))
+
+FACTORY_IMPLEMENTATIONS = {
+    "heredicalc.penetrances.penetrance_models.penetrance_model_factory":
+        "heredicalc.penetrances.penetrance_models.uniform_survival_penetrance_model",
+    "heredicalc.penetrances.relative_risk_models.relative_risk_model_factory":
+        "heredicalc.penetrances.relative_risk_models.static_lookup_rr_model",
+    "heredicalc.penetrances.crhf_models.crhf_model_factory":
+        "heredicalc.penetrances.crhf_models.constant_crhf_model",
+    "heredicalc.cumulative_risks.cumulative_risk_model_factory":
+        "heredicalc.cumulative_risks.simple_cumulative_risk_model",
+    "heredicalc.incidences.incidence_models.incidence_data_model_factory":
+        "heredicalc.incidences.incidence_models.ci5_detailed_incidence_model",
+    "heredicalc.incidences.incidence_data_source_handlers.data_source_handler_factory":
+        "heredicalc.incidences.incidence_data_source_handlers.zip_data_handler",
+    "heredicalc.pedconv.exporters.pedigree_exporter_factory":
+        "heredicalc.pedconv.exporters.cool_pedigree_exporter",
+    "heredicalc.pedconv.importers.pedigree_importer_factory":
+        "heredicalc.pedconv.importers.cool_pedigree_importer",
+    "heredicalc.penetrances.exporters.penetrance_exporter_factory":
+        "heredicalc.penetrances.exporters.flb_penetrance_exporter",
+    "heredicalc.incidences.exporters.incidence_exporter_factory":
+        "heredicalc.incidences.exporters.columnar_incidence_exporter",
+    "heredicalc.compute_backends.compute_backend_factory":
+        "heredicalc.compute_backends.polars_compute_backend",
+}
+
+def import_in_fresh_interpreter(module):
+    """Imports a module in a new interpreter and returns (seconds, loaded module names)."""
+    code = (
+        "import sys, time, json, importlib\n"
+        "start = time.perf_counter()\n"
+        f"importlib.import_module({module!r})\n"
+        "print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    seconds, modules = json.loads(result.stdout)
+    return seconds, set(modules)
+
+@pytest.mark.parametrize("factory, implementation", FACTORY_IMPLEMENTATIONS.items())
+def test_factories_import_implementations_lazily(factory, implementation):
+    _, modules = import_in_fresh_interpreter(factory)
+    assert implementation not in modules
+
+def test_flb_cli_defers_penetrance_stack():
+    seconds, modules = import_in_fresh_interpreter("heredicalc.bin.flb")
+    assert not {"requests", "yaml", "heredicalc.bin.penetrances"} & modules
+    assert seconds < IMPORT_BUDGET
+
+def test_pedconv_cli_import_budget():
+    seconds, modules = import_in_fresh_interpreter("heredicalc.bin.pedconv")
+    assert "requests" not in modules
+    assert seconds < IMPORT_BUDGET
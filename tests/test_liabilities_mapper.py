@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from heredicalc.flb.flb_result_cache import engine_version
+from heredicalc.flb.liabilities_mapper import MAPPER_VERSION, compute_liability_vector
+
+def liability_classes():
+    return pd.DataFrame({
+        "gender": ["F", "F", "F"], "phenotype": ["Unaffected"] * 3,
+        "age_class_lower": [0.0, 40.0, 85.0], "age_class_upper": [39.0, 84.0, np.nan],
+    })
+
+def pedigree(ages):
+    return pd.DataFrame({
+        "id": range(1, len(ages) + 1), "gender": "F", "age_last_seen": ages,
+        "phenotypes": [[{"phenotype": "Unaffected"}]] * len(ages),
+    })
+
+def test_ages_in_the_open_ended_last_class_map_to_it():
+    assert compute_liability_vector(liability_classes(), pedigree([20, 84, 85, 101])) == [1, 2, 3, 3]
+
+def test_engine_version_includes_the_mapper_version():
+    # FLB results of an earlier mapping are not reused
+    assert engine_version().endswith(f"+m{MAPPER_VERSION}")
@@ -0,0 +1,32 @@
+import os
+import stat
+import numpy as np
+import pandas as pd
+import pytest
+from heredicalc.penetrances.liability_bundle import liability_fingerprint, load_liability_table, write_liability_bundle
+
+def liability_table():
+    return pd.DataFrame({
+        "gender": ["F", "M"], "phenotype": ["Unaffected", "Unaffected"],
+        "age_class_lower": [0.0, 0.0], "age_class_upper": [np.nan, np.nan],
+        "penetrance_nc": [0.01, 0.005], "penetrance_het": [0.3, 0.01], "penetrance_hom": [0.3, 0.01],
+    })
+
+def test_bundle_round_trip(tmp_path):
+    table = liability_table()
+    write_liability_bundle(tmp_path / "table.hclb", table, {"gene": "BRCA1"})
+    bundle = load_liability_table(tmp_path / "table.hclb")
+    assert liability_fingerprint(bundle) == liability_fingerprint(table)
+    assert bundle.parameters == {"gene": "BRCA1"}
+    assert [path.name for path in tmp_path.iterdir()] == ["table.hclb"]
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+@pytest.mark.parametrize("umask", [0o022, 0o027])
+def test_bundles_get_regular_file_permissions(tmp_path, umask):
+    previous = os.umask(umask)
+    try:
+        write_liability_bundle(tmp_path / "table.hclb", liability_table())
+        write_liability_bundle(tmp_path / "table.hclb", liability_table())  # replaced
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE(os.stat(tmp_path / "table.hclb").st_mode) == 0o666 & ~umask
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+from heredicalc.bin.penetrances import calculate_liability_classes, calculate_liability_classes_parallel
+
+PHENOTYPES = ["BreastCancer", "OvarianCancer"]
+PARAMETER_SETS = [{"gene": "BRCA1"}, {"gene": "BRCA1", "cr_model": "simple", "penetrance_model": "uniform_survival"}]
+
+def incidence_table():
+    """Incidence table in the layout of build_incidence_data, with 5-year age classes and an open-ended last one."""
+    rng = np.random.default_rng(7)
+    rows = []
+    for gender in ("F", "M"):
+        for phenotype in PHENOTYPES:
+            for lower in range(0, 90, 5):
+                upper = lower + 4.0 if lower < 85 else np.nan
+                cases, person_years = int(rng.integers(0, 150)), 98000 - 400 * lower
+                rows.append({
+                    "gender": gender, "phenotype": phenotype, "age_class_lower": float(lower),
+                    "age_class_upper": upper, "cases": cases, "person_years": person_years,
+                    "age_span": 0.0 if np.isnan(upper) else 5.0,
+                    "incidence_rate": 0.0 if np.isnan(upper) else cases / person_years,
+                })
+    df = pd.DataFrame(rows)
+    df.index.name = "incidence_class"
+    return df
+
+def test_parallel_liability_classes_match_the_serial_calculation():
+    df = incidence_table()
+    parallel = calculate_liability_classes_parallel(df, PHENOTYPES, PARAMETER_SETS, processes=2)
+    assert len(parallel) == len(PARAMETER_SETS)
+    for parameters, result in zip(PARAMETER_SETS, parallel):
+        serial = calculate_liability_classes(df, PHENOTYPES, **parameters)
+        pd.testing.assert_frame_equal(result, serial)
+    pd.testing.assert_frame_equal(df, incidence_table())  # the shared table is left unchanged
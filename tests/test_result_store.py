@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+from heredicalc.core.result_store import ResultStore
+from heredicalc.core.run_context import RunContext
+from heredicalc.penetrances.liability_bundle import (PENETRANCE_COLUMNS, liability_fingerprint, load_liability_table,
+                                                     write_liability_bundle)
+
+PARAMETERS = {"dataset": "ci5_ix", "population": "10120199", "phenotypes": ["OvarianCancer", "BreastCancer"],
+              "gene": "BRCA1", "crhf_model": "constant", "rr_model": "static_lookup", "cr_model": "simple",
+              "penetrance_model": "uniform_survival"}
+
+def liability_table(scale=1.0):
+    df = pd.DataFrame({
+        "gender": ["F", "F", "M"], "phenotype": ["Unaffected", "BreastCancer", "Unaffected"],
+        "age_class_lower": [0.0, 0.0, 0.0], "age_class_upper": [np.nan, np.nan, np.nan],
+        "penetrance_nc": [0.01 * scale, 0.02, 0.005], "penetrance_het": [0.3, 0.5, 0.01],
+        "penetrance_hom": [0.3, 0.5, 0.01],
+    })
+    df.attrs["parameters"] = dict(PARAMETERS)
+    df.attrs["input_hashes"] = {"incidences": "abc"}
+    return df
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultStore(tmp_path / "results.sqlite") as store:
+        yield store
+
+def test_liability_table_round_trip(store, tmp_path):
+    table = liability_table()
+    fingerprint = store.add_liability_table(table)
+    assert fingerprint == liability_fingerprint(table)
+
+    stored = store.query_liability_tables(gene="BRCA1")
+    assert stored["fingerprint"].tolist() == [fingerprint]
+    assert stored.loc[0, "phenotypes"] == "BreastCancer,OvarianCancer"
+    assert stored.loc[0, "rows"] == 3
+
+    bundle_path = tmp_path / "restored.hclb"
+    bundle_path.write_bytes(store.liability_bundle(fingerprint))
+    restored = load_liability_table(bundle_path)
+    assert liability_fingerprint(restored) == fingerprint
+    np.testing.assert_array_equal(restored.penetrances, table[PENETRANCE_COLUMNS].to_numpy())
+    assert restored.parameters["gene"] == "BRCA1"
+    assert store.liability_bundle("unknown") is None
+
+def test_duplicate_liability_tables_are_stored_once(store, tmp_path):
+    table = liability_table()
+    store.add_liability_table(table)
+    store.add_liability_table(liability_table())  # buffered duplicate
+    store.flush()
+    store.add_liability_table(table)  # stored duplicate
+    bundle_path = tmp_path / "table.hclb"
+    write_liability_bundle(bundle_path, table, table.attrs["parameters"], table.attrs["input_hashes"])
+    assert store.add_liability_table(load_liability_table(bundle_path)) == liability_fingerprint(table)
+    store.add_liability_table(liability_table(scale=2.0))
+    assert len(store.query_liability_tables()) == 2
+
+def test_flb_results_round_trip(store):
+    table = liability_table()
+    store.add_flb_result("9.22", 0.0001, "pedigree-a", table, liability_set="BRCA1", cache_key="key-a", seconds=1.5)
+    store.add_flb_result(3.5, 0.001, "pedigree-b", table, liability_set="BRCA1", cache_key="key-b")
+    assert store.find_flb("key-a") == 9.22
+    assert store.find_flb("key-c") is None
+
+    results = store.query_flb(pedigree_hash="pedigree-a")
+    assert len(results) == 1
+    row = results.iloc[0]
+    assert (row["gene"], row["population"], row["afreq"], row["flb"]) == ("BRCA1", "10120199", 0.0001, 9.22)
+    assert row["liability_fingerprint"] == liability_fingerprint(table)
+    assert len(store.query_flb(gene="BRCA1")) == 2
+    assert len(store.query_flb(gene="BRCA2")) == 0
+
+def test_duplicate_flb_results_are_kept_as_history(store):
+    table = liability_table()
+    store.add_flb_result(9.22, 0.0001, "pedigree-a", table, cache_key="key-a")
+    store.flush()
+    store.add_flb_result(9.23, 0.0001, "pedigree-a", table, cache_key="key-a")
+    assert len(store.query_flb(cache_key="key-a")) == 2
+    assert store.find_flb("key-a") == 9.23  # the most recent, also within the same second
+
+def test_records_persist_across_connections(tmp_path):
+    path = tmp_path / "results.sqlite"
+    with ResultStore(path, batch_size=1000) as store:
+        fingerprint = store.add_liability_table(liability_table())
+        store.add_flb_result(9.22, 0.0001, "pedigree-a", liability_table(), cache_key="key-a")
+    with ResultStore(path) as store:
+        assert store.find_flb("key-a") == 9.22
+        assert store.query_liability_tables()["fingerprint"].tolist() == [fingerprint]
+
+def test_default_store_is_in_the_cache_directory_of_the_context(tmp_path):
+    with RunContext(cache_dir=tmp_path / "cache").activate() as context:
+        with ResultStore() as store:
+            assert store.path == context.result_store_file == tmp_path / "cache" / "results.sqlite"
+    assert (tmp_path / "cache" / "results.sqlite").exists()
@@ -0,0 +1,98 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from heredicalc.core.run_context import RunContext, current_context
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+def test_default_context_is_created_once():
+    assert current_context() is current_context()
+    assert not current_context().interactive
+
+def test_nested_contexts_are_restored(tmp_path):
+    outer, inner = RunContext(cache_dir=tmp_path / "outer"), RunContext(cache_dir=tmp_path / "inner")
+    default = current_context()
+    with outer.activate():
+        assert current_context() is outer
+        with inner.activate():
+            assert current_context() is inner
+            assert current_context().flb_results_dir == (tmp_path / "inner" / "flb_results").resolve()
+        assert current_context() is outer
+    assert current_context() is default
+
+def test_context_is_restored_after_errors(tmp_path):
+    default = current_context()
+    with pytest.raises(RuntimeError):
+        with RunContext(cache_dir=tmp_path).activate():
+            raise RuntimeError("failed")
+    assert current_context() is default
+
+def test_cache_dir_is_resolved_on_creation(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    context = RunContext()
+    monkeypatch.chdir("/")
+    assert context.cache_dir == (tmp_path / "cache").resolve()
+    assert context.manifest_file == (tmp_path / "cache" / "manifest.json").resolve()
+
+def test_concurrent_contexts_are_isolated(tmp_path, caplog):
+    caplog.set_level(logging.INFO)
+    handlers = [RecordingHandler() for _ in range(4)]
+    contexts = [RunContext(cache_dir=tmp_path / f"run{number}", log_handler=handler)
+                for number, handler in enumerate(handlers)]
+    barrier = threading.Barrier(len(contexts))
+
+    def task(number):
+        # All threads have their context active at the same time
+        barrier.wait()
+        logging.info(f"message of run {number}")
+        barrier.wait()
+        return current_context().cache_dir
+
+    with ThreadPoolExecutor(max_workers=len(contexts)) as executor:
+        cache_dirs = list(executor.map(lambda number: contexts[number].run(task, number), range(len(contexts))))
+    assert cache_dirs == [context.cache_dir for context in contexts]
+    for number, handler in enumerate(handlers):
+        assert handler.messages == [f"message of run {number}"]
+
+def test_log_handler_level_is_respected(tmp_path, caplog):
+    caplog.set_level(logging.DEBUG)
+    handler = RecordingHandler()
+    with RunContext(cache_dir=tmp_path, log_handler=handler).activate():
+        logging.debug("hidden")
+        logging.info("shown")
+    logging.info("outside")
+    assert handler.messages == ["shown"]
+
+def test_non_interactive_context_answers_with_the_default(tmp_path, monkeypatch):
+    def fail(prompt):
+        raise AssertionError("A non-interactive context must not ask.")
+
+    monkeypatch.setattr("builtins.input", fail)
+    context = RunContext(cache_dir=tmp_path)
+    assert context.confirm("Recalculate?") is False
+    assert context.confirm("Recalculate?", default=True) is True
+
+def test_interactive_context_asks(tmp_path, monkeypatch):
+    answers = iter(["maybe", "Y"])
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    assert RunContext(cache_dir=tmp_path, interactive=True).confirm("Recalculate?") is True
+
+def test_source_config_of_given_sources(tmp_path):
+    context = RunContext(cache_dir=tmp_path, sources={"ci5_ix": {"default_population": "10120199"}})
+    assert context.source_config("ci5_ix") == {"default_population": "10120199"}
+    with pytest.raises(ValueError):
+        context.source_config("unknown")
+
+def test_reloaded_sources_replace_the_configuration(tmp_path, monkeypatch):
+    context = RunContext(cache_dir=tmp_path, sources={"ci5_ix": {"default_population": "10120199"}})
+    reloaded = {"sources": {"ci5_ix": {"default_population": "38402499"}}}
+    monkeypatch.setattr("heredicalc.core.setup_data_sources.load_incidence_data_sources", lambda: reloaded)
+    assert context.reload_sources() == reloaded["sources"]
+    assert context.source_config("ci5_ix") == {"default_population": "38402499"}